@@ -0,0 +1,101 @@
+"""Measure and enforce the import time of the integration.
+
+Run from the repository root::
+
+    python -m benchmarks.imports
+
+Every module is imported in fresh interpreters that already loaded the parts
+of Home Assistant that are always loaded before an integration. The median
+import time is compared with a budget and modules that should only be loaded
+on first use are checked to stay unloaded. Exits with status 1 when a budget
+is exceeded, so it can run as a check. Slower hosts can scale the budgets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PACKAGE = "custom_components.solaredge_forecast"
+
+# Loaded by Home Assistant before any integration is imported.
+PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+)
+
+# Milliseconds on a desktop CPU.
+IMPORT_BUDGETS = {
+    PACKAGE: 10.0,
+    f"{PACKAGE}.config_flow": 10.0,
+    f"{PACKAGE}.solaredgeforecast": 30.0,
+}
+
+# Modules only needed once an entry is set up or a forecast is computed.
+LAZY_MODULES = (
+    f"{PACKAGE}.coordinator",
+    f"{PACKAGE}.history",
+    f"{PACKAGE}.solaredgeforecast.api",
+    f"{PACKAGE}.solaredgeforecast.statistics",
+    "homeassistant.helpers.update_coordinator",
+    "numpy",
+)
+
+_CHILD = """
+import importlib, json, sys, time
+for name in {preloaded!r}:
+    importlib.import_module(name)
+started = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "milliseconds": elapsed * 1000,
+    "loaded": [name for name in {lazy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    """Return the median import time of a module and the lazy modules it loaded."""
+    code = _CHILD.format(preloaded=PRELOADED, module=module, lazy=LAZY_MODULES)
+    timings = []
+    loaded: set[str] = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        timings.append(result["milliseconds"])
+        loaded.update(result["loaded"])
+    return {"milliseconds": statistics.median(timings), "loaded": sorted(loaded)}
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Factor applied to every budget"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<56} {'ms':>7} {'budget':>7}  lazy modules loaded")
+    for module, budget in IMPORT_BUDGETS.items():
+        result = measure(module, args.runs)
+        budget *= args.scale
+        over = result["milliseconds"] > budget or bool(result["loaded"])
+        failed |= over
+        print(
+            f"{module:<56} {result['milliseconds']:>7.1f} {budget:>7.1f}  "
+            f"{', '.join(result['loaded']) or '-'}{'  OVER BUDGET' if over else ''}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
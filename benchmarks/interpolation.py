@@ -0,0 +1,195 @@
+"""Compare the interpolation strategies of the forecast.
+
+Run from the repository root::
+
+    python -m benchmarks.interpolation --latitude 52
+
+Every strategy is timed on the work it adds to a refresh, from the stage
+timings of the forecast: building the daily curve of the forecast period and
+the curves of the forecast bands. It is then backtested on synthetic sites
+whose daily production follows the extraterrestrial radiation at the
+latitude with random weather, or on a cached history directory with
+``--history``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from array import array
+import asyncio
+from datetime import date, datetime, time, timedelta
+import math
+import os
+import random
+import tempfile
+
+from custom_components.solaredge_forecast.solaredgeforecast import (
+    DATE_FORMAT,
+    SolaredgeForecast,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.backtest import (
+    DailyProduction,
+    ErrorStats,
+    HistoryReplayClient,
+    column_paths,
+    run_backtest,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.columnar import (
+    RESOLUTION_DAY,
+    RESOLUTION_MONTH,
+    ColumnarEnergyStore,
+    EnergyColumn,
+    month_index,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.interpolation import (
+    INTERPOLATIONS,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.metrics import (
+    ForecastMetrics,
+)
+
+HISTORY_START = date(2019, 1, 1)
+PERIOD = (date(2025, 1, 1), date(2025, 12, 31))
+SITE_PEAK_KWH = 30.0
+
+
+def extraterrestrial_radiation(day: date, latitude: float) -> float:
+    """Return the daily radiation on a horizontal plane outside the atmosphere.
+
+    FAO-56 equation 21, in MJ per square metre.
+    """
+    day_of_year = day.timetuple().tm_yday
+    phi = math.radians(latitude)
+    distance = 1 + 0.033 * math.cos(2 * math.pi * day_of_year / 365)
+    declination = 0.409 * math.sin(2 * math.pi * day_of_year / 365 - 1.39)
+    cos_sunset = min(max(-math.tan(phi) * math.tan(declination), -1.0), 1.0)
+    sunset = math.acos(cos_sunset)
+    return (
+        24 * 60 / math.pi
+        * 0.082
+        * distance
+        * (
+            sunset * math.sin(phi) * math.sin(declination)
+            + math.cos(phi) * math.cos(declination) * math.sin(sunset)
+        )
+    )
+
+
+def write_synthetic_sites(
+    directory: str, site_count: int, latitude: float, end: date
+) -> None:
+    """Write daily and monthly columns of sites with random weather."""
+    store = ColumnarEnergyStore(directory)
+    peak = max(
+        extraterrestrial_radiation(HISTORY_START + timedelta(days=offset), latitude)
+        for offset in range(366)
+    )
+    for site_id in range(1, site_count + 1):
+        rng = random.Random(site_id)
+        scale = SITE_PEAK_KWH * rng.uniform(0.5, 1.5) * 1000 / peak
+        daily = array("d")
+        monthly = array("d")
+        day = HISTORY_START
+        while day < end:
+            value = extraterrestrial_radiation(day, latitude) * scale
+            daily.append(value * rng.uniform(0.2, 0.9))
+            if day.day == 1:
+                monthly.append(0.0)
+            monthly[-1] += daily[-1]
+            day += timedelta(days=1)
+        store.write(
+            site_id,
+            EnergyColumn(RESOLUTION_DAY, HISTORY_START.toordinal(), daily),
+        )
+        store.write(
+            site_id,
+            EnergyColumn(RESOLUTION_MONTH, month_index(HISTORY_START), monthly),
+        )
+
+
+async def time_refresh(
+    directory: str, site_id: int, method: str, latitude: float
+) -> tuple[float, float]:
+    """Return the mean milliseconds of the curve and the bands per refresh.
+
+    The forecast is refreshed at every day of the benchmark period with the
+    months before that day, like the backtest, and its stage timings enabled.
+    """
+    store = ColumnarEnergyStore(directory)
+    monthly = store.read(site_id, RESOLUTION_MONTH)
+    client = HistoryReplayClient(
+        DailyProduction(monthly, store.read(site_id, RESOLUTION_DAY))
+    )
+    client.metrics = ForecastMetrics()
+    start, end = PERIOD
+    day = start
+    while day <= end:
+        client.today = day
+        forecast = SolaredgeForecast(
+            start.strftime(DATE_FORMAT),
+            end.strftime(DATE_FORMAT),
+            "",
+            site_id,
+            EnergyColumn(
+                RESOLUTION_MONTH,
+                monthly.first,
+                monthly.slice(monthly.start, day.replace(day=1) - timedelta(days=1)),
+                monthly.start,
+            ),
+            interpolation=method,
+            latitude=latitude,
+        )
+        await forecast.async_get_solar_forecast(client, datetime.combine(day, time()))
+        day += timedelta(days=1)
+
+    timings = client.metrics.timings
+    return tuple(
+        timings[name].total / timings[name].count * 1000
+        for name in ("compute.interpolation", "compute.bands")
+    )
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latitude", type=float, default=52.0)
+    parser.add_argument("--sites", type=int, default=3, help="Synthetic sites")
+    parser.add_argument("--history", help="Backtest a cached history directory")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.history is None:
+            write_synthetic_sites(
+                directory, args.sites, args.latitude, PERIOD[1] + timedelta(days=1)
+            )
+        directory = args.history or directory
+        paths = column_paths(directory)
+        site_id = int(os.path.basename(paths[0]).split(".", 1)[0])
+
+        print(
+            f"{'interpolation':<14} {'curve ms':>9} {'bands ms':>9} "
+            f"{'MAE kWh':>9} {'MAPE %':>7} {'forecasts':>9}"
+        )
+        for method in INTERPOLATIONS:
+            curve_ms, bands_ms = asyncio.run(
+                time_refresh(directory, site_id, method, args.latitude)
+            )
+            overall = ErrorStats()
+            for result in run_backtest(
+                paths,
+                workers=args.workers,
+                interpolation=method,
+                latitude=args.latitude,
+            ):
+                overall.merge(result.overall)
+            summary = overall.summary()
+            print(
+                f"{method:<14} {curve_ms:>9.3f} {bands_ms:>9.3f} "
+                f"{summary.get('mae_kwh') or 0:>9.1f} "
+                f"{summary.get('mape_pct') or 0:>7.2f} {summary['forecasts']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
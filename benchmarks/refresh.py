@@ -0,0 +1,183 @@
+"""Benchmark forecast refreshes against the local SolarEdge replay server.
+
+Run from the repository root::
+
+    python -m benchmarks.refresh --sites 1 50 500
+
+Every site count is refreshed three times: a cold start without cached
+history, the first refresh of a day with cached history and an intra-day
+refresh. The quarter-hour history is still being backfilled in every stage,
+a year takes more chunks than one refresh requests. API calls, wall time,
+peak memory and the backfill progress are reported per stage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+import time
+import tracemalloc
+
+import aiohttp
+
+from custom_components.solaredge_forecast.scheduler import SolaredgeRequestScheduler
+from custom_components.solaredge_forecast.solaredgeforecast import (
+    INTRADAY_DAYS,
+    SolaredgeForecast,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.api import (
+    SolaredgeApiClient,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.intraday import (
+    IntradayHistory,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.replay import (
+    FakeSolaredgeServer,
+    synthetic_recording,
+)
+
+HISTORY_START = date(2015, 1, 1)
+# Recorded quarter-hour days, the rest of the backfilled year is empty.
+INTRADAY_RECORDED_DAYS = 7
+
+
+async def _refresh(
+    client: SolaredgeApiClient, forecasts: list[SolaredgeForecast]
+) -> None:
+    """Refresh every forecast concurrently."""
+    await asyncio.gather(*(forecast.async_update(client) for forecast in forecasts))
+
+
+def _backfill_percent(forecasts: list[SolaredgeForecast], today: date) -> float:
+    """Return how much of the quarter-hour year the forecasts have fetched."""
+    missing = sum(
+        len(
+            forecast.intraday.missing_days(
+                today - timedelta(days=INTRADAY_DAYS), today - timedelta(days=1)
+            )
+        )
+        for forecast in forecasts
+    )
+    return 100 - 100 * missing / (INTRADAY_DAYS * len(forecasts))
+
+
+def _forecasts(
+    site_ids: list[int],
+    period: tuple[str, str],
+    previous: list[SolaredgeForecast],
+    stage: str,
+) -> list[SolaredgeForecast]:
+    """Return forecasts that start from the state of the previous stage.
+
+    Every forecast gets its own copy of the previous intraday history, so
+    the traced refresh starts from the same backfill as the measured one.
+    """
+    return [
+        SolaredgeForecast(
+            *period,
+            "",
+            site_id,
+            previous[index].history if previous else None,
+            previous[index].baseline if stage == "intra-day" else None,
+            IntradayHistory.from_dict(
+                previous[index].intraday.as_dict() if previous else None
+            ),
+        )
+        for index, site_id in enumerate(site_ids)
+    ]
+
+
+async def benchmark(site_count: int, latency: float) -> list[tuple[str, dict]]:
+    """Return measurements of the refresh stages for a number of sites."""
+    today = date.today()
+    period = (
+        today.replace(month=1, day=1).strftime("%Y%m%d"),
+        today.replace(month=12, day=31).strftime("%Y%m%d"),
+    )
+    site_ids = list(range(1, site_count + 1))
+    server = FakeSolaredgeServer(
+        synthetic_recording(
+            site_ids,
+            HISTORY_START,
+            today,
+            seed=site_count,
+            intraday_days=INTRADAY_RECORDED_DAYS,
+        ),
+        latency=latency,
+    )
+    await server.start()
+
+    results = []
+    previous: list[SolaredgeForecast] = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = SolaredgeApiClient(
+                session,
+                "benchmark",
+                SolaredgeRequestScheduler(daily_budget=1_000_000),
+                api_url=server.url,
+            )
+            for stage in ("cold", "warm", "intra-day"):
+                server.reset_counters()
+                forecasts = _forecasts(site_ids, period, previous, stage)
+                started = time.perf_counter()
+                await _refresh(client, forecasts)
+                elapsed = time.perf_counter() - started
+                calls = sum(server.calls.values())
+                endpoints = dict(server.calls)
+                kilobytes = server.bytes_sent / 1024
+
+                # Tracing slows everything down, so memory is measured on a
+                # second identical refresh.
+                traced = _forecasts(site_ids, period, previous, stage)
+                tracemalloc.start()
+                await _refresh(client, traced)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                results.append(
+                    (
+                        stage,
+                        {
+                            "calls": calls,
+                            "calls_per_site": calls / site_count,
+                            "endpoints": endpoints,
+                            "kilobytes": kilobytes,
+                            "seconds": elapsed,
+                            "peak_mib": peak / 1024 / 1024,
+                            "backfill_percent": _backfill_percent(forecasts, today),
+                        },
+                    )
+                )
+                previous = forecasts
+    finally:
+        await server.stop()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds per API call"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'sites':>6} {'stage':<10} {'calls':>6} {'calls/site':>10} "
+        f"{'KiB':>8} {'seconds':>8} {'peak MiB':>9} {'backfill %':>10}"
+    )
+    for site_count in args.sites:
+        for stage, result in asyncio.run(benchmark(site_count, args.latency)):
+            print(
+                f"{site_count:>6} {stage:<10} {result['calls']:>6} "
+                f"{result['calls_per_site']:>10.2f} {result['kilobytes']:>8.1f} "
+                f"{result['seconds']:>8.3f} {result['peak_mib']:>9.2f} "
+                f"{result['backfill_percent']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timedelta
+import hashlib
+import re
 from typing import Any
 
 import voluptuous as vol
@@ -16,22 +18,29 @@ from .const import (
     CONF_ACCOUNT_KEY,
     CONF_ENDDAY,
     CONF_ENDMONTH,
+    CONF_INTERPOLATION,
     CONF_SITE_ID,
+    CONF_SITE_IDS,
     CONF_STARTDATE_PRODUCTION,
     CONF_STARTDAY,
     CONF_STARTMONTH,
+    CONF_WEIGHT_HALF_LIFE,
     DEFAULT_ACCOUNT_KEY,
     DEFAULT_ENDDAY,
     DEFAULT_ENDMONTH,
+    DEFAULT_INTERPOLATION,
     DEFAULT_SITE_ID,
     DEFAULT_STARTDATE_PRODUCTION,
     DEFAULT_STARTDAY,
     DEFAULT_STARTMONTH,
+    DEFAULT_WEIGHT_HALF_LIFE,
     DOMAIN,
+    INTERPOLATION_METHODS,
     MONTHS,
 )
 
 DAY_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=1, max=31))
+HALF_LIFE_SCHEMA = vol.All(vol.Coerce(float), vol.Range(min=0, max=50))
 
 
 def _month_number(month: str) -> int:
@@ -73,29 +82,73 @@ def _entry_settings(entry: config_entries.ConfigEntry) -> dict[str, Any]:
         CONF_STARTDATE_PRODUCTION: _entry_value(
             entry, CONF_STARTDATE_PRODUCTION, DEFAULT_STARTDATE_PRODUCTION
         ),
+        CONF_SITE_IDS: _entry_value(entry, CONF_SITE_IDS),
+        CONF_WEIGHT_HALF_LIFE: _entry_value(
+            entry, CONF_WEIGHT_HALF_LIFE, DEFAULT_WEIGHT_HALF_LIFE
+        ),
+        CONF_INTERPOLATION: _entry_value(
+            entry, CONF_INTERPOLATION, DEFAULT_INTERPOLATION
+        ),
     }
 
 
+def _fleet_settings(entry: config_entries.ConfigEntry) -> dict[str, Any]:
+    """Return the settings of a fleet entry as shown in its form."""
+    settings = _entry_settings(entry)
+    del settings[CONF_SITE_ID], settings[CONF_STARTDATE_PRODUCTION]
+    settings[CONF_SITE_IDS] = ", ".join(str(site) for site in settings[CONF_SITE_IDS])
+    return settings
+
+
+def _parse_site_ids(value: str) -> list[int]:
+    """Parse comma or space separated site IDs, an empty list means all sites."""
+    site_ids = [int(site_id) for site_id in re.split(r"[\s,;]+", value) if site_id]
+    if any(site_id <= 0 for site_id in site_ids):
+        raise ValueError("Site IDs must be positive integers")
+    return list(dict.fromkeys(site_ids))
+
+
+def _fleet_unique_id(account_key: str) -> str:
+    """Return a unique ID for the fleet of an account without the key itself."""
+    digest = hashlib.sha256(account_key.strip().encode()).hexdigest()
+    return f"fleet_{digest[:16]}"
+
+
+def _configured_site_ids(
+    hass: HomeAssistant, ignore_entry_id: str | None = None
+) -> set[int]:
+    """Return the sites of single site and fleet entries.
+
+    Fleets that add every site of their account only know their sites once
+    they have been set up.
+    """
+    coordinators = hass.data.get(DOMAIN, {})
+    site_ids: set[int] = set()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.entry_id == ignore_entry_id:
+            continue
+        entry_site_ids = _entry_value(entry, CONF_SITE_IDS)
+        if entry_site_ids is None:
+            entry_site_ids = [_entry_value(entry, CONF_SITE_ID)]
+        elif not entry_site_ids:
+            entry_site_ids = getattr(coordinators.get(entry.entry_id), "site_ids", [])
+        for site_id in entry_site_ids:
+            try:
+                site_ids.add(int(site_id))
+            except (TypeError, ValueError):
+                continue
+    return site_ids
+
+
 def _site_id_exists(
     hass: HomeAssistant, site_id: int | str, ignore_entry_id: str | None = None
 ) -> bool:
-    """Return whether the site ID is already configured."""
+    """Return whether the site ID is already configured, also in a fleet."""
     try:
         normalized_site_id = int(site_id)
     except (TypeError, ValueError):
         return False
-
-    for entry in hass.config_entries.async_entries(DOMAIN):
-        if entry.entry_id == ignore_entry_id:
-            continue
-        configured_site_id = _entry_value(entry, CONF_SITE_ID)
-        try:
-            configured_site_id = int(configured_site_id)
-        except (TypeError, ValueError):
-            continue
-        if configured_site_id == normalized_site_id:
-            return True
-    return False
+    return normalized_site_id in _configured_site_ids(hass, ignore_entry_id)
 
 
 def _validate_user_input(user_input: dict[str, Any]) -> dict[str, str]:
@@ -139,6 +192,33 @@ def _validate_user_input(user_input: dict[str, Any]) -> dict[str, str]:
     return errors
 
 
+def _validate_fleet_input(
+    user_input: dict[str, Any], configured_site_ids: set[int]
+) -> dict[str, str]:
+    """Validate fleet config or options flow input.
+
+    Sites of other entries are rejected, they would get a second set of
+    sensors and share their cached history with the other entry.
+    """
+    errors = _validate_user_input(user_input)
+    try:
+        site_ids = _parse_site_ids(user_input.get(CONF_SITE_IDS, ""))
+    except ValueError:
+        errors[CONF_SITE_IDS] = "invalid_site_ids"
+    else:
+        if configured_site_ids.intersection(site_ids):
+            errors[CONF_SITE_IDS] = "site_ids_configured"
+    return errors
+
+
+def _fleet_entry_data(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Return fleet input with the site IDs as a list."""
+    return {
+        **user_input,
+        CONF_SITE_IDS: _parse_site_ids(user_input.get(CONF_SITE_IDS, "")),
+    }
+
+
 def _period_contains_today(user_input: dict[str, Any], today: date) -> bool:
     """Return whether the forecast period contains today."""
     startdate = _day_month_to_date(
@@ -171,22 +251,7 @@ def _schema(defaults: dict[str, Any] | None = None) -> vol.Schema:
         {
             site_id: cv.positive_int,
             account_key: cv.string,
-            vol.Required(
-                CONF_STARTDAY,
-                default=defaults.get(CONF_STARTDAY, DEFAULT_STARTDAY),
-            ): DAY_SCHEMA,
-            vol.Required(
-                CONF_STARTMONTH,
-                default=defaults.get(CONF_STARTMONTH, DEFAULT_STARTMONTH),
-            ): vol.In(MONTHS),
-            vol.Required(
-                CONF_ENDDAY,
-                default=defaults.get(CONF_ENDDAY, DEFAULT_ENDDAY),
-            ): DAY_SCHEMA,
-            vol.Required(
-                CONF_ENDMONTH,
-                default=defaults.get(CONF_ENDMONTH, DEFAULT_ENDMONTH),
-            ): vol.In(MONTHS),
+            **_forecast_schema(defaults),
             vol.Optional(
                 CONF_STARTDATE_PRODUCTION,
                 default=defaults.get(
@@ -197,13 +262,67 @@ def _schema(defaults: dict[str, Any] | None = None) -> vol.Schema:
     )
 
 
+def _fleet_schema(defaults: dict[str, Any] | None = None) -> vol.Schema:
+    """Return the fleet config or options form schema."""
+    defaults = defaults or {}
+    account_key = (
+        vol.Required(CONF_ACCOUNT_KEY, default=defaults[CONF_ACCOUNT_KEY])
+        if CONF_ACCOUNT_KEY in defaults
+        else vol.Required(CONF_ACCOUNT_KEY)
+    )
+
+    return vol.Schema(
+        {
+            account_key: cv.string,
+            vol.Optional(
+                CONF_SITE_IDS, default=defaults.get(CONF_SITE_IDS, "")
+            ): cv.string,
+            **_forecast_schema(defaults),
+        }
+    )
+
+
+def _forecast_schema(defaults: dict[str, Any]) -> dict[Any, Any]:
+    """Return the form fields of the forecast period and its statistics."""
+    return {
+        vol.Required(
+            CONF_STARTDAY,
+            default=defaults.get(CONF_STARTDAY, DEFAULT_STARTDAY),
+        ): DAY_SCHEMA,
+        vol.Required(
+            CONF_STARTMONTH,
+            default=defaults.get(CONF_STARTMONTH, DEFAULT_STARTMONTH),
+        ): vol.In(MONTHS),
+        vol.Required(
+            CONF_ENDDAY,
+            default=defaults.get(CONF_ENDDAY, DEFAULT_ENDDAY),
+        ): DAY_SCHEMA,
+        vol.Required(
+            CONF_ENDMONTH,
+            default=defaults.get(CONF_ENDMONTH, DEFAULT_ENDMONTH),
+        ): vol.In(MONTHS),
+        vol.Optional(
+            CONF_WEIGHT_HALF_LIFE,
+            default=defaults.get(CONF_WEIGHT_HALF_LIFE, DEFAULT_WEIGHT_HALF_LIFE),
+        ): HALF_LIFE_SCHEMA,
+        vol.Optional(
+            CONF_INTERPOLATION,
+            default=defaults.get(CONF_INTERPOLATION, DEFAULT_INTERPOLATION),
+        ): vol.In(INTERPOLATION_METHODS),
+    }
+
+
 class SolaredgeForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for SolarEdge Forecast."""
 
     VERSION = 1
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
-        """Handle the initial setup step."""
+        """Let the user choose between a single site and a fleet."""
+        return self.async_show_menu(step_id="user", menu_options=["site", "fleet"])
+
+    async def async_step_site(self, user_input: dict[str, Any] | None = None):
+        """Handle the setup of a single site."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -220,11 +339,35 @@ class SolaredgeForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="site",
             data_schema=_schema(user_input),
             errors=errors,
         )
 
+    async def async_step_fleet(self, user_input: dict[str, Any] | None = None):
+        """Handle the setup of many sites of one account."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            errors = _validate_fleet_input(
+                user_input, _configured_site_ids(self.hass)
+            )
+            if not errors:
+                await self.async_set_unique_id(
+                    _fleet_unique_id(user_input[CONF_ACCOUNT_KEY])
+                )
+                self._abort_if_unique_id_configured()
+                return self.async_create_entry(
+                    title="SolarEdge Forecast fleet",
+                    data=_fleet_entry_data(user_input),
+                )
+
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=_fleet_schema(user_input),
+            errors=errors,
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(
@@ -243,6 +386,9 @@ class SolaredgeForecastOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
         """Handle options submitted by the user."""
+        if _entry_value(self.config_entry, CONF_SITE_IDS) is not None:
+            return await self.async_step_fleet(user_input)
+
         errors: dict[str, str] = {}
         defaults = (
             user_input if user_input is not None else _entry_settings(self.config_entry)
@@ -268,3 +414,27 @@ class SolaredgeForecastOptionsFlowHandler(config_entries.OptionsFlow):
             data_schema=_schema(defaults),
             errors=errors,
         )
+
+    async def async_step_fleet(self, user_input: dict[str, Any] | None = None):
+        """Handle fleet options submitted by the user."""
+        errors: dict[str, str] = {}
+        defaults = (
+            user_input if user_input is not None else _fleet_settings(self.config_entry)
+        )
+
+        if user_input is not None:
+            errors = _validate_fleet_input(
+                user_input,
+                _configured_site_ids(self.hass, self.config_entry.entry_id),
+            )
+            if not errors:
+                return self.async_create_entry(
+                    title="SolarEdge Forecast fleet",
+                    data=_fleet_entry_data(user_input),
+                )
+
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=_fleet_schema(defaults),
+            errors=errors,
+        )
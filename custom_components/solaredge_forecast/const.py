@@ -2,25 +2,29 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-
-from homeassistant.components.sensor import (
-    SensorDeviceClass,
-    SensorEntityDescription,
-    SensorStateClass,
-)
-from homeassistant.const import UnitOfEnergy
-
 DOMAIN = "solaredge_forecast"
+DATA_CLIENTS = f"{DOMAIN}_clients"
+DATA_CLIENT_FACTORY = f"{DOMAIN}_client_factory"
+
+STORAGE_VERSION_HISTORY = 1
+STORAGE_KEY_HISTORY = f"{DOMAIN}.history"
+HISTORY_DIRECTORY = f"{DOMAIN}_history"
+STORAGE_VERSION_INTRADAY = 1
+STORAGE_KEY_INTRADAY = f"{DOMAIN}.intraday"
+STORAGE_VERSION_SNAPSHOT = 1
+STORAGE_KEY_SNAPSHOT = f"{DOMAIN}.snapshot"
 
 # Default config for solaredge forecast integration.
 CONF_ACCOUNT_KEY = "account key"
 CONF_SITE_ID = "site id"
+CONF_SITE_IDS = "site ids"
 CONF_STARTDAY = "startday"
 CONF_STARTMONTH = "startmonth"
 CONF_ENDDAY = "endday"
 CONF_ENDMONTH = "endmonth"
 CONF_STARTDATE_PRODUCTION = "startdate production"
+CONF_WEIGHT_HALF_LIFE = "weight half life"
+CONF_INTERPOLATION = "interpolation"
 
 DEFAULT_ACCOUNT_KEY = ""
 DEFAULT_SITE_ID = 0
@@ -29,6 +33,12 @@ DEFAULT_STARTMONTH = "January"
 DEFAULT_ENDDAY = 31
 DEFAULT_ENDMONTH = "December"
 DEFAULT_STARTDATE_PRODUCTION = ""
+DEFAULT_WEIGHT_HALF_LIFE = 0
+DEFAULT_INTERPOLATION = "linear"
+
+# Strategies of solaredgeforecast.interpolation, day_length uses the home
+# location's latitude.
+INTERPOLATION_METHODS = ["linear", "pchip", "day_length"]
 
 MONTHS = [
     "January",
@@ -44,68 +54,3 @@ MONTHS = [
     "November",
     "December",
 ]
-
-
-@dataclass
-class SolaredgeForecastSensorEntityDescription(SensorEntityDescription):
-    """Describes Solaredge Forecast sensor entity."""
-
-
-SENSOR_TYPES: tuple[SolaredgeForecastSensorEntityDescription, ...] = (
-    SolaredgeForecastSensorEntityDescription(
-        key="solaredge_forecast",
-        name="Solar energy forecast",
-        icon="mdi:solar-power",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL,
-    ),
-    SolaredgeForecastSensorEntityDescription(
-        key="solaredge_produced",
-        name="Solar energy produced",
-        icon="mdi:solar-power",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL,
-    ),
-    SolaredgeForecastSensorEntityDescription(
-        key="solaredge_estimated",
-        name="Solar energy expected",
-        icon="mdi:solar-power",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL,
-    ),
-    SolaredgeForecastSensorEntityDescription(
-        key="solaredge_progress",
-        name="Solar energy progress",
-        icon="mdi:solar-power",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL,
-    ),
-    SolaredgeForecastSensorEntityDescription(
-        key="startdate",
-        name="Start date forecast period",
-        icon="mdi:calendar",
-        native_unit_of_measurement=None,
-        device_class=SensorDeviceClass.DATE,
-        state_class=None,
-    ),
-    SolaredgeForecastSensorEntityDescription(
-        key="enddate",
-        name="End date forecast period",
-        icon="mdi:calendar",
-        native_unit_of_measurement=None,
-        device_class=SensorDeviceClass.DATE,
-        state_class=None,
-    ),
-    SolaredgeForecastSensorEntityDescription(
-        key="startdate_production",
-        name="Start date energy production",
-        icon="mdi:calendar",
-        native_unit_of_measurement=None,
-        device_class=SensorDeviceClass.DATE,
-        state_class=None,
-    ),
-)
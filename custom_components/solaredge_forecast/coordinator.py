@@ -0,0 +1,703 @@
+"""Coordinators that refresh SolarEdge forecasts."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from datetime import date, datetime, timedelta
+import hashlib
+import json
+import logging
+from math import ceil
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import SUN_EVENT_SUNRISE, SUN_EVENT_SUNSET
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.sun import get_astral_event_date
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ACCOUNT_KEY,
+    CONF_ENDDAY,
+    CONF_ENDMONTH,
+    CONF_INTERPOLATION,
+    CONF_SITE_ID,
+    CONF_SITE_IDS,
+    CONF_STARTDATE_PRODUCTION,
+    CONF_STARTDAY,
+    CONF_STARTMONTH,
+    CONF_WEIGHT_HALF_LIFE,
+    DATA_CLIENT_FACTORY,
+    DATA_CLIENTS,
+    DEFAULT_ACCOUNT_KEY,
+    DEFAULT_ENDDAY,
+    DEFAULT_ENDMONTH,
+    DEFAULT_INTERPOLATION,
+    DEFAULT_SITE_ID,
+    DEFAULT_STARTDATE_PRODUCTION,
+    DEFAULT_STARTDAY,
+    DEFAULT_STARTMONTH,
+    DEFAULT_WEIGHT_HALF_LIFE,
+    DOMAIN,
+    INTERPOLATION_METHODS,
+    MONTHS,
+)
+from .history import (
+    SolaredgeHistoryStore,
+    SolaredgeIntradayStore,
+    SolaredgeSnapshotStore,
+)
+from .scheduler import (
+    SUNSET_MARGIN,
+    SolaredgeRequestScheduler,
+    daylight_delay,
+    production_stretch,
+)
+from .solaredgeforecast import SolaredgeForecast
+from .solaredgeforecast.api import SolaredgeApiClient
+from .solaredgeforecast.batching import MAX_BULK_SITES
+from .solaredgeforecast.errors import is_throttling_error, is_transient_error
+from .solaredgeforecast.period import active_forecast_period
+from .util import redact_sensitive_values
+
+_LOGGER = logging.getLogger(__package__)
+
+UPDATE_INTERVAL = timedelta(minutes=15)
+
+
+def entry_settings(entry: ConfigEntry) -> dict[str, Any]:
+    """Return settings for an entry, supporting legacy option-only entries."""
+    return {
+        CONF_SITE_ID: entry.options.get(
+            CONF_SITE_ID, entry.data.get(CONF_SITE_ID, DEFAULT_SITE_ID)
+        ),
+        CONF_ACCOUNT_KEY: entry.options.get(
+            CONF_ACCOUNT_KEY, entry.data.get(CONF_ACCOUNT_KEY, DEFAULT_ACCOUNT_KEY)
+        ),
+        CONF_STARTDAY: entry.options.get(
+            CONF_STARTDAY, entry.data.get(CONF_STARTDAY, DEFAULT_STARTDAY)
+        ),
+        CONF_STARTMONTH: entry.options.get(
+            CONF_STARTMONTH, entry.data.get(CONF_STARTMONTH, DEFAULT_STARTMONTH)
+        ),
+        CONF_ENDDAY: entry.options.get(
+            CONF_ENDDAY, entry.data.get(CONF_ENDDAY, DEFAULT_ENDDAY)
+        ),
+        CONF_ENDMONTH: entry.options.get(
+            CONF_ENDMONTH, entry.data.get(CONF_ENDMONTH, DEFAULT_ENDMONTH)
+        ),
+        CONF_STARTDATE_PRODUCTION: entry.options.get(
+            CONF_STARTDATE_PRODUCTION,
+            entry.data.get(CONF_STARTDATE_PRODUCTION, DEFAULT_STARTDATE_PRODUCTION),
+        ),
+        CONF_SITE_IDS: entry.options.get(CONF_SITE_IDS, entry.data.get(CONF_SITE_IDS)),
+        CONF_WEIGHT_HALF_LIFE: entry.options.get(
+            CONF_WEIGHT_HALF_LIFE,
+            entry.data.get(CONF_WEIGHT_HALF_LIFE, DEFAULT_WEIGHT_HALF_LIFE),
+        ),
+        CONF_INTERPOLATION: entry.options.get(
+            CONF_INTERPOLATION,
+            entry.data.get(CONF_INTERPOLATION, DEFAULT_INTERPOLATION),
+        ),
+    }
+
+
+def is_fleet_entry(entry: ConfigEntry) -> bool:
+    """Return whether an entry serves a list of sites."""
+    return entry_settings(entry)[CONF_SITE_IDS] is not None
+
+
+def entry_site_ids(entry: ConfigEntry) -> list[int]:
+    """Return the configured sites of an entry, skipping invalid site IDs.
+
+    Sites that a fleet entry discovers itself are not included.
+    """
+    settings = entry_settings(entry)
+    site_ids = (
+        settings[CONF_SITE_IDS] if is_fleet_entry(entry) else [settings[CONF_SITE_ID]]
+    )
+    valid_site_ids = []
+    for site_id in site_ids:
+        try:
+            valid_site_ids.append(int(site_id))
+        except (TypeError, ValueError):
+            continue
+    return valid_site_ids
+
+
+def _month_number(month: str) -> int:
+    """Return the month number for an English month name."""
+    return MONTHS.index(month) + 1
+
+
+class SolaredgeCoordinator(DataUpdateCoordinator, ABC):
+    """Shared state of single site and fleet coordinators."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, settings: dict[str, Any]
+    ) -> None:
+        """Initialize the coordinator."""
+        try:
+            super().__init__(
+                hass,
+                _LOGGER,
+                config_entry=entry,
+                name="SolarEdge Forecast",
+                update_interval=UPDATE_INTERVAL,
+            )
+        except TypeError:
+            super().__init__(
+                hass,
+                _LOGGER,
+                name="SolarEdge Forecast",
+                update_interval=UPDATE_INTERVAL,
+            )
+
+        account_key = str(settings[CONF_ACCOUNT_KEY]).strip()
+        try:
+            start_day = int(settings[CONF_STARTDAY])
+            end_day = int(settings[CONF_ENDDAY])
+            weight_half_life = float(settings[CONF_WEIGHT_HALF_LIFE])
+        except (TypeError, ValueError) as err:
+            raise ValueError("SolarEdge Forecast configuration is invalid") from err
+
+        if not account_key:
+            raise ValueError("SolarEdge account key is required")
+        if settings[CONF_INTERPOLATION] not in INTERPOLATION_METHODS:
+            raise ValueError("SolarEdge Forecast interpolation is unknown")
+
+        self.account_key = account_key
+        self.start_day = start_day
+        self.start_month = settings[CONF_STARTMONTH]
+        self.end_day = end_day
+        self.end_month = settings[CONF_ENDMONTH]
+        self.weight_half_life = weight_half_life
+        self.interpolation = settings[CONF_INTERPOLATION]
+        self.latitude = hass.config.latitude
+        self.unique_id = entry.entry_id
+        self.name = entry.title
+        self.client = _account_client(hass, account_key)
+        self.scheduler = self.client.scheduler
+        self.last_refresh_duration: float | None = None
+        self.last_refresh_success: datetime | None = None
+        self._settings_hash = _settings_hash(settings)
+        self._snapshot_store = SolaredgeSnapshotStore(hass, entry.entry_id)
+        self._last_production: tuple[float, float] | None = None
+        self._diagnostic_sensors: set[str] = set()
+        self._update_metrics_enabled()
+
+        self.startdate = ""
+        self.enddate = ""
+        self._period_day: date | None = None
+        self._update_forecast_period(dt_util.now().date())
+
+    @property
+    def api_calls_today(self) -> int:
+        """Return the requests made today on this entry's account key."""
+        return self.scheduler.used
+
+    @property
+    def backfill_progress(self) -> float | None:
+        """Return the percentage of the intraday history that has been fetched."""
+        if self.data is None:
+            return None
+        progress = [
+            forecast.backfill_progress
+            for forecast in self._forecast_list(self.data)
+            if forecast.backfill_progress is not None
+        ]
+        if not progress:
+            return None
+        return round(100 * sum(progress) / len(progress), 1)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Serve the last saved forecast until a deferred first refresh.
+
+        Returns False when there is no snapshot for the current settings and
+        forecast period, the first refresh then has to run right away.
+        """
+        snapshot = await self._snapshot_store.async_load()
+        if (
+            not snapshot
+            or snapshot.get("settings") != self._settings_hash
+            or snapshot.get("period") != [self.startdate, self.enddate]
+        ):
+            return False
+        try:
+            data = self._restore_data(snapshot["data"])
+        except (KeyError, TypeError, ValueError) as err:
+            self.logger.debug("Ignoring invalid SolarEdge forecast snapshot: %s", err)
+            return False
+        if data is None:
+            return False
+
+        self.data = data
+        self.update_interval = self.scheduler.startup_delay(self.unique_id)
+        self.logger.debug(
+            "Restored SolarEdge forecast snapshot, refreshing in %s",
+            self.update_interval,
+        )
+        return True
+
+    @abstractmethod
+    def _restore_data(self, data: Any) -> Any:
+        """Return coordinator data from a snapshot, or None if it does not fit."""
+
+    @abstractmethod
+    def _snapshot_data(self) -> Any:
+        """Return the coordinator data in a JSON serializable form."""
+
+    @abstractmethod
+    def _forecast_list(self, data: Any) -> list[SolaredgeForecast]:
+        """Return the forecasts in coordinator data."""
+
+    def _snapshot(self) -> dict[str, Any]:
+        """Return the snapshot to save."""
+        return {
+            "settings": self._settings_hash,
+            "period": [self.startdate, self.enddate],
+            "data": self._snapshot_data(),
+        }
+
+    def _register(self, live_calls: int = 1) -> None:
+        """Join the refresh rotation of the account."""
+        self.scheduler.register(self.unique_id, live_calls)
+        self.update_interval = self.scheduler.update_interval()
+
+    def _update_forecast_period(self, today: date) -> None:
+        """Move to the forecast period of today, once per calendar day."""
+        if today == self._period_day:
+            return
+
+        startdate, enddate = active_forecast_period(
+            _month_number(self.start_month),
+            self.start_day,
+            _month_number(self.end_month),
+            self.end_day,
+            today,
+        )
+        startdate_str = startdate.strftime("%Y%m%d")
+        enddate_str = enddate.strftime("%Y%m%d")
+        if self._period_day is not None and startdate_str != self.startdate:
+            self.logger.info(
+                "Moving SolarEdge forecast to the period %s - %s",
+                startdate.isoformat(),
+                enddate.isoformat(),
+            )
+
+        self.startdate = startdate_str
+        self.enddate = enddate_str
+        self._period_day = today
+
+    def _refresh_failed(self, err: Exception, started: float):
+        """Record a failed refresh and return the data to keep, if any."""
+        self.last_refresh_duration = time.perf_counter() - started
+        self.client.metrics.increment("refresh_failures")
+        message = redact_sensitive_values(str(err))
+        if is_throttling_error(err):
+            self.scheduler.record_throttled()
+        self._schedule_next_slot()
+        if self.data is not None and is_transient_error(err):
+            self.logger.warning(
+                "Keeping previous SolarEdge forecast data after transient update "
+                "error: %s",
+                message,
+            )
+            return self.data
+
+        raise UpdateFailed(f"Error updating SolarEdge forecast: {message}") from err
+
+    def _refresh_succeeded(self, started: float, data: Any) -> None:
+        """Record a successful refresh of data."""
+        self.last_refresh_duration = time.perf_counter() - started
+        self.last_refresh_success = dt_util.utcnow()
+        self.scheduler.record_success()
+        self._schedule_next_slot(self._forecast_list(data))
+        self._snapshot_store.async_delay_save(self._snapshot)
+
+    def _schedule_next_slot(
+        self, forecasts: list[SolaredgeForecast] | None = None
+    ) -> None:
+        """Move the next refresh to this entry's slot, skipping the night.
+
+        With fresh forecasts the interval is stretched while today's
+        production grows slower than estimated.
+        """
+        now = dt_util.now()
+        sunrise = get_astral_event_date(self.hass, SUN_EVENT_SUNRISE, now.date())
+        sunset = get_astral_event_date(self.hass, SUN_EVENT_SUNSET, now.date())
+        if sunrise is None or sunset is None:
+            # Polar day or night, refresh around the clock.
+            self.scheduler.daylight = timedelta(days=1)
+            self.update_interval = self.scheduler.next_refresh_delay(self.unique_id)
+            return
+
+        daylight = sunset + SUNSET_MARGIN - sunrise
+        self.scheduler.daylight = daylight
+        delay = self.scheduler.next_refresh_delay(self.unique_id)
+        if forecasts is not None:
+            delay *= self._production_stretch(forecasts, daylight)
+        self.update_interval = daylight_delay(
+            now,
+            delay,
+            sunrise,
+            sunset,
+            dt_util.start_of_local_day(now.date() + timedelta(days=1)),
+            self.scheduler.stagger(self.unique_id),
+        )
+
+    def _production_stretch(
+        self, forecasts: list[SolaredgeForecast], daylight: timedelta
+    ) -> float:
+        """Return the interval stretch for the production since the last call."""
+        produced = sum(forecast.solaredge_produced or 0 for forecast in forecasts)
+        estimated = sum(
+            forecast.baseline.estimated_today
+            for forecast in forecasts
+            if forecast.baseline is not None
+        )
+        now = time.monotonic()
+        previous, self._last_production = self._last_production, (now, produced)
+        if previous is None or produced < previous[1] or now <= previous[0]:
+            return 1.0
+
+        hours = (now - previous[0]) / 3600
+        daylight_hours = daylight.total_seconds() / 3600
+        return production_stretch(
+            (produced - previous[1]) / hours, estimated / daylight_hours
+        )
+
+    def set_diagnostic_sensor(self, entity_id: str, enabled: bool) -> None:
+        """Record whether a diagnostic sensor of this entry is enabled."""
+        if enabled:
+            self._diagnostic_sensors.add(entity_id)
+        else:
+            self._diagnostic_sensors.discard(entity_id)
+        self._update_metrics_enabled()
+
+    def _update_metrics_enabled(self) -> None:
+        """Time the refresh stages while a diagnostic sensor is enabled.
+
+        The metrics belong to the shared account client, so they stay on as
+        long as any entry of the account has an enabled diagnostic sensor.
+        Counters are kept either way.
+        """
+        coordinators = [
+            self,
+            *(
+                coordinator
+                for coordinator in self.hass.data.get(DOMAIN, {}).values()
+                if isinstance(coordinator, SolaredgeCoordinator)
+                and coordinator is not self
+                and coordinator.client is self.client
+            ),
+        ]
+        self.client.metrics.enabled = any(
+            coordinator._diagnostic_sensors for coordinator in coordinators
+        )
+
+    def release_client(self) -> None:
+        """Remove this entry from the shared account client."""
+        self.scheduler.unregister(self.unique_id)
+        if not self.scheduler.entries:
+            self.hass.data.get(DATA_CLIENTS, {}).pop(self.account_key, None)
+
+
+class SolaredgeForecastData(SolaredgeCoordinator):
+    """Get and update SolarEdge forecast data."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        settings = entry_settings(entry)
+        super().__init__(hass, entry, settings)
+        try:
+            site_id = int(settings[CONF_SITE_ID])
+        except (TypeError, ValueError) as err:
+            raise ValueError("SolarEdge Forecast configuration is invalid") from err
+        if site_id <= 0:
+            raise ValueError("SolarEdge site ID must be a positive integer")
+
+        self.site_id = site_id
+        start_date_production = settings[CONF_STARTDATE_PRODUCTION] or ""
+        self.start_date_production = (
+            str(start_date_production)
+            .replace("/", "")
+            .replace("-", "")
+            .replace(" ", "")
+        )
+        self._history = SolaredgeHistoryStore(hass, site_id)
+        self._intraday = SolaredgeIntradayStore(hass, site_id)
+        self._register()
+
+    @property
+    def site_ids(self) -> list[int]:
+        """Return the site of this entry."""
+        return [self.site_id]
+
+    def _restore_data(self, data: Any) -> SolaredgeForecast | None:
+        """Return the forecast from a snapshot of this site."""
+        if data["site_id"] != self.site_id:
+            return None
+        return SolaredgeForecast.from_snapshot(data)
+
+    def _snapshot_data(self) -> dict[str, Any] | None:
+        """Return the forecast in a JSON serializable form."""
+        return self.data.as_snapshot() if self.data is not None else None
+
+    def _forecast_list(self, data: SolaredgeForecast) -> list[SolaredgeForecast]:
+        """Return the forecast of the site."""
+        return [data]
+
+    async def _async_update_data(self):
+        """Update data from SolarEdge."""
+        now = _local_now()
+        self._update_forecast_period(now.date())
+        started = time.perf_counter()
+        try:
+            history = await self._history.async_load()
+            intraday = await self._intraday.async_load()
+            data = SolaredgeForecast(
+                self.startdate,
+                self.enddate,
+                self.start_date_production,
+                self.site_id,
+                history,
+                self.data.baseline if self.data is not None else None,
+                intraday,
+                self.weight_half_life,
+                self._intraday.async_checkpoint,
+                self.interpolation,
+                self.latitude,
+            )
+            await data.async_update(self.client, now)
+        except Exception as err:
+            return self._refresh_failed(err, started)
+
+        self._refresh_succeeded(started, data)
+        await self._history.async_save(data.history)
+        await self._intraday.async_save(data.intraday)
+        self.logger.debug(
+            "SolarEdge forecast update succeeded in %.3f s: %s",
+            self.last_refresh_duration,
+            data,
+        )
+        return data
+
+
+class SolaredgeFleetData(SolaredgeCoordinator):
+    """Get and update SolarEdge forecast data for many sites of one account.
+
+    All sites are refreshed together in one pass, so their requests end up in
+    the same bulk calls, and the entry needs a single timer however many
+    sites it has. Without configured site IDs every site of the account is
+    added on the first refresh.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        settings = entry_settings(entry)
+        super().__init__(hass, entry, settings)
+        try:
+            site_ids = [int(site_id) for site_id in settings[CONF_SITE_IDS]]
+        except (TypeError, ValueError) as err:
+            raise ValueError("SolarEdge Forecast configuration is invalid") from err
+        if any(site_id <= 0 for site_id in site_ids):
+            raise ValueError("SolarEdge site IDs must be positive integers")
+
+        self.site_ids = list(dict.fromkeys(site_ids))
+        self.site_names: dict[int, str] = {}
+        self._discover = not self.site_ids
+        self._stores: dict[
+            int, tuple[SolaredgeHistoryStore, SolaredgeIntradayStore]
+        ] = {}
+        self._register(_fleet_live_calls(self.site_ids))
+
+    def site_name(self, site_id: int) -> str:
+        """Return the name of a site in entity names."""
+        return self.site_names.get(site_id) or f"SolarEdge {site_id}"
+
+    def _restore_data(self, data: Any) -> dict[int, SolaredgeForecast] | None:
+        """Return the forecasts from a snapshot, including discovered sites."""
+        site_ids = [int(site_id) for site_id in data["site_ids"]]
+        if self.site_ids and site_ids != self.site_ids:
+            return None
+        forecasts = {
+            int(site_id): SolaredgeForecast.from_snapshot(forecast)
+            for site_id, forecast in data["forecasts"].items()
+        }
+        if not self.site_ids:
+            self.site_ids = site_ids
+            self.site_names = {
+                int(site_id): name for site_id, name in data["site_names"].items()
+            }
+            self._register(_fleet_live_calls(self.site_ids))
+        return forecasts
+
+    def _forecast_list(
+        self, data: dict[int, SolaredgeForecast]
+    ) -> list[SolaredgeForecast]:
+        """Return the forecasts of every site."""
+        return list(data.values())
+
+    def _snapshot_data(self) -> dict[str, Any]:
+        """Return the forecasts of every site in a JSON serializable form."""
+        return {
+            "site_ids": self.site_ids,
+            "site_names": self.site_names,
+            "forecasts": {
+                site_id: forecast.as_snapshot()
+                for site_id, forecast in (self.data or {}).items()
+            },
+        }
+
+    async def _async_update_data(self):
+        """Update data from SolarEdge for every site."""
+        now = _local_now()
+        self._update_forecast_period(now.date())
+        started = time.perf_counter()
+        try:
+            if self._discover:
+                await self._async_discover_sites()
+            results = await asyncio.gather(
+                *(self._async_update_site(site_id, now) for site_id in self.site_ids),
+                return_exceptions=True,
+            )
+        except Exception as err:
+            return self._refresh_failed(err, started)
+
+        previous = self.data or {}
+        data: dict[int, SolaredgeForecast] = {}
+        errors: list[Exception] = []
+        for site_id, result in zip(self.site_ids, results):
+            if not isinstance(result, BaseException):
+                data[site_id] = result
+                continue
+            if not isinstance(result, Exception):
+                raise result
+            errors.append(result)
+            if site_id in previous and is_transient_error(result):
+                data[site_id] = previous[site_id]
+
+        if errors and len(errors) == len(self.site_ids):
+            return self._refresh_failed(errors[0], started)
+        if errors:
+            self.client.metrics.increment("refresh_failures.sites", len(errors))
+            if any(is_throttling_error(err) for err in errors):
+                self.scheduler.record_throttled()
+            self.logger.warning(
+                "SolarEdge forecast update failed for %d of %d sites: %s",
+                len(errors),
+                len(self.site_ids),
+                redact_sensitive_values(str(errors[0])),
+            )
+
+        self._refresh_succeeded(started, data)
+        self.logger.debug(
+            "SolarEdge fleet update of %d sites took %.3f s",
+            len(self.site_ids),
+            self.last_refresh_duration,
+        )
+        return data
+
+    async def _async_discover_sites(self) -> None:
+        """Add every site of the account, once per setup.
+
+        Sites restored from a snapshot already have sensors. Sites that were
+        added to the account since then get sensors on the next reload. Sites
+        with an entry of their own are left to that entry.
+        """
+        other_site_ids = {
+            site_id
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.entry_id != self.unique_id
+            for site_id in entry_site_ids(entry)
+        }
+        sites = [
+            site
+            for site in await self.client.get_site_list()
+            if int(site["id"]) not in other_site_ids
+        ]
+        site_ids = [int(site["id"]) for site in sites]
+        if not site_ids:
+            raise ValueError("No sites found for this SolarEdge account key")
+        if self.site_ids and set(site_ids) - set(self.site_ids):
+            self.logger.info(
+                "New SolarEdge sites found, reload the fleet entry to add sensors"
+            )
+
+        self.site_ids = site_ids
+        self.site_names = {
+            int(site["id"]): site["name"] for site in sites if site.get("name")
+        }
+        self._discover = False
+        self._register(_fleet_live_calls(self.site_ids))
+
+    async def _async_update_site(
+        self, site_id: int, now: datetime
+    ) -> SolaredgeForecast:
+        """Update the forecast of one site at a local time."""
+        stores = self._stores.get(site_id)
+        if stores is None:
+            stores = self._stores[site_id] = (
+                SolaredgeHistoryStore(self.hass, site_id),
+                SolaredgeIntradayStore(self.hass, site_id),
+            )
+        history_store, intraday_store = stores
+        previous = self.data.get(site_id) if self.data else None
+
+        data = SolaredgeForecast(
+            self.startdate,
+            self.enddate,
+            "",
+            site_id,
+            await history_store.async_load(),
+            previous.baseline if previous is not None else None,
+            await intraday_store.async_load(),
+            self.weight_half_life,
+            intraday_store.async_checkpoint,
+            self.interpolation,
+            self.latitude,
+        )
+        await data.async_update(self.client, now)
+        await history_store.async_save(data.history)
+        await intraday_store.async_save(data.intraday)
+        return data
+
+
+def _local_now() -> datetime:
+    """Return the time in Home Assistant's time zone as a naive local time.
+
+    The forecast engine splits days and quarter hours in local time, which
+    is not the time zone of the host when Home Assistant runs in a container.
+    """
+    return dt_util.now().replace(tzinfo=None)
+
+
+def _settings_hash(settings: dict[str, Any]) -> str:
+    """Return a digest of entry settings that does not reveal the account key."""
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _fleet_live_calls(site_ids: list[int]) -> int:
+    """Return the bulk requests one refresh of a fleet makes."""
+    return max(1, ceil(len(site_ids) / MAX_BULK_SITES))
+
+
+def _account_client(hass: HomeAssistant, account_key: str) -> SolaredgeApiClient:
+    """Return the API client shared by entries with this account key.
+
+    A different client class, such as one pointed at a replay server, can be
+    registered under DATA_CLIENT_FACTORY before the entries are set up.
+    """
+    clients = hass.data.setdefault(DATA_CLIENTS, {})
+    if account_key not in clients:
+        factory = hass.data.get(DATA_CLIENT_FACTORY, SolaredgeApiClient)
+        clients[account_key] = factory(
+            async_get_clientsession(hass), account_key, SolaredgeRequestScheduler()
+        )
+    return clients[account_key]
@@ -0,0 +1,42 @@
+"""Diagnostics support for SolarEdge Forecast."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ACCOUNT_KEY, DOMAIN
+
+TO_REDACT = {CONF_ACCOUNT_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    scheduler = coordinator.scheduler
+    last_success = coordinator.last_refresh_success
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "refresh": {
+            "last_duration": coordinator.last_refresh_duration,
+            "last_success": last_success.isoformat() if last_success else None,
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "forecast_period": [coordinator.startdate, coordinator.enddate],
+            "sites": len(coordinator.site_ids),
+        },
+        "account": {
+            "entries": len(scheduler.entries),
+            "requests_today": scheduler.used,
+            "daily_budget": scheduler.daily_budget,
+        },
+        "metrics": coordinator.client.metrics.as_dict(),
+    }
@@ -0,0 +1,155 @@
+"""Persistent production history caches for SolarEdge Forecast."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import (
+    HISTORY_DIRECTORY,
+    STORAGE_KEY_HISTORY,
+    STORAGE_KEY_INTRADAY,
+    STORAGE_KEY_SNAPSHOT,
+    STORAGE_VERSION_HISTORY,
+    STORAGE_VERSION_INTRADAY,
+    STORAGE_VERSION_SNAPSHOT,
+)
+from .solaredgeforecast.columnar import (
+    RESOLUTION_MONTH,
+    ColumnarEnergyStore,
+    EnergyColumn,
+    column_from_months,
+)
+from .solaredgeforecast.intraday import IntradayHistory
+
+SNAPSHOT_SAVE_DELAY = 60
+INTRADAY_CHECKPOINT_DELAY = 10
+
+
+class SolaredgeHistoryStore:
+    """Store completed monthly production totals for one SolarEdge site.
+
+    The totals are kept in a binary column that is memory mapped on load,
+    see ``ColumnarEnergyStore``. History cached as JSON by earlier versions
+    is converted on the first load.
+    """
+
+    def __init__(self, hass: HomeAssistant, site_id: int) -> None:
+        """Initialize the history store."""
+        self._hass = hass
+        self._site_id = site_id
+        self._columns = ColumnarEnergyStore(
+            hass.config.path(STORAGE_DIR, HISTORY_DIRECTORY)
+        )
+        self._legacy_store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION_HISTORY, f"{STORAGE_KEY_HISTORY}.{site_id}"
+        )
+        self._data: EnergyColumn | None = None
+        self._loaded = False
+
+    async def async_load(self) -> EnergyColumn | None:
+        """Return the cached history, mapping it from disk once."""
+        if not self._loaded:
+            self._data = await self._hass.async_add_executor_job(
+                self._columns.read, self._site_id, RESOLUTION_MONTH
+            )
+            if self._data is None:
+                await self._async_migrate_legacy()
+            self._loaded = True
+        return self._data
+
+    async def async_save(self, data: EnergyColumn | None) -> None:
+        """Persist the history when it changed."""
+        if data is None or data is self._data:
+            return
+        self._data = data
+        await self._hass.async_add_executor_job(
+            self._columns.write, self._site_id, data
+        )
+
+    async def async_remove(self) -> None:
+        """Remove the cached history from disk."""
+        self._data = None
+        self._loaded = False
+        await self._hass.async_add_executor_job(self._columns.remove, self._site_id)
+        await self._legacy_store.async_remove()
+
+    async def _async_migrate_legacy(self) -> None:
+        """Move history cached as JSON into the binary column."""
+        legacy = await self._legacy_store.async_load()
+        if not legacy:
+            return
+        production_start = legacy.get("production_start")
+        data = column_from_months(
+            legacy.get("months", {}),
+            date.fromisoformat(production_start) if production_start else None,
+        )
+        await self.async_save(data)
+        await self._legacy_store.async_remove()
+
+
+class SolaredgeIntradayStore:
+    """Store quarter-hour production for one SolarEdge site."""
+
+    def __init__(self, hass: HomeAssistant, site_id: int) -> None:
+        """Initialize the intraday store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION_INTRADAY, f"{STORAGE_KEY_INTRADAY}.{site_id}"
+        )
+        self._data: IntradayHistory | None = None
+
+    async def async_load(self) -> IntradayHistory:
+        """Return the cached intraday history, loading it from disk once."""
+        if self._data is None:
+            self._data = IntradayHistory.from_dict(await self._store.async_load())
+        return self._data
+
+    async def async_save(self, data: IntradayHistory) -> None:
+        """Persist the intraday history when it changed."""
+        self._data = data
+        if not data.modified:
+            return
+        await self._store.async_save(data.as_dict())
+        data.modified = False
+
+    def async_checkpoint(self) -> None:
+        """Save the loaded history soon, or when Home Assistant stops.
+
+        Called while a backfill is running, so the chunks fetched so far are
+        kept when the refresh does not finish.
+        """
+        if self._data is not None:
+            self._store.async_delay_save(
+                self._data.as_dict, INTRADAY_CHECKPOINT_DELAY
+            )
+
+    async def async_remove(self) -> None:
+        """Remove the cached intraday history from disk."""
+        self._data = None
+        await self._store.async_remove()
+
+
+class SolaredgeSnapshotStore:
+    """Store the last forecast of a config entry for a fast restart."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION_SNAPSHOT, f"{STORAGE_KEY_SNAPSHOT}.{entry_id}"
+        )
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Return the saved snapshot."""
+        return await self._store.async_load()
+
+    def async_delay_save(self, data_func: Callable[[], dict[str, Any]]) -> None:
+        """Save a snapshot soon, or when Home Assistant stops."""
+        self._store.async_delay_save(data_func, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot from disk."""
+        await self._store.async_remove()
@@ -0,0 +1,193 @@
+"""Share the SolarEdge request quota between config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from math import ceil
+import time
+
+DAILY_REQUEST_BUDGET = 300
+PLANNED_BUDGET_SHARE = 0.8
+LIVE_CALLS_PER_REFRESH = 1
+MIN_UPDATE_INTERVAL = timedelta(minutes=15)
+STARTUP_DELAY = timedelta(seconds=30)
+ENTRY_SPACING = timedelta(seconds=10)
+SUNSET_MARGIN = timedelta(minutes=30)
+ROLLOVER_DELAY = timedelta(minutes=5)
+MAX_IDLE_STRETCH = 4.0
+MAX_BACKOFF = 16
+MAX_CONCURRENT_REQUESTS = 3
+
+PRIORITY_LIVE = "live"
+PRIORITY_HISTORY = "history"
+
+
+class SolaredgeRequestScheduler:
+    """Budget SolarEdge requests for all entries sharing an account key."""
+
+    def __init__(
+        self,
+        daily_budget: int = DAILY_REQUEST_BUDGET,
+        min_interval: timedelta = MIN_UPDATE_INTERVAL,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.daily_budget = daily_budget
+        self.min_interval = min_interval
+        self._entries: list[str] = []
+        self._live_calls: dict[str, int] = {}
+        self._backoff = 1.0
+        self._day = datetime.now().date()
+        self._used = 0
+        self._anchor = time.monotonic()
+        self.daylight = timedelta(days=1)
+        self.concurrency = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    @property
+    def entries(self) -> list[str]:
+        """Return the registered entry IDs."""
+        return list(self._entries)
+
+    @property
+    def used(self) -> int:
+        """Return the number of requests made today."""
+        self._reset_if_new_day(datetime.now())
+        return self._used
+
+    def register(
+        self, entry_id: str, live_calls: int = LIVE_CALLS_PER_REFRESH
+    ) -> None:
+        """Add an entry that makes live_calls requests per refresh."""
+        if entry_id not in self._entries:
+            self._entries.append(entry_id)
+        self._live_calls[entry_id] = live_calls
+
+    def unregister(self, entry_id: str) -> None:
+        """Remove an entry from the refresh rotation."""
+        if entry_id in self._entries:
+            self._entries.remove(entry_id)
+        self._live_calls.pop(entry_id, None)
+
+    def update_interval(self) -> timedelta:
+        """Return the refresh interval that keeps all entries within budget.
+
+        The planned requests are spread over the hours of daylight, entries
+        do not refresh at night.
+        """
+        planned_calls = self.daily_budget * PLANNED_BUDGET_SHARE
+        refreshes_per_day = planned_calls / self._live_calls_per_refresh()
+        interval = max(
+            self.min_interval.total_seconds(),
+            min(self.daylight, timedelta(days=1)).total_seconds() / refreshes_per_day,
+        )
+        return timedelta(seconds=interval * self._backoff)
+
+    def next_refresh_delay(self, entry_id: str) -> timedelta:
+        """Return the delay until the entry's staggered refresh slot."""
+        interval = self.update_interval().total_seconds()
+        try:
+            index = self._entries.index(entry_id)
+        except ValueError:
+            return timedelta(seconds=interval)
+
+        phase = interval * index / len(self._entries)
+        elapsed = time.monotonic() - self._anchor - phase
+        delay = interval - elapsed % interval
+        if delay < interval / 2:
+            delay += interval
+        return timedelta(seconds=delay)
+
+    def startup_delay(self, entry_id: str) -> timedelta:
+        """Return the delay of an entry's first refresh after a restart.
+
+        Entries that start from a snapshot refresh one after the other
+        instead of all at once.
+        """
+        return STARTUP_DELAY + self.stagger(entry_id)
+
+    def stagger(self, entry_id: str) -> timedelta:
+        """Return the offset that keeps entries from refreshing all at once."""
+        try:
+            index = self._entries.index(entry_id)
+        except ValueError:
+            index = len(self._entries)
+        return ENTRY_SPACING * index
+
+    def acquire(self, priority: str = PRIORITY_LIVE) -> bool:
+        """Reserve one request, keeping live calls ahead of history calls."""
+        now = datetime.now()
+        self._reset_if_new_day(now)
+        limit = self.daily_budget
+        if priority != PRIORITY_LIVE:
+            limit -= self._live_reserve(now)
+        if self._used >= limit:
+            return False
+        self._used += 1
+        return True
+
+    def record_success(self) -> None:
+        """Relax the backoff after a successful refresh."""
+        self._backoff = max(1.0, self._backoff / 2)
+
+    def record_throttled(self) -> None:
+        """Slow down all entries after SolarEdge throttled a request."""
+        self._backoff = min(MAX_BACKOFF, self._backoff * 2)
+
+    def _live_reserve(self, now: datetime) -> int:
+        """Return the live requests still planned for the rest of today."""
+        midnight = datetime.combine(
+            now.date() + timedelta(days=1), datetime.min.time()
+        )
+        interval = self.update_interval().total_seconds()
+        remaining = min(midnight - now, self.daylight)
+        refreshes = remaining.total_seconds() / interval
+        return ceil(refreshes * sum(self._live_calls.values()))
+
+    def _live_calls_per_refresh(self) -> int:
+        """Return the live requests of one refresh of every entry."""
+        return max(LIVE_CALLS_PER_REFRESH, sum(self._live_calls.values()))
+
+    def _reset_if_new_day(self, now: datetime) -> None:
+        """Reset the request counter when the day changes."""
+        if now.date() != self._day:
+            self._day = now.date()
+            self._used = 0
+
+
+def daylight_delay(
+    now: datetime,
+    delay: timedelta,
+    sunrise: datetime,
+    sunset: datetime,
+    midnight: datetime,
+    stagger: timedelta = timedelta(0),
+) -> timedelta:
+    """Return the delay to the next refresh, skipping the night.
+
+    Refreshes are kept between sunrise and a margin after sunset, when the
+    production changes. At night the next refresh is the first of one just
+    after midnight, for the day rollover, and the next sunrise, shifted by
+    the entry's stagger.
+    """
+    window_end = sunset + SUNSET_MARGIN
+    if sunrise <= now + delay <= window_end:
+        return delay
+
+    candidates = [midnight + ROLLOVER_DELAY]
+    candidates.append(sunrise if now < sunrise else sunrise + timedelta(days=1))
+    if now < window_end:
+        candidates.append(window_end)
+    return min(candidate for candidate in candidates if candidate > now) - now + stagger
+
+
+def production_stretch(rate: float, mean_rate: float) -> float:
+    """Return how much to stretch the interval while production changes slowly.
+
+    ``rate`` is the production per hour since the last refresh and
+    ``mean_rate`` the estimated production of today spread over its daylight.
+    """
+    if mean_rate <= 0:
+        return 1.0
+    if rate <= 0:
+        return MAX_IDLE_STRETCH
+    return min(MAX_IDLE_STRETCH, max(1.0, mean_rate / rate))
@@ -1,19 +1,151 @@
 """Platform for solaredge forecast sensors."""
 
-from homeassistant.components.sensor import SensorEntity
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfTime,
+)
+from homeassistant.core import callback
 from homeassistant.helpers import update_coordinator
 from homeassistant.helpers.entity import StateType
 
-from . import SolaredgeForecastData
-from .const import DOMAIN, SENSOR_TYPES, SolaredgeForecastSensorEntityDescription
+from .const import DOMAIN
+from .coordinator import SolaredgeFleetData, SolaredgeForecastData
+
+
+@dataclass
+class SolaredgeForecastSensorEntityDescription(SensorEntityDescription):
+    """Describes Solaredge Forecast sensor entity."""
+
+    attributes_key: str | None = None
+
+
+SENSOR_TYPES: tuple[SolaredgeForecastSensorEntityDescription, ...] = (
+    SolaredgeForecastSensorEntityDescription(
+        key="solaredge_forecast",
+        name="Solar energy forecast",
+        icon="mdi:solar-power",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+        attributes_key="solaredge_forecast_bands",
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="solaredge_produced",
+        name="Solar energy produced",
+        icon="mdi:solar-power",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="solaredge_estimated",
+        name="Solar energy expected",
+        icon="mdi:solar-power",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="solaredge_progress",
+        name="Solar energy progress",
+        icon="mdi:solar-power",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="startdate",
+        name="Start date forecast period",
+        icon="mdi:calendar",
+        native_unit_of_measurement=None,
+        device_class=SensorDeviceClass.DATE,
+        state_class=None,
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="enddate",
+        name="End date forecast period",
+        icon="mdi:calendar",
+        native_unit_of_measurement=None,
+        device_class=SensorDeviceClass.DATE,
+        state_class=None,
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="startdate_production",
+        name="Start date energy production",
+        icon="mdi:calendar",
+        native_unit_of_measurement=None,
+        device_class=SensorDeviceClass.DATE,
+        state_class=None,
+    ),
+)
+
+DIAGNOSTIC_SENSOR_TYPES: tuple[SolaredgeForecastSensorEntityDescription, ...] = (
+    SolaredgeForecastSensorEntityDescription(
+        key="api_calls_today",
+        name="SolarEdge API calls today",
+        icon="mdi:api",
+        native_unit_of_measurement=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="last_refresh_duration",
+        name="Last refresh duration",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SolaredgeForecastSensorEntityDescription(
+        key="backfill_progress",
+        name="History backfill progress",
+        icon="mdi:progress-download",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Add solaredge forecast entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
+    if isinstance(coordinator, SolaredgeFleetData):
+        sensors = [
+            SolaredgeFleetSensor(coordinator, site_id, description)
+            for site_id in coordinator.site_ids
+            for description in SENSOR_TYPES
+        ]
+    else:
+        sensors = [
+            SolaredgeForecastSensor(coordinator, description)
+            for description in SENSOR_TYPES
+        ]
     async_add_entities(
-        SolaredgeForecastSensor(coordinator, description)
-        for description in SENSOR_TYPES
+        [
+            *sensors,
+            *(
+                SolaredgeForecastDiagnosticSensor(coordinator, description)
+                for description in DIAGNOSTIC_SENSOR_TYPES
+            ),
+        ]
     )
 
 
@@ -32,8 +164,96 @@ class SolaredgeForecastSensor(update_coordinator.CoordinatorEntity, SensorEntity
         self.entity_description = description
         self._attr_name = f"{description.name}"
         self._attr_unique_id = f"{coordinator.unique_id}_{description.key}"
+        self._written_state: tuple[Any, ...] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state that is written when the sensor is added."""
+        await super().async_added_to_hass()
+        self._written_state = self._current_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the sensor's value actually changed.
+
+        Most refreshes change a few values at most: the dates only change
+        when the period rolls over and nothing is produced at night.
+        """
+        state = self._current_state()
+        if state == self._written_state:
+            return
+        self._written_state = state
+        super()._handle_coordinator_update()
+
+    def _current_state(self) -> tuple[Any, ...]:
+        """Return everything of the sensor that ends up in its state."""
+        return (self.available, self.native_value, self.extra_state_attributes)
+
+    @property
+    def forecast_data(self) -> Any:
+        """Return the forecast data of the sensor's site."""
+        return self.coordinator.data
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the native sensor value."""
+        return getattr(self.forecast_data, self.entity_description.key, None)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return additional values of the sensor, such as forecast bands."""
+        if self.entity_description.attributes_key is None:
+            return None
+        return getattr(
+            self.forecast_data, self.entity_description.attributes_key, None
+        )
+
+
+class SolaredgeFleetSensor(SolaredgeForecastSensor):
+    """Representation of a sensor of one site in a fleet entry."""
+
+    def __init__(
+        self,
+        coordinator: SolaredgeFleetData,
+        site_id: int,
+        description: SolaredgeForecastSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, description)
+        self._site_id = site_id
+        self._attr_name = f"{coordinator.site_name(site_id)} {description.name}"
+        self._attr_unique_id = f"{coordinator.unique_id}_{site_id}_{description.key}"
+
+    @property
+    def available(self) -> bool:
+        """Return whether the site has forecast data."""
+        return super().available and self._site_id in (self.coordinator.data or {})
+
+    @property
+    def forecast_data(self) -> Any:
+        """Return the forecast data of the sensor's site."""
+        return (self.coordinator.data or {}).get(self._site_id)
+
+
+class SolaredgeForecastDiagnosticSensor(SolaredgeForecastSensor):
+    """Representation of a diagnostic sensor of the coordinator.
+
+    Refresh stages are only timed while a diagnostic sensor is enabled.
+    """
+
+    async def async_added_to_hass(self) -> None:
+        """Start timing the refresh stages."""
+        await super().async_added_to_hass()
+        self.coordinator.set_diagnostic_sensor(self.entity_id, True)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop timing the refresh stages unless other sensors need them."""
+        await super().async_will_remove_from_hass()
+        self.coordinator.set_diagnostic_sensor(self.entity_id, False)
 
     @property
     def native_value(self) -> StateType:
         """Return the native sensor value."""
-        return getattr(self.coordinator.data, self.entity_description.key, None)
+        value = getattr(self.coordinator, self.entity_description.key, None)
+        if isinstance(value, float):
+            return round(value, 3)
+        return value
@@ -2,21 +2,90 @@
 
 from __future__ import annotations
 
-from calendar import month_name, monthrange
-from datetime import date, datetime, timedelta
-from typing import Any
-
-import solaredge
+import asyncio
+from calendar import isleap, month_name, monthrange
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+import math
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
 
 from ..util import redact_sensitive_values
+from .backfill import async_backfill, chunk_range, missing_ranges
+from .columnar import (
+    RESOLUTION_MONTH,
+    EnergyColumn,
+    column_from_months,
+    month_index,
+)
+from .errors import (
+    SolarEdgeApiError,
+    SolarEdgeBudgetExhausted,
+    SolarEdgeUnavailable,
+    is_transient_error,
+)
+from .interpolation import (
+    INTERPOLATION_LINEAR,
+    energy_calendar,
+    interpolation_factory,
+)
+from .intraday import IntradayHistory, produced_share
+from .streaming import EnergySeries
+
+if TYPE_CHECKING:
+    from .api import SolaredgeApiClient
 
 DATE_FORMAT = "%Y%m%d"
 PRODUCTION_DATE_FORMAT = "%d%m%Y"
 WH_PER_KWH = 1000
+INTRADAY_DAYS = 365
+INTRADAY_TIME_UNIT = "QUARTER_OF_AN_HOUR"
+INTRADAY_CHUNKS_PER_BASELINE = 6
+# Days before a failed quarter-hour chunk is requested again: transient
+# failures back off up to a week, rejected chunks wait a month.
+INTRADAY_RETRY_MAX_DAYS = 7
+INTRADAY_REJECTED_RETRY_DAYS = 30
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+@dataclass
+class ForecastBaseline:
+    """Forecast inputs that stay fixed during one calendar day."""
+
+    day: date
+    startdate: date
+    enddate: date
+    estimated_until_yesterday: float
+    estimated_today: float
+    estimated_from_tomorrow: float
+    produced_until_yesterday: float
+    intraday_profile: list[float] | None = None
+    bands_from_tomorrow: dict[str, float] | None = None
+
+    def is_valid_for(self, today: date, startdate: date, enddate: date) -> bool:
+        """Return whether the baseline applies to today and the period."""
+        return (
+            self.day == today
+            and self.startdate == startdate
+            and self.enddate == enddate
+        )
 
+    def as_dict(self) -> dict[str, Any]:
+        """Return the baseline in a JSON serializable form."""
+        data = asdict(self)
+        for key in ("day", "startdate", "enddate"):
+            data[key] = data[key].isoformat()
+        return data
 
-class SolarEdgeApiError(Exception):
-    """Raised when SolarEdge returns an error with secrets redacted."""
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ForecastBaseline:
+        """Restore a baseline stored with as_dict."""
+        data = dict(data)
+        for key in ("day", "startdate", "enddate"):
+            data[key] = date.fromisoformat(data[key])
+        return cls(**data)
 
 
 class SolaredgeForecast:
@@ -28,34 +97,227 @@ class SolaredgeForecast:
         enddate: str,
         startdate_production: str,
         site_id: int,
-        account_key: str,
+        history: EnergyColumn | dict[str, Any] | None = None,
+        baseline: ForecastBaseline | None = None,
+        intraday: IntradayHistory | None = None,
+        weight_half_life: float = 0,
+        checkpoint: Callable[[], None] | None = None,
+        interpolation: str = INTERPOLATION_LINEAR,
+        latitude: float | None = None,
     ) -> None:
-        """Initialize forecast data."""
-        self.startdate = datetime.strptime(startdate, DATE_FORMAT).date()
-        self.enddate = datetime.strptime(enddate, DATE_FORMAT).date()
+        """Initialize forecast data.
+
+        ``checkpoint`` is called whenever a backfill chunk has been added to
+        the intraday history, so it can be saved before the refresh ends.
+        ``interpolation`` names the strategy that spreads the monthly means
+        over the days, the day length strategy needs the site ``latitude``.
+        """
+        self.startdate = _parse_compact_date(startdate)
+        self.enddate = _parse_compact_date(enddate)
         self.site_id = site_id
-        self.account_key = account_key
         self.startdate_production = _production_start_date(startdate_production)
-
-        data = self.get_solar_forecast()
+        self.history = _valid_history(history, self.startdate_production)
+        self.baseline = baseline
+        self.intraday = intraday
+        self.weight_half_life = weight_half_life
+        self.checkpoint = checkpoint
+        self.interpolation = interpolation
+        self.latitude = latitude
+        # Fails early for unknown strategies or a missing latitude.
+        interpolation_factory(interpolation, latitude)
+
+        self.solaredge_estimated: int | None = None
+        self.solaredge_produced: int | None = None
+        self.solaredge_forecast: int | None = None
+        self.solaredge_progress: int | None = None
+        self.solaredge_forecast_bands: dict[str, int] | None = None
+        self.backfill_progress: float | None = None
+
+    async def async_update(
+        self, client: SolaredgeApiClient, now: datetime | None = None
+    ) -> None:
+        """Fetch production data and calculate the forecast at a local time."""
+        data = await self.async_get_solar_forecast(client, now)
 
         self.solaredge_estimated = data["Solar energy estimated"]
         self.solaredge_produced = data["Solar energy produced"]
         self.solaredge_forecast = data["Solar energy forecast"]
         self.solaredge_progress = data["Solar energy progress"]
+        self.solaredge_forecast_bands = data.get("Solar energy forecast bands")
+
+    def as_snapshot(self) -> dict[str, Any]:
+        """Return the forecast and its daily inputs in a JSON serializable form.
 
-    def get_solar_forecast(self) -> dict[str, int]:
-        """Calculate solar energy forecast."""
-        now = datetime.now()
-        yesterday = now.date() - timedelta(days=1)
+        The history is cached separately and is not part of the snapshot.
+        """
+        return {
+            "startdate": self.startdate.strftime(DATE_FORMAT),
+            "enddate": self.enddate.strftime(DATE_FORMAT),
+            "startdate_production": (
+                self.startdate_production.isoformat()
+                if self.startdate_production
+                else None
+            ),
+            "site_id": self.site_id,
+            "baseline": self.baseline.as_dict() if self.baseline else None,
+            "values": {
+                "estimated": self.solaredge_estimated,
+                "produced": self.solaredge_produced,
+                "forecast": self.solaredge_forecast,
+                "progress": self.solaredge_progress,
+                "forecast_bands": self.solaredge_forecast_bands,
+            },
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict[str, Any]) -> SolaredgeForecast:
+        """Restore a forecast stored with as_snapshot."""
+        forecast = cls(data["startdate"], data["enddate"], "", data["site_id"])
+        if data.get("startdate_production"):
+            forecast.startdate_production = date.fromisoformat(
+                data["startdate_production"]
+            )
+        if data.get("baseline"):
+            forecast.baseline = ForecastBaseline.from_dict(data["baseline"])
+
+        values = data["values"]
+        forecast.solaredge_estimated = values["estimated"]
+        forecast.solaredge_produced = values["produced"]
+        forecast.solaredge_forecast = values["forecast"]
+        forecast.solaredge_progress = values["progress"]
+        forecast.solaredge_forecast_bands = values.get("forecast_bands")
+        return forecast
+
+    async def async_get_solar_forecast(
+        self, client: SolaredgeApiClient, now: datetime | None = None
+    ) -> dict[str, Any]:
+        """Calculate solar energy forecast.
+
+        The estimates and the production until yesterday only change when the
+        day rolls over, so refreshes during the day reuse the baseline of the
+        first refresh and only request today's production. The quarter-hour
+        history is backfilled with the baseline, never in between. Before the
+        period starts nothing has been produced yet and only the estimates are
+        used.
+        ``now`` is the naive local time of the site, the caller passes it when
+        the host's time zone may differ. It also replays the forecast at
+        another moment and defaults to the host's local time.
+        """
+        if now is None:
+            now = datetime.now()
         today = now.date()
-        tomorrow = now.date() + timedelta(days=1)
+        tomorrow = today + timedelta(days=1)
+
+        if self.baseline is None or not self.baseline.is_valid_for(
+            today, self.startdate, self.enddate
+        ):
+            energy_produced_today = await self._async_update_baseline(client, today)
+        elif today < self.startdate:
+            client.metrics.increment("cache_hits.baseline")
+            energy_produced_today = 0
+        else:
+            client.metrics.increment("cache_hits.baseline")
+            energy_produced_today = await _time_frame_energy_kwh(
+                client,
+                site_id=self.site_id,
+                start_date=today,
+                end_date=tomorrow,
+                time_unit="DAY",
+            )
+
+        return _forecast_values(self.baseline, energy_produced_today, now.time())
+
+    async def _async_update_baseline(
+        self, client: SolaredgeApiClient, today: date
+    ) -> float:
+        """Rebuild the daily baseline and return today's production."""
+        yesterday = today - timedelta(days=1)
+        tomorrow = today + timedelta(days=1)
         last_month = today.replace(day=1) - timedelta(days=1)
 
-        client = solaredge.Solaredge(self.account_key)
+        live_requests = []
+        if self.startdate <= today:
+            live_requests = [
+                _time_frame_energy_kwh(
+                    client,
+                    site_id=self.site_id,
+                    start_date=self.startdate,
+                    end_date=tomorrow,
+                    time_unit="YEAR",
+                ),
+                _time_frame_energy_kwh(
+                    client,
+                    site_id=self.site_id,
+                    start_date=today,
+                    end_date=tomorrow,
+                    time_unit="DAY",
+                ),
+            ]
+
+        results = await asyncio.gather(
+            self._async_update_history(client, last_month),
+            self._async_update_intraday(client, today),
+            *live_requests,
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        energy_production_until_now, energy_produced_today = results[2:] or (0, 0)
+
+        with client.metrics.span("compute.averages"):
+            averages = _monthly_daily_averages(self.history)
+        with client.metrics.span("compute.interpolation"):
+            points = _interpolation_points(
+                averages,
+                _add_months(self.startdate, -1),
+                _add_months(self.enddate, 1),
+            )
+            energy = energy_calendar(
+                tuple(sorted(averages.items())), self.interpolation, self.latitude
+            )
+        with client.metrics.span("compute.bands"):
+            bands = _forecast_bands(
+                self.history,
+                [point_date for point_date, _ in points],
+                max(tomorrow, self.startdate),
+                self.enddate,
+                self.weight_half_life,
+                self.interpolation,
+                self.latitude,
+            )
+
+        self.baseline = ForecastBaseline(
+            day=today,
+            startdate=self.startdate,
+            enddate=self.enddate,
+            estimated_until_yesterday=energy.total(self.startdate, yesterday),
+            estimated_today=(
+                energy.daily(today)
+                if self.startdate <= today <= self.enddate
+                else 0
+            ),
+            estimated_from_tomorrow=energy.total(
+                max(tomorrow, self.startdate), self.enddate
+            ),
+            produced_until_yesterday=(
+                energy_production_until_now - energy_produced_today
+            ),
+            intraday_profile=(
+                self.intraday.month_profile(today.month) if self.intraday else None
+            ),
+            bands_from_tomorrow=bands,
+        )
+        return energy_produced_today
 
+    async def _async_update_history(
+        self, client: SolaredgeApiClient, last_month: date
+    ) -> None:
+        """Fetch the monthly production totals missing from the history."""
+        if self.startdate_production is None:
+            self.startdate_production = _history_production_start(self.history)
         if self.startdate_production is None:
-            data_period = _call_solaredge_api(
+            data_period = await _call_solaredge_api(
                 client.get_data_period, site_id=self.site_id
             )
             start_production = data_period["dataPeriod"]["startDate"]
@@ -68,65 +330,211 @@ class SolaredgeForecast:
                 "At least one complete month of production history is required"
             )
 
-        energy_month_average = _call_solaredge_api(
-            client.get_energy,
-            site_id=self.site_id,
-            start_date=self.startdate_production,
-            end_date=last_month,
-            time_unit="MONTH",
-        )
-        averages = _monthly_daily_averages(energy_month_average)
-        interpolation_points = _interpolation_points(
-            averages,
-            _add_months(self.startdate, -1),
-            _add_months(self.enddate, 1),
-        )
+        history = self.history
+        if history is None or history.production_start != self.startdate_production:
+            history = EnergyColumn.empty(
+                RESOLUTION_MONTH, self.startdate_production, self.startdate_production
+            )
+        first_missing_month = _first_missing_month(history)
+        if first_missing_month <= last_month:
+            energy_month_average = await _call_solaredge_api(
+                client.get_energy_series,
+                site_id=self.site_id,
+                start_date=first_missing_month,
+                end_date=last_month,
+                time_unit="MONTH",
+            )
+            history = history.extended(
+                _monthly_history(energy_month_average, first_missing_month, last_month)
+            )
+        else:
+            client.metrics.increment("cache_hits.history")
+        self.history = history
 
-        energy_estimated_from_tomorrow = _sum_daily_energy(
-            tomorrow, self.enddate, interpolation_points
-        )
-        energy_estimated_until_yesterday = _sum_daily_energy(
-            self.startdate, yesterday, interpolation_points
-        )
-        energy_estimated_today = _sum_daily_energy(today, today, interpolation_points)
-
-        energy_production_until_now = _time_frame_energy_kwh(
-            client,
-            site_id=self.site_id,
-            start_date=self.startdate,
-            end_date=tomorrow,
-            time_unit="YEAR",
+    async def _async_update_intraday(
+        self, client: SolaredgeApiClient, today: date
+    ) -> None:
+        """Backfill the quarter-hour production missing from the intraday history.
+
+        SolarEdge returns at most one month of quarter-hour values per request.
+        A few months are requested concurrently with every baseline, so once
+        a day, until the year is complete. Failures are not fatal: failed
+        chunks are deferred in the intraday history, see
+        ``_intraday_retry_on``, and the forecast falls back to the daily
+        estimate meanwhile.
+        """
+        if self.intraday is None:
+            return
+
+        intraday = self.intraday
+        intraday.trim(today - timedelta(days=INTRADAY_DAYS))
+        missing_days = intraday.missing_days(
+            today - timedelta(days=INTRADAY_DAYS), today - timedelta(days=1)
         )
-        energy_produced_today = _time_frame_energy_kwh(
-            client,
-            site_id=self.site_id,
-            start_date=today,
-            end_date=tomorrow,
-            time_unit="DAY",
+        chunks = _intraday_chunks(
+            [day for day in missing_days if not intraday.is_deferred(day, today)]
         )
+        if not chunks:
+            self.backfill_progress = 1.0
+            client.metrics.increment("cache_hits.intraday")
+            return
+
+        async def fetch(start_date: date, end_date: date) -> EnergySeries:
+            return await _call_solaredge_api(
+                client.get_energy_series,
+                site_id=self.site_id,
+                start_date=start_date,
+                end_date=end_date,
+                time_unit=INTRADAY_TIME_UNIT,
+            )
 
-        energy_estimated_period = energy_estimated_from_tomorrow + max(
-            0, energy_estimated_today - energy_produced_today
-        )
+        def store(start_date: date, end_date: date, series: EnergySeries) -> None:
+            nonlocal stored_days
+            intraday.add_series(series)
+            intraday.cover(start_date, end_date)
+            stored_days += (end_date - start_date).days + 1
+            if self.checkpoint is not None:
+                self.checkpoint()
+
+        stored_days = 0
+        with client.metrics.span("fetch.intraday"):
+            failures = await async_backfill(
+                chunks[:INTRADAY_CHUNKS_PER_BASELINE], fetch, store
+            )
+        if failures:
+            client.metrics.increment("intraday_failures", len(failures))
+            for start_date, end_date, err in failures:
+                attempts = intraday.failed_attempts(start_date, end_date) + 1
+                retry_on = _intraday_retry_on(err, attempts, today)
+                if retry_on is not None:
+                    intraday.defer(start_date, end_date, retry_on, attempts)
+            if intraday.modified and self.checkpoint is not None:
+                self.checkpoint()
+
+        self.backfill_progress = 1 - (len(missing_days) - stored_days) / INTRADAY_DAYS
+
+
+def _forecast_values(
+    baseline: ForecastBaseline,
+    energy_produced_today: float,
+    now: time | None = None,
+) -> dict[str, Any]:
+    """Return the rounded forecast values for today's production.
+
+    With a time-of-day profile, today's estimate is split at the current time:
+    the part expected before now is compared with today's production and the
+    rest is still to come. Without a profile the whole daily estimate stays
+    open until it has been produced.
+    """
+    energy_production_until_now = (
+        baseline.produced_until_yesterday + energy_produced_today
+    )
 
-        energy_produced_until_yesterday = (
-            energy_production_until_now - energy_produced_today
-        )
+    share = None
+    if baseline.intraday_profile is not None and now is not None:
+        share = produced_share(baseline.intraday_profile, now)
 
-        energy_production_progress = (
-            energy_produced_until_yesterday
-            - energy_estimated_until_yesterday
-            + max(0, energy_produced_today - energy_estimated_today)
+    if share is None:
+        estimated_rest_of_today = max(
+            0, baseline.estimated_today - energy_produced_today
         )
+        progress_today = max(0, energy_produced_today - baseline.estimated_today)
+    else:
+        estimated_rest_of_today = baseline.estimated_today * (1 - share)
+        progress_today = energy_produced_today - baseline.estimated_today * share
 
-        forecast = energy_estimated_period + energy_production_until_now
+    energy_estimated_period = (
+        baseline.estimated_from_tomorrow + estimated_rest_of_today
+    )
 
-        return {
-            "Solar energy produced": round(energy_production_until_now),
-            "Solar energy estimated": round(energy_estimated_period),
-            "Solar energy forecast": round(forecast),
-            "Solar energy progress": round(energy_production_progress),
+    energy_production_progress = (
+        baseline.produced_until_yesterday
+        - baseline.estimated_until_yesterday
+        + progress_today
+    )
+
+    forecast = energy_estimated_period + energy_production_until_now
+
+    values: dict[str, Any] = {
+        "Solar energy produced": round(energy_production_until_now),
+        "Solar energy estimated": round(energy_estimated_period),
+        "Solar energy forecast": round(forecast),
+        "Solar energy progress": round(energy_production_progress),
+    }
+    if baseline.bands_from_tomorrow is not None:
+        values["Solar energy forecast bands"] = {
+            name: round(energy_production_until_now + estimated_rest_of_today + energy)
+            for name, energy in baseline.bands_from_tomorrow.items()
         }
+    return values
+
+
+def _intraday_chunks(missing_days: list[date]) -> list[tuple[date, date]]:
+    """Return the requests for the missing quarter-hour days, newest first."""
+    chunks = [
+        chunk
+        for start_date, end_date in missing_ranges(missing_days)
+        for chunk in chunk_range(start_date, end_date, INTRADAY_TIME_UNIT)
+    ]
+    chunks.reverse()
+    return chunks
+
+
+def _intraday_retry_on(
+    err: SolarEdgeApiError, attempts: int, today: date
+) -> date | None:
+    """Return when a failed quarter-hour chunk is requested again.
+
+    Requests the client refused for the budget or an open circuit breaker
+    never reached SolarEdge and go out on the next refresh. Transient errors
+    are retried after 1, 2 and 4 days and then weekly, rejected requests
+    after a month, so chunks SolarEdge does not serve stop using the budget.
+    """
+    if isinstance(err, (SolarEdgeBudgetExhausted, SolarEdgeUnavailable)):
+        return None
+    if is_transient_error(err):
+        days = min(2 ** (attempts - 1), INTRADAY_RETRY_MAX_DAYS)
+    else:
+        days = INTRADAY_REJECTED_RETRY_DAYS
+    return today + timedelta(days=days)
+
+
+def _forecast_bands(
+    history: EnergyColumn,
+    point_dates: list[date],
+    start_date: date,
+    end_date: date,
+    half_life: float,
+    interpolation: str,
+    latitude: float | None,
+) -> dict[str, float] | None:
+    """Return the P10, P50 and P90 energy of a range, if NumPy is available."""
+    statistics = _statistics_module()
+    if statistics is None:
+        return None
+    return statistics.forecast_bands(
+        history,
+        point_dates,
+        start_date,
+        end_date,
+        half_life,
+        interpolation,
+        latitude,
+    )
+
+
+@lru_cache(maxsize=1)
+def _statistics_module() -> ModuleType | None:
+    """Return the statistics module, or None when NumPy is missing.
+
+    Home Assistant imports it in the executor while an entry is set up, so
+    on the event loop this is a lookup. A missing NumPy is looked for once.
+    """
+    try:
+        from . import statistics
+    except ImportError:
+        return None
+    return statistics
 
 
 def _production_start_date(value: str) -> date | None:
@@ -140,13 +548,75 @@ def _production_start_date(value: str) -> date | None:
     return parsed
 
 
+def _valid_history(
+    history: EnergyColumn | dict[str, Any] | None,
+    startdate_production: date | None,
+) -> EnergyColumn | None:
+    """Return cached history unless it belongs to another production start.
+
+    History cached as a ``{"production_start": ..., "months": {...}}``
+    document by earlier versions is converted to a monthly column.
+    """
+    if isinstance(history, dict):
+        production_start = history.get("production_start")
+        history = column_from_months(
+            history.get("months", {}),
+            date.fromisoformat(production_start) if production_start else None,
+        )
+    if not history:
+        return None
+    if (
+        startdate_production is not None
+        and history.production_start != startdate_production
+    ):
+        return None
+    return history
+
+
+def _history_production_start(history: EnergyColumn | None) -> date | None:
+    """Return the cached first complete production month."""
+    if history is None:
+        return None
+    return history.production_start
+
+
+def _first_missing_month(history: EnergyColumn) -> date:
+    """Return the first month that is not in the cached history yet."""
+    if history.end is None:
+        return history.start
+    return _first_day_next_month(history.end)
+
+
+def _monthly_history(
+    series: EnergySeries, first_month: date, last_month: date
+) -> list[float]:
+    """Return monthly production totals in Wh from first_month to last_month.
+
+    Months SolarEdge did not return are 0, like months without production.
+    """
+    first = month_index(first_month)
+    history = [0.0] * (month_index(last_month) - first + 1)
+    for day, value in zip(series.days, series.values):
+        offset = month_index(date.fromordinal(day)) - first
+        if 0 <= offset < len(history) and not math.isnan(value):
+            history[offset] = value
+    return history
+
+
 def _parse_api_date(value: Any) -> date:
-    """Parse a date returned by the SolarEdge API."""
+    """Parse a date returned by the SolarEdge API, like 2024-05-01 00:00:00."""
     if isinstance(value, datetime):
         return value.date()
     if isinstance(value, date):
         return value
-    return datetime.strptime(str(value).split()[0], "%Y-%m-%d").date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _parse_compact_date(value: str) -> date:
+    """Parse a date in DATE_FORMAT without the cost of strptime."""
+    if len(value) != 8 or not value.isdigit():
+        raise ValueError(f"Invalid date: {value!r}")
+    return date(int(value[:4]), int(value[4:6]), int(value[6:]))
 
 
 def _first_day_next_month(value: date) -> date:
@@ -165,37 +635,31 @@ def _add_months(value: date, months: int) -> date:
     return date(year, month, day)
 
 
-def _date_range(start_date: date, end_date: date):
-    """Yield every date in an inclusive range."""
-    current = start_date
-    while current <= end_date:
-        yield current
-        current += timedelta(days=1)
-
+def _monthly_daily_averages(history: EnergyColumn) -> dict[int, float]:
+    """Return average daily kWh per calendar month from monthly totals.
 
-def _monthly_daily_averages(payload: dict[str, Any]) -> dict[int, float]:
-    """Return average daily kWh per calendar month from SolarEdge data."""
-    monthly_values: dict[int, list[float]] = {}
-    values = payload.get("energy", {}).get("values", [])
+    The history is folded into a running sum and count per calendar month, so
+    no intermediate lists are built however long it is.
+    """
+    sums = [0.0] * 12
+    counts = [0] * 12
 
-    for item in values:
-        energy = item.get("value") or 0
-        if energy == 0:
-            continue
-
-        item_date = _parse_api_date(item["date"])
-        days_in_month = monthrange(item_date.year, item_date.month)[1]
-        monthly_values.setdefault(item_date.month, []).append(
-            energy / days_in_month / WH_PER_KWH
-        )
+    year, month = divmod(history.first, 12)
+    for energy in history.values:
+        if energy != 0:
+            days_in_month = DAYS_IN_MONTH[month] + (month == 1 and isleap(year))
+            sums[month] += energy / days_in_month / WH_PER_KWH
+            counts[month] += 1
+        if month == 11:
+            year, month = year + 1, 0
+        else:
+            month += 1
 
-    if not monthly_values:
+    if not any(counts):
         raise ValueError("SolarEdge returned no historical monthly production data")
 
     return {
-        month: sum(values) / len(values)
-        for month, values in monthly_values.items()
-        if values
+        month + 1: sums[month] / counts[month] for month in range(12) if counts[month]
     }
 
 
@@ -206,13 +670,14 @@ def _interpolation_points(
     points: list[tuple[date, float]] = []
     missing_months: set[int] = set()
 
-    for current in _date_range(start_date, end_date):
-        if current.day != 15:
+    first = month_index(start_date) + (start_date.day > 15)
+    last = month_index(end_date) - (end_date.day < 15)
+    for index in range(first, last + 1):
+        year, month = divmod(index, 12)
+        if month + 1 not in averages:
+            missing_months.add(month + 1)
             continue
-        if current.month not in averages:
-            missing_months.add(current.month)
-            continue
-        points.append((current, averages[current.month]))
+        points.append((date(year, month + 1, 15), averages[month + 1]))
 
     if missing_months:
         missing = ", ".join(month_name[month] for month in sorted(missing_months))
@@ -223,48 +688,15 @@ def _interpolation_points(
     return points
 
 
-def _interpolated_daily_energy(day: date, points: list[tuple[date, float]]) -> float:
-    """Return the interpolated daily energy for a date."""
-    if day <= points[0][0]:
-        return points[0][1]
-    if day >= points[-1][0]:
-        return points[-1][1]
-
-    previous_point = points[0]
-    for next_point in points[1:]:
-        previous_date, previous_value = previous_point
-        next_date, next_value = next_point
-        if previous_date <= day <= next_date:
-            span_days = (next_date - previous_date).days
-            elapsed_days = (day - previous_date).days
-            fraction = elapsed_days / span_days
-            return previous_value + (next_value - previous_value) * fraction
-        previous_point = next_point
-
-    return points[-1][1]
-
-
-def _sum_daily_energy(
-    start_date: date, end_date: date, points: list[tuple[date, float]]
-) -> float:
-    """Sum interpolated daily energy over an inclusive date range."""
-    if start_date > end_date:
-        return 0
-    return sum(
-        _interpolated_daily_energy(day, points)
-        for day in _date_range(start_date, end_date)
-    )
-
-
-def _time_frame_energy_kwh(
-    client,
+async def _time_frame_energy_kwh(
+    client: SolaredgeApiClient,
     site_id: int,
     start_date: date,
     end_date: date,
     time_unit: str,
 ) -> float:
     """Return SolarEdge time frame energy in kWh."""
-    payload = _call_solaredge_api(
+    payload = await _call_solaredge_api(
         client.get_time_frame_energy,
         site_id=site_id,
         start_date=start_date,
@@ -275,10 +707,12 @@ def _time_frame_energy_kwh(
     return energy / WH_PER_KWH
 
 
-def _call_solaredge_api(method, **kwargs):
+async def _call_solaredge_api(method, **kwargs):
     """Call SolarEdge and redact secrets from any raised exception."""
     try:
-        return method(**kwargs)
+        return await method(**kwargs)
+    except SolarEdgeApiError:
+        raise
     except Exception as err:
-        message = redact_sensitive_values(str(err))
-        raise SolarEdgeApiError(message) from None
+        message = redact_sensitive_values(str(err)) or type(err).__name__
+        raise SolarEdgeApiError(message, getattr(err, "status", None)) from None
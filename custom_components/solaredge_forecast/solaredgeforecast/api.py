@@ -0,0 +1,273 @@
+"""Asynchronous client for the SolarEdge monitoring API."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+import json
+from typing import Any
+
+import aiohttp
+
+from ..scheduler import PRIORITY_HISTORY, PRIORITY_LIVE
+from .batching import SiteRequestBatcher, bulk_site_items
+from .errors import SolarEdgeBudgetExhausted, SolarEdgeUnavailable
+from .metrics import ForecastMetrics
+from .retry import (
+    THROTTLING_STATUS,
+    TRANSIENT_STATUSES,
+    CircuitBreaker,
+    RetryPolicy,
+    parse_retry_after,
+)
+from .streaming import EnergySeries, EnergyStreamParser
+
+API_URL = "https://monitoringapi.solaredge.com"
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+SITE_LIST_PAGE_SIZE = 100
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class SolaredgeApiClient:
+    """Call the SolarEdge monitoring API for all sites of one account key.
+
+    Energy requests of different sites that share a date range are combined
+    into bulk requests on the comma separated ``sites`` endpoints. Energy
+    series are parsed while the response arrives, see ``streaming``.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        account_key: str,
+        scheduler=None,
+        api_url: str = API_URL,
+        metrics: ForecastMetrics | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        """Initialize the client."""
+        self._session = session
+        self._account_key = account_key
+        self._api_url = api_url
+        self.scheduler = scheduler
+        self.metrics = metrics or ForecastMetrics()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
+        self._data_period_batcher = SiteRequestBatcher(self._get_data_period_bulk)
+        self._energy_series_batcher = SiteRequestBatcher(
+            self._get_energy_series_bulk
+        )
+        self._time_frame_batcher = SiteRequestBatcher(self._get_time_frame_energy_bulk)
+
+    async def get_site_list(self) -> list[dict[str, Any]]:
+        """Return every site of the account, following the pages of the list."""
+        sites: list[dict[str, Any]] = []
+        while True:
+            payload = await self._get(
+                "sites/list",
+                {"size": SITE_LIST_PAGE_SIZE, "startIndex": len(sites)},
+                PRIORITY_HISTORY,
+            )
+            page = payload.get("sites", {}).get("site", [])
+            sites.extend(page)
+            if not page or len(sites) >= payload["sites"].get("count", 0):
+                return sites
+
+    async def get_data_period(self, site_id: int) -> dict[str, Any]:
+        """Return the first and last date with production data."""
+        return await self._data_period_batcher.request(site_id, {})
+
+    async def get_energy_series(
+        self,
+        site_id: int,
+        start_date: date,
+        end_date: date,
+        time_unit: str = "DAY",
+    ) -> EnergySeries:
+        """Return energy values for every time unit in a date range, compactly.
+
+        The response is parsed while it arrives, never decoded as a whole.
+        """
+        return await self._energy_series_batcher.request(
+            site_id,
+            {"startDate": start_date, "endDate": end_date, "timeUnit": time_unit},
+        )
+
+    async def get_time_frame_energy(
+        self,
+        site_id: int,
+        start_date: date,
+        end_date: date,
+        time_unit: str = "DAY",
+    ) -> dict[str, Any]:
+        """Return the total energy produced in a date range."""
+        return await self._time_frame_batcher.request(
+            site_id,
+            {"startDate": start_date, "endDate": end_date, "timeUnit": time_unit},
+        )
+
+    async def _get_data_period_bulk(
+        self, site_ids: list[int], params: dict[str, Any]
+    ) -> dict[int, dict[str, Any]]:
+        """Return the data periods of several sites with one request."""
+        if len(site_ids) == 1:
+            payload = await self._get(
+                f"site/{site_ids[0]}/dataPeriod", params, PRIORITY_HISTORY
+            )
+            return {site_ids[0]: payload}
+
+        payload = await self._get(
+            f"sites/{_site_list(site_ids)}/dataPeriod", params, PRIORITY_HISTORY
+        )
+        return {
+            int(item["siteId"]): {"dataPeriod": item.get("dataPeriod", {})}
+            for item in bulk_site_items(payload)
+        }
+
+    async def _get_energy_series_bulk(
+        self, site_ids: list[int], params: dict[str, Any]
+    ) -> dict[int, EnergySeries]:
+        """Return energy series for several sites with one streamed request."""
+        if len(site_ids) == 1:
+            series = await self._get(
+                f"site/{site_ids[0]}/energy",
+                params,
+                PRIORITY_HISTORY,
+                EnergyStreamParser,
+            )
+            return {site_ids[0]: next(iter(series.values()))}
+
+        series = await self._get(
+            f"sites/{_site_list(site_ids)}/energy",
+            params,
+            PRIORITY_HISTORY,
+            EnergyStreamParser,
+        )
+        return {
+            site_id: site_series
+            for site_id, site_series in series.items()
+            if site_id is not None
+        }
+
+    async def _get_time_frame_energy_bulk(
+        self, site_ids: list[int], params: dict[str, Any]
+    ) -> dict[int, dict[str, Any]]:
+        """Return time frame energy for several sites with one request."""
+        if len(site_ids) == 1:
+            payload = await self._get(
+                f"site/{site_ids[0]}/timeFrameEnergy", params, PRIORITY_LIVE
+            )
+            return {site_ids[0]: payload}
+
+        payload = await self._get(
+            f"sites/{_site_list(site_ids)}/timeFrameEnergy", params, PRIORITY_LIVE
+        )
+        return {
+            int(item["siteId"]): {"timeFrameEnergy": item.get("timeFrameEnergy", {})}
+            for item in bulk_site_items(payload)
+        }
+
+    async def _get(
+        self,
+        path: str,
+        params: dict[str, Any],
+        priority: str,
+        parser: type[EnergyStreamParser] | None = None,
+    ) -> Any:
+        """Request a SolarEdge endpoint, retrying transient failures.
+
+        The body is decoded as JSON, or fed to a new ``parser`` per attempt
+        while it arrives.
+        """
+        query = {key: str(value) for key, value in params.items()}
+        query["api_key"] = self._account_key
+        endpoint = f"{path.split('/', 1)[0]}/{path.rsplit('/', 1)[-1]}"
+
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                self.metrics.increment("circuit_open_rejections")
+                raise SolarEdgeUnavailable(
+                    "SolarEdge API temporarily unavailable after repeated failures"
+                )
+            if self.scheduler is not None and not self.scheduler.acquire(priority):
+                raise SolarEdgeBudgetExhausted(
+                    f"SolarEdge request budget exhausted for {priority} requests"
+                )
+
+            self.metrics.increment(f"calls.{endpoint}")
+            retry_after = None
+            try:
+                result = await self._request(path, query, endpoint, parser)
+            except aiohttp.ClientResponseError as err:
+                if err.status not in TRANSIENT_STATUSES:
+                    self.circuit_breaker.record_success()
+                    raise
+                if err.status == THROTTLING_STATUS and err.headers:
+                    retry_after = parse_retry_after(err.headers.get("Retry-After"))
+                self.circuit_breaker.record_failure()
+                error: Exception = err
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                self.circuit_breaker.record_failure()
+                error = err
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if delay is None:
+                raise error
+            self.metrics.increment("retries")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _request(
+        self,
+        path: str,
+        query: dict[str, str],
+        endpoint: str,
+        parser: type[EnergyStreamParser] | None,
+    ) -> Any:
+        """Send one request and return the decoded or parsed response body."""
+        async with self._concurrency():
+            with self.metrics.span(f"api.{endpoint}"):
+                async with self._session.get(
+                    f"{self._api_url}/{path}", params=query, timeout=REQUEST_TIMEOUT
+                ) as response:
+                    response.raise_for_status()
+                    if parser is None:
+                        body = await response.read()
+                        self.metrics.increment("bytes_received", len(body))
+                        return json.loads(body)
+
+                    stream = parser()
+                    async for chunk in response.content.iter_chunked(
+                        STREAM_CHUNK_BYTES
+                    ):
+                        self.metrics.increment("bytes_received", len(chunk))
+                        stream.feed(chunk)
+                    return stream.close()
+
+    def _concurrency(self):
+        """Return the limiter for concurrent requests on this account."""
+        if self.scheduler is None:
+            return _NO_LIMIT
+        return self.scheduler.concurrency
+
+
+def _site_list(site_ids: list[int]) -> str:
+    """Return site IDs in the comma separated form of the bulk endpoints."""
+    return ",".join(str(site_id) for site_id in site_ids)
+
+
+class _NoLimit:
+    """Async context manager that does not limit concurrency."""
+
+    async def __aenter__(self) -> None:
+        """Enter the context."""
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Exit the context."""
+
+
+_NO_LIMIT = _NoLimit()
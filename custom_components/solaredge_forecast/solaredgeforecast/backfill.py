@@ -0,0 +1,79 @@
+"""Backfill long production histories in chunks that SolarEdge accepts.
+
+SolarEdge limits the date range of one energy request by its time unit: a
+month of quarter-hour or hourly values and a year of daily values. Missing
+ranges are split into chunks aligned to calendar months, so sites of a fleet
+share chunks, and all chunks are requested at once. The client's batching,
+concurrency limit and request budget decide how they go out. Every chunk is
+stored as soon as it arrives, so an interrupted backfill resumes with the
+chunks that are still missing. Failed chunks are returned with their errors,
+so the caller can decide when to request them again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import date, timedelta
+
+from .columnar import RESOLUTION_MONTH, month_index, period_date
+from .errors import SolarEdgeApiError
+from .streaming import EnergySeries
+
+MAX_RANGE_MONTHS = {"QUARTER_OF_AN_HOUR": 1, "HOUR": 1, "DAY": 12}
+
+ChunkFetcher = Callable[[date, date], Awaitable[EnergySeries]]
+ChunkHandler = Callable[[date, date, EnergySeries], None]
+
+
+def missing_ranges(days: Iterable[date]) -> list[tuple[date, date]]:
+    """Return the runs of consecutive days in sorted days as inclusive ranges."""
+    ranges: list[tuple[date, date]] = []
+    for day in days:
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def chunk_range(
+    start_date: date, end_date: date, time_unit: str
+) -> list[tuple[date, date]]:
+    """Split an inclusive date range into chunks of one request each."""
+    months = MAX_RANGE_MONTHS.get(time_unit)
+    if months is None:
+        return [(start_date, end_date)]
+
+    chunks: list[tuple[date, date]] = []
+    while start_date <= end_date:
+        next_start = period_date(RESOLUTION_MONTH, month_index(start_date) + months)
+        chunk_end = min(next_start - timedelta(days=1), end_date)
+        chunks.append((start_date, chunk_end))
+        start_date = chunk_end + timedelta(days=1)
+    return chunks
+
+
+async def async_backfill(
+    chunks: list[tuple[date, date]], fetch: ChunkFetcher, store: ChunkHandler
+) -> list[tuple[date, date, SolarEdgeApiError]]:
+    """Fetch chunks concurrently and store each one as soon as it arrives.
+
+    Returns the chunks that failed with a SolarEdge error and their errors,
+    they stay missing for a later attempt. Other errors are raised.
+    """
+
+    async def backfill_chunk(start_date: date, end_date: date) -> None:
+        store(start_date, end_date, await fetch(start_date, end_date))
+
+    results = await asyncio.gather(
+        *(backfill_chunk(start_date, end_date) for start_date, end_date in chunks),
+        return_exceptions=True,
+    )
+    failures = []
+    for (start_date, end_date), result in zip(chunks, results):
+        if isinstance(result, SolarEdgeApiError):
+            failures.append((start_date, end_date, result))
+        elif isinstance(result, BaseException):
+            raise result
+    return failures
@@ -0,0 +1,426 @@
+"""Backtest the forecast on cached production history.
+
+Run with the history directory of Home Assistant, or one column file::
+
+    python -m custom_components.solaredge_forecast.solaredgeforecast.backtest \
+        config/.storage/solaredge_forecast_history
+
+Every day of every past forecast period is replayed as if it were today: the
+forecast only sees the months before that day and the production of the
+period until then, like ``SolaredgeForecast`` does in Home Assistant. Every
+forecast is compared with the total that was actually produced in the period.
+Sites are spread over a process pool.
+
+Production within a month is only known from the daily column of a site.
+Without one, the month's total is spread evenly over its days. That only
+affects the production until the replayed day, not the estimates under test.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from itertools import repeat
+import json
+import os
+from typing import Any
+
+from . import DATE_FORMAT, SolaredgeForecast
+from .columnar import (
+    RESOLUTION_DAY,
+    RESOLUTION_MONTH,
+    ColumnarEnergyStore,
+    EnergyColumn,
+    month_index,
+)
+from .errors import SolarEdgeApiError
+from .interpolation import INTERPOLATION_LINEAR, INTERPOLATIONS
+from .metrics import ForecastMetrics
+from .period import clamped_date, parse_month_day
+from .streaming import EnergySeries
+
+WH_PER_KWH = 1000
+DEFAULT_START = "01-01"
+DEFAULT_END = "12-31"
+COLUMN_SUFFIX = f".{RESOLUTION_MONTH}.bin"
+
+# Forecasts are replayed at the start of the day, before anything is produced.
+REPLAY_TIME = time(0)
+
+
+class DailyProduction:
+    """Daily production of one site in Wh, with constant time range sums."""
+
+    def __init__(self, monthly: EnergyColumn, daily: EnergyColumn | None) -> None:
+        """Spread the monthly totals over days, preferring daily values."""
+        self.first_day = monthly.start
+        last_month = monthly.end or monthly.start
+        self.last_day = last_month.replace(
+            day=monthrange(last_month.year, last_month.month)[1]
+        )
+
+        self._cumulative = [0.0]
+        day = self.first_day
+        while day <= self.last_day:
+            value = daily.value(day) if daily is not None else None
+            if value is None:
+                month_total = monthly.value(day) or 0
+                value = month_total / monthrange(day.year, day.month)[1]
+            self._cumulative.append(self._cumulative[-1] + value)
+            day += timedelta(days=1)
+
+    def total(self, start_date: date, end_date: date) -> float:
+        """Return the production from start_date to end_date, both included."""
+        first = max(0, (start_date - self.first_day).days)
+        last = min(len(self._cumulative) - 1, (end_date - self.first_day).days + 1)
+        if last <= first:
+            return 0.0
+        return self._cumulative[last] - self._cumulative[first]
+
+
+class HistoryReplayClient:
+    """Answer the requests of a forecast from cached history at a replayed day."""
+
+    def __init__(self, production: DailyProduction) -> None:
+        """Initialize the client."""
+        self.metrics = ForecastMetrics(enabled=False)
+        self.today = production.first_day
+        self._production = production
+
+    async def get_data_period(self, site_id: int) -> dict[str, Any]:
+        """Return the first day with cached production."""
+        return {"dataPeriod": {"startDate": self._production.first_day.isoformat()}}
+
+    async def get_energy_series(
+        self, site_id: int, start_date: date, end_date: date, time_unit: str = "DAY"
+    ) -> EnergySeries:
+        """Refuse, the history of the replayed day is passed to the forecast."""
+        raise SolarEdgeApiError("Only cached history is available in a backtest")
+
+    async def get_time_frame_energy(
+        self, site_id: int, start_date: date, end_date: date, time_unit: str = "DAY"
+    ) -> dict[str, Any]:
+        """Return the production from start_date until the replayed moment."""
+        energy = self._production.total(
+            start_date, min(end_date, self.today) - timedelta(days=1)
+        )
+        return {"timeFrameEnergy": {"energy": energy}}
+
+
+@dataclass
+class ErrorStats:
+    """Errors of forecasts against the produced period totals, in kWh."""
+
+    count: int = 0
+    error: float = 0.0
+    absolute_error: float = 0.0
+    squared_error: float = 0.0
+    absolute_percentage_error: float = 0.0
+    percentage_count: int = 0
+    banded: int = 0
+    within_band: int = 0
+
+    def add(
+        self, forecast: float, actual: float, bands: dict[str, float] | None
+    ) -> None:
+        """Record one forecast."""
+        error = forecast - actual
+        self.count += 1
+        self.error += error
+        self.absolute_error += abs(error)
+        self.squared_error += error * error
+        if actual > 0:
+            self.absolute_percentage_error += abs(error) / actual
+            self.percentage_count += 1
+        if bands is not None:
+            self.banded += 1
+            self.within_band += bands["p90"] <= actual <= bands["p10"]
+
+    def merge(self, other: ErrorStats) -> None:
+        """Add the forecasts recorded in another instance."""
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def summary(self) -> dict[str, float | int | None]:
+        """Return the error metrics."""
+        if not self.count:
+            return {"forecasts": 0}
+        return {
+            "forecasts": self.count,
+            "mae_kwh": self.absolute_error / self.count,
+            "rmse_kwh": (self.squared_error / self.count) ** 0.5,
+            "bias_kwh": self.error / self.count,
+            "mape_pct": (
+                100 * self.absolute_percentage_error / self.percentage_count
+                if self.percentage_count
+                else None
+            ),
+            "band_coverage_pct": (
+                100 * self.within_band / self.banded if self.banded else None
+            ),
+        }
+
+
+@dataclass
+class SiteBacktest:
+    """Backtest results of one site, by month of the forecast period."""
+
+    site_id: int
+    periods: int = 0
+    skipped_days: int = 0
+    overall: ErrorStats = field(default_factory=ErrorStats)
+    by_month: dict[int, ErrorStats] = field(default_factory=dict)
+
+
+def backtest_site(
+    path: str,
+    start: str,
+    end: str,
+    weight_half_life: float = 0,
+    interpolation: str = INTERPOLATION_LINEAR,
+    latitude: float | None = None,
+) -> SiteBacktest:
+    """Replay every past period of the site in a monthly column file."""
+    directory, name = os.path.split(path)
+    site_id = int(name.split(".", 1)[0])
+    store = ColumnarEnergyStore(directory)
+    monthly = store.read(site_id, RESOLUTION_MONTH)
+    result = SiteBacktest(site_id)
+    if monthly is None or not len(monthly):
+        return result
+
+    production = DailyProduction(monthly, store.read(site_id, RESOLUTION_DAY))
+    return asyncio.run(
+        _async_backtest_site(
+            result,
+            monthly,
+            production,
+            start,
+            end,
+            weight_half_life,
+            interpolation,
+            latitude,
+        )
+    )
+
+
+async def _async_backtest_site(
+    result: SiteBacktest,
+    monthly: EnergyColumn,
+    production: DailyProduction,
+    start: str,
+    end: str,
+    weight_half_life: float,
+    interpolation: str,
+    latitude: float | None,
+) -> SiteBacktest:
+    """Replay the forecast at every day of the periods of one site."""
+    client = HistoryReplayClient(production)
+    for period_start, period_end in _past_periods(production, start, end):
+        result.periods += 1
+        actual = production.total(period_start, period_end) / WH_PER_KWH
+        day = period_start
+        while day <= period_end:
+            client.today = day
+            forecast = SolaredgeForecast(
+                period_start.strftime(DATE_FORMAT),
+                period_end.strftime(DATE_FORMAT),
+                "",
+                result.site_id,
+                _history_before(monthly, day),
+                weight_half_life=weight_half_life,
+                interpolation=interpolation,
+                latitude=latitude,
+            )
+            try:
+                values = await forecast.async_get_solar_forecast(
+                    client, datetime.combine(day, REPLAY_TIME)
+                )
+            except (SolarEdgeApiError, ValueError):
+                result.skipped_days += 1
+            else:
+                bands = values.get("Solar energy forecast bands")
+                month = month_index(day) - month_index(period_start) + 1
+                for stats in (
+                    result.overall,
+                    result.by_month.setdefault(month, ErrorStats()),
+                ):
+                    stats.add(values["Solar energy forecast"], actual, bands)
+            day += timedelta(days=1)
+    return result
+
+
+def run_backtest(
+    paths: list[str],
+    start: str = DEFAULT_START,
+    end: str = DEFAULT_END,
+    weight_half_life: float = 0,
+    workers: int | None = None,
+    interpolation: str = INTERPOLATION_LINEAR,
+    latitude: float | None = None,
+) -> list[SiteBacktest]:
+    """Backtest the sites in column files, in a process pool for several sites."""
+    if len(paths) == 1 or workers == 1:
+        return [
+            backtest_site(
+                path, start, end, weight_half_life, interpolation, latitude
+            )
+            for path in paths
+        ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(
+                backtest_site,
+                paths,
+                repeat(start),
+                repeat(end),
+                repeat(weight_half_life),
+                repeat(interpolation),
+                repeat(latitude),
+            )
+        )
+
+
+def column_paths(path: str, site_ids: list[int] | None = None) -> list[str]:
+    """Return the monthly column files of a directory, or the one file given."""
+    if not os.path.isdir(path):
+        return [path]
+    names = sorted(name for name in os.listdir(path) if name.endswith(COLUMN_SUFFIX))
+    if site_ids:
+        wanted = {f"{site_id}{COLUMN_SUFFIX}" for site_id in site_ids}
+        names = [name for name in names if name in wanted]
+    return [os.path.join(path, name) for name in names]
+
+
+def _history_before(monthly: EnergyColumn, day: date) -> EnergyColumn | None:
+    """Return the months of history that were complete on day.
+
+    Columns read from disk are sliced without copying their values.
+    """
+    values = monthly.slice(monthly.start, day.replace(day=1) - timedelta(days=1))
+    if not values:
+        return None
+    return EnergyColumn(
+        RESOLUTION_MONTH,
+        monthly.first,
+        values,
+        monthly.production_start or monthly.start,
+    )
+
+
+def _past_periods(
+    production: DailyProduction, start: str, end: str
+) -> list[tuple[date, date]]:
+    """Return the forecast periods that ended within the cached production."""
+    start_month, start_day = parse_month_day(start)
+    end_month, end_day = parse_month_day(end)
+    periods = []
+    for year in range(production.first_day.year, production.last_day.year + 1):
+        period_start = clamped_date(year, start_month, start_day)
+        end_year = year + ((end_month, end_day) < (start_month, start_day))
+        period_end = clamped_date(end_year, end_month, end_day)
+        if production.first_day < period_start and period_end <= production.last_day:
+            periods.append((period_start, period_end))
+    return periods
+
+
+def _merged(results: list[SiteBacktest]) -> tuple[ErrorStats, dict[int, ErrorStats]]:
+    """Return the errors of all sites together."""
+    overall = ErrorStats()
+    by_month: dict[int, ErrorStats] = {}
+    for result in results:
+        overall.merge(result.overall)
+        for month, stats in result.by_month.items():
+            by_month.setdefault(month, ErrorStats()).merge(stats)
+    return overall, by_month
+
+
+def _format_row(label: str, summary: dict[str, Any]) -> str:
+    """Return one line of the report."""
+
+    def number(name: str) -> str:
+        value = summary.get(name)
+        return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+    return (
+        f"{label:<12} {summary['forecasts']:>9} {number('mae_kwh')} "
+        f"{number('rmse_kwh')} {number('bias_kwh')} {number('mape_pct')} "
+        f"{number('band_coverage_pct')}"
+    )
+
+
+def main() -> None:
+    """Run the backtest from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="History directory or one monthly column file")
+    parser.add_argument("--site", type=int, action="append", help="Only this site")
+    parser.add_argument("--start", default=DEFAULT_START, help="Period start, MM-DD")
+    parser.add_argument("--end", default=DEFAULT_END, help="Period end, MM-DD")
+    parser.add_argument("--weight-half-life", type=float, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--interpolation", choices=sorted(INTERPOLATIONS), default=INTERPOLATION_LINEAR
+    )
+    parser.add_argument(
+        "--latitude", type=float, help="Site latitude, for day_length interpolation"
+    )
+    parser.add_argument("--per-site", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = run_backtest(
+        column_paths(args.path, args.site),
+        args.start,
+        args.end,
+        args.weight_half_life,
+        args.workers,
+        args.interpolation,
+        args.latitude,
+    )
+    overall, by_month = _merged(results)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "overall": overall.summary(),
+                    "by_month": {
+                        month: stats.summary()
+                        for month, stats in sorted(by_month.items())
+                    },
+                    "sites": {
+                        result.site_id: {
+                            "periods": result.periods,
+                            "skipped_days": result.skipped_days,
+                            **result.overall.summary(),
+                        }
+                        for result in results
+                    },
+                },
+                indent=2,
+            )
+        )
+        return
+
+    print(
+        f"{len(results)} sites, {sum(result.periods for result in results)} "
+        f"periods, {sum(result.skipped_days for result in results)} days skipped"
+    )
+    print(
+        f"{'':<12} {'forecasts':>9} {'MAE kWh':>9} {'RMSE kWh':>9} "
+        f"{'bias kWh':>9} {'MAPE %':>9} {'in band %':>9}"
+    )
+    for month, stats in sorted(by_month.items()):
+        print(_format_row(f"month {month}", stats.summary()))
+    print(_format_row("all", overall.summary()))
+    if args.per_site:
+        for result in results:
+            print(_format_row(f"site {result.site_id}", result.overall.summary()))
+
+
+if __name__ == "__main__":
+    main()
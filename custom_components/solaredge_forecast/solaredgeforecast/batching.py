@@ -0,0 +1,108 @@
+"""Combine per-site SolarEdge requests into bulk requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+BATCH_WINDOW = 0.2
+MAX_BULK_SITES = 100
+
+BulkFetcher = Callable[[list[int], dict[str, Any]], Awaitable[dict[int, Any]]]
+
+
+class SiteRequestBatcher:
+    """Group requests with the same parameters into as few bulk calls as possible.
+
+    Requests for the same site and parameters that are already pending or in
+    flight share one result instead of being sent again.
+    """
+
+    def __init__(
+        self,
+        fetch_bulk: BulkFetcher,
+        window: float = BATCH_WINDOW,
+        max_sites: int = MAX_BULK_SITES,
+    ) -> None:
+        """Initialize the batcher."""
+        self._fetch_bulk = fetch_bulk
+        self._window = window
+        self._max_sites = max_sites
+        self._futures: dict[tuple[tuple, int], asyncio.Future] = {}
+        self._pending: dict[tuple, list[int]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def request(self, site_id: int, params: dict[str, Any]) -> Any:
+        """Return the result for one site once its batch has been fetched."""
+        key = tuple(sorted(params.items()))
+        future = self._futures.get((key, site_id))
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            future.add_done_callback(_retrieve_exception)
+            self._futures[(key, site_id)] = future
+            self._pending.setdefault(key, []).append(site_id)
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        """Send every pending group of requests."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        loop = asyncio.get_running_loop()
+        for key, site_ids in pending.items():
+            for index in range(0, len(site_ids), self._max_sites):
+                task = loop.create_task(
+                    self._fetch(key, site_ids[index : index + self._max_sites])
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, key: tuple, site_ids: list[int]) -> None:
+        """Fetch one bulk request and resolve the waiting futures."""
+        futures = {site_id: self._futures[(key, site_id)] for site_id in site_ids}
+        try:
+            results = await self._fetch_bulk(site_ids, dict(key))
+        except Exception as err:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(err)
+            return
+        finally:
+            for site_id in site_ids:
+                self._futures.pop((key, site_id), None)
+
+        for site_id, future in futures.items():
+            if future.done():
+                continue
+            if site_id in results:
+                future.set_result(results[site_id])
+            else:
+                future.set_exception(
+                    LookupError(f"SolarEdge returned no data for site {site_id}")
+                )
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark the error of a shared future as seen.
+
+    Callers wait through ``asyncio.shield``. When all of them were cancelled,
+    for example because their refresh timed out, nobody awaits the future
+    and asyncio would log its error as never retrieved.
+    """
+    if not future.cancelled():
+        future.exception()
+
+
+def bulk_site_items(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the per-site entries of a SolarEdge bulk response."""
+    for container in payload.values():
+        if not isinstance(container, dict):
+            continue
+        for value in container.values():
+            if isinstance(value, list):
+                return [item for item in value if isinstance(item, dict)]
+    return []
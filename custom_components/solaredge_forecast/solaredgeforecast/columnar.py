@@ -0,0 +1,238 @@
+"""Fixed-width binary energy columns with memory-mapped reads.
+
+Every site has one file per resolution. A file starts with a small header
+and is followed by one little-endian float64 per month or day in Wh::
+
+    magic  version  resolution  first period  production start  (values...)
+    4s     B        B           i             i
+
+The first period is a month index (``year * 12 + month - 1``) or a date
+ordinal, so the value of a period sits at a fixed offset. Closed periods never
+change, so new values are appended without rewriting the file. Reads map the
+file and return a view, nothing is parsed.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+import mmap
+import os
+import struct
+import sys
+
+RESOLUTION_MONTH = "month"
+RESOLUTION_DAY = "day"
+
+_MAGIC = b"SEFC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBxxii")
+_RESOLUTION_CODES = {RESOLUTION_MONTH: 1, RESOLUTION_DAY: 2}
+_VALUE_SIZE = struct.calcsize("<d")
+
+
+def month_index(value: date) -> int:
+    """Return the month index of the month containing value."""
+    return value.year * 12 + value.month - 1
+
+
+def period_index(resolution: str, value: date) -> int:
+    """Return the period index of a date for a resolution."""
+    if resolution == RESOLUTION_MONTH:
+        return month_index(value)
+    return value.toordinal()
+
+
+def period_date(resolution: str, index: int) -> date:
+    """Return the first day of the period with this index."""
+    if resolution == RESOLUTION_MONTH:
+        year, month = divmod(index, 12)
+        return date(year, month + 1, 1)
+    return date.fromordinal(index)
+
+
+@dataclass(frozen=True)
+class EnergyColumn:
+    """Energy of consecutive months or days, starting at one period.
+
+    ``values`` is an ``array`` for columns built in memory and a read-only
+    ``memoryview`` for columns read from disk.
+    """
+
+    resolution: str
+    first: int
+    values: Sequence[float]
+    production_start: date | None = None
+
+    @classmethod
+    def empty(
+        cls, resolution: str, start: date, production_start: date | None = None
+    ) -> EnergyColumn:
+        """Return a column without values that starts at a date."""
+        return cls(
+            resolution, period_index(resolution, start), array("d"), production_start
+        )
+
+    def __len__(self) -> int:
+        """Return the number of periods in the column."""
+        return len(self.values)
+
+    @property
+    def start(self) -> date:
+        """Return the first day of the first period."""
+        return period_date(self.resolution, self.first)
+
+    @property
+    def end(self) -> date | None:
+        """Return the first day of the last period."""
+        if not self.values:
+            return None
+        return period_date(self.resolution, self.first + len(self.values) - 1)
+
+    def value(self, period: date) -> float | None:
+        """Return the energy of the period containing a date."""
+        offset = period_index(self.resolution, period) - self.first
+        if not 0 <= offset < len(self.values):
+            return None
+        return self.values[offset]
+
+    def slice(self, start: date, end: date) -> Sequence[float]:
+        """Return the values of the periods from start to end, without a copy."""
+        first = max(0, period_index(self.resolution, start) - self.first)
+        last = max(first, period_index(self.resolution, end) - self.first + 1)
+        return self.values[first:last]
+
+    def extended(self, values: Sequence[float]) -> EnergyColumn:
+        """Return a copy of the column with values appended after its end."""
+        combined = array("d", self.values)
+        combined.extend(values)
+        return EnergyColumn(
+            self.resolution, self.first, combined, self.production_start
+        )
+
+
+class ColumnarEnergyStore:
+    """Read and append energy columns in a directory, one file per column."""
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the store."""
+        self.directory = directory
+
+    def read(self, site_id: int, resolution: str) -> EnergyColumn | None:
+        """Map the column of a site, or return None when there is none."""
+        try:
+            with open(self._path(site_id, resolution), "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        header = _read_header(mapped, resolution)
+        if header is None:
+            mapped.close()
+            return None
+        first, production_start = header
+        count = (len(mapped) - _HEADER.size) // _VALUE_SIZE
+        values = memoryview(mapped)[
+            _HEADER.size : _HEADER.size + count * _VALUE_SIZE
+        ]
+        if sys.byteorder == "little":
+            column_values: Sequence[float] = values.cast("d")
+        else:
+            column_values = array("d", values.tobytes())
+            column_values.byteswap()
+        return EnergyColumn(
+            resolution,
+            first,
+            column_values,
+            date.fromordinal(production_start) if production_start else None,
+        )
+
+    def write(self, site_id: int, column: EnergyColumn) -> None:
+        """Store a column, appending when it continues the stored one."""
+        stored = self.read(site_id, column.resolution)
+        if (
+            stored is not None
+            and stored.first == column.first
+            and stored.production_start == column.production_start
+            and len(stored) <= len(column)
+        ):
+            new_values = column.values[len(stored) :]
+            if len(new_values):
+                with open(self._path(site_id, column.resolution), "ab") as file:
+                    file.write(_pack_values(new_values))
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(site_id, column.resolution)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    _VERSION,
+                    _RESOLUTION_CODES[column.resolution],
+                    column.first,
+                    column.production_start.toordinal()
+                    if column.production_start
+                    else 0,
+                )
+            )
+            file.write(_pack_values(column.values))
+        os.replace(temporary, path)
+
+    def remove(self, site_id: int) -> None:
+        """Remove every column of a site."""
+        for resolution in _RESOLUTION_CODES:
+            try:
+                os.remove(self._path(site_id, resolution))
+            except FileNotFoundError:
+                pass
+
+    def _path(self, site_id: int, resolution: str) -> str:
+        """Return the file of a column."""
+        return os.path.join(self.directory, f"{site_id}.{resolution}.bin")
+
+
+def column_from_months(
+    months: dict[str, float], production_start: date | None
+) -> EnergyColumn | None:
+    """Return a monthly column from totals keyed by ``YYYY-MM``.
+
+    Months missing between the first and the last month are stored as 0,
+    which the forecast skips like months without production.
+    """
+    if not months:
+        return None
+    indexes = {
+        month_index(date(int(key[:4]), int(key[5:7]), 1)): value
+        for key, value in months.items()
+    }
+    first = min(indexes)
+    values = array(
+        "d", (indexes.get(index, 0) for index in range(first, max(indexes) + 1))
+    )
+    return EnergyColumn(RESOLUTION_MONTH, first, values, production_start)
+
+
+def _read_header(mapped: mmap.mmap, resolution: str) -> tuple[int, int] | None:
+    """Return the first period and production start of a valid file."""
+    if len(mapped) < _HEADER.size:
+        return None
+    magic, version, code, first, production_start = _HEADER.unpack_from(mapped)
+    if (
+        magic != _MAGIC
+        or version != _VERSION
+        or code != _RESOLUTION_CODES[resolution]
+    ):
+        return None
+    return first, production_start
+
+
+def _pack_values(values: Sequence[float]) -> bytes:
+    """Return values as little-endian float64."""
+    packed = array("d", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
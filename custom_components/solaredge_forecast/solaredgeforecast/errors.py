@@ -0,0 +1,89 @@
+"""Errors raised for SolarEdge requests, with secrets redacted."""
+
+from __future__ import annotations
+
+from ..util import redact_sensitive_values
+from .retry import THROTTLING_STATUS, TRANSIENT_STATUSES
+
+# Errors without an HTTP status, such as timeouts and connection errors, are
+# classified by their message.
+TRANSIENT_ERROR_MARKERS = (
+    "429",
+    "500",
+    "502",
+    "503",
+    "504",
+    "bad gateway",
+    "gateway timeout",
+    "server error",
+    "service unavailable",
+    "timeout",
+    "timed out",
+    "temporarily unavailable",
+    "too many requests",
+    "cannot connect",
+)
+THROTTLING_ERROR_MARKERS = (
+    "429",
+    "too many requests",
+)
+
+
+class SolarEdgeApiError(Exception):
+    """Raised when SolarEdge returns an error with secrets redacted."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        """Initialize the error with the HTTP status, when there is one."""
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def is_transient(self) -> bool:
+        """Return whether retrying later may succeed."""
+        return self.status in TRANSIENT_STATUSES
+
+    @property
+    def is_throttled(self) -> bool:
+        """Return whether SolarEdge rejected the request for rate limits."""
+        return self.status == THROTTLING_STATUS
+
+
+class SolarEdgeBudgetExhausted(SolarEdgeApiError):
+    """Raised when the shared daily request budget is used up."""
+
+    @property
+    def is_transient(self) -> bool:
+        """Return True, the budget is renewed the next day."""
+        return True
+
+
+class SolarEdgeUnavailable(SolarEdgeApiError):
+    """Raised without calling SolarEdge while the circuit breaker is open."""
+
+    @property
+    def is_transient(self) -> bool:
+        """Return True, the circuit is probed again after a while."""
+        return True
+
+
+def is_transient_error(err: Exception) -> bool:
+    """Return whether a refresh error is likely temporary.
+
+    SolarEdge errors are classified by their HTTP status. Errors without a
+    status, such as timeouts and connection errors, fall back to the message.
+    """
+    if isinstance(err, SolarEdgeApiError):
+        if err.is_transient:
+            return True
+        if err.status is not None:
+            return False
+    normalized = redact_sensitive_values(str(err)).lower()
+    return any(marker in normalized for marker in TRANSIENT_ERROR_MARKERS)
+
+
+def is_throttling_error(err: Exception) -> bool:
+    """Return whether SolarEdge rejected a request because of rate limits."""
+    if isinstance(err, SolarEdgeApiError) and err.status is not None:
+        return err.is_throttled
+    normalized = redact_sensitive_values(str(err)).lower()
+    return any(marker in normalized for marker in THROTTLING_ERROR_MARKERS)
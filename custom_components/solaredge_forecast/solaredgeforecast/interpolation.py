@@ -0,0 +1,330 @@
+"""Interpolated daily energy between monthly reference points.
+
+Every strategy computes the energy of each day from the first to the last
+point once, together with the running total, so a daily value or a range sum
+is a list lookup however often the forecast asks for it. Before the first
+and after the last point the energy of the nearest point continues.
+
+``EnergyCalendar`` keeps the result by day of the year, so a site's curve is
+only interpolated again when its monthly means change.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from array import array
+from calendar import isleap, monthrange
+from collections.abc import Callable
+from datetime import date
+from functools import lru_cache, partial
+from itertools import accumulate
+import math
+
+INTERPOLATION_LINEAR = "linear"
+INTERPOLATION_PCHIP = "pchip"
+INTERPOLATION_DAY_LENGTH = "day_length"
+
+# Years that stand for every leap and common year in an EnergyCalendar.
+LEAP_YEAR = 2000
+COMMON_YEAR = 2001
+CALENDAR_CACHE_SIZE = 64
+
+Points = list[tuple[date, float]]
+EnergyFactory = Callable[[Points], "InterpolatedEnergy"]
+
+
+class InterpolatedEnergy(ABC):
+    """Daily energy through monthly points, precomputed for every day."""
+
+    def __init__(self, points: Points) -> None:
+        """Precompute the energy and the energy before every day."""
+        if not points:
+            raise ValueError("No monthly production data available for interpolation")
+
+        self._first = points[0][0].toordinal()
+        self._daily = self._curve(
+            [point_date.toordinal() for point_date, _ in points],
+            [value for _, value in points],
+        )
+        self._cumulative = list(accumulate(self._daily, initial=0.0))
+
+    @abstractmethod
+    def _curve(self, ordinals: list[int], values: list[float]) -> list[float]:
+        """Return the energy of every day from the first to the last point."""
+
+    def daily(self, day: date) -> float:
+        """Return the interpolated energy for a single day."""
+        offset = min(max(day.toordinal() - self._first, 0), len(self._daily) - 1)
+        return self._daily[offset]
+
+    def days(self, start_date: date, count: int) -> list[float]:
+        """Return the energy of count consecutive days from start_date."""
+        offset = start_date.toordinal() - self._first
+        last = len(self._daily) - 1
+        return [
+            self._daily[min(max(offset + index, 0), last)] for index in range(count)
+        ]
+
+    def total(self, start_date: date, end_date: date) -> float:
+        """Return the energy summed over an inclusive date range."""
+        if start_date > end_date:
+            return 0
+        return self._energy_before(end_date.toordinal() + 1) - self._energy_before(
+            start_date.toordinal()
+        )
+
+    def _energy_before(self, ordinal: int) -> float:
+        """Return the energy of the days from the first point up to ordinal."""
+        offset = ordinal - self._first
+        if offset <= 0:
+            return offset * self._daily[0]
+        days = len(self._daily)
+        if offset >= days:
+            return self._cumulative[-1] + (offset - days) * self._daily[-1]
+        return self._cumulative[offset]
+
+
+class LinearEnergy(InterpolatedEnergy):
+    """Daily energy on straight lines between the points."""
+
+    def _curve(self, ordinals: list[int], values: list[float]) -> list[float]:
+        """Return the energy of every day from the first to the last point."""
+        return _linear_curve(ordinals, values)
+
+
+class PchipEnergy(InterpolatedEnergy):
+    """Daily energy on a monotone cubic curve through the points (PCHIP).
+
+    The curve is smooth at the points, where the linear one has a kink at
+    every summer and winter month, and never overshoots the monthly values.
+    """
+
+    def _curve(self, ordinals: list[int], values: list[float]) -> list[float]:
+        """Return the energy of every day from the first to the last point."""
+        if len(ordinals) < 3:
+            return _linear_curve(ordinals, values)
+
+        spans = [end - start for start, end in zip(ordinals, ordinals[1:])]
+        secants = [
+            (end - start) / span for start, end, span in zip(values, values[1:], spans)
+        ]
+        slopes = _pchip_slopes(spans, secants)
+
+        daily: list[float] = []
+        for index, span in enumerate(spans):
+            start, end = values[index], values[index + 1]
+            start_slope = slopes[index] * span
+            end_slope = slopes[index + 1] * span
+            for elapsed in range(span):
+                t = elapsed / span
+                t2 = t * t
+                t3 = t2 * t
+                daily.append(
+                    (2 * t3 - 3 * t2 + 1) * start
+                    + (t3 - 2 * t2 + t) * start_slope
+                    + (3 * t2 - 2 * t3) * end
+                    + (t3 - t2) * end_slope
+                )
+        daily.append(values[-1])
+        return daily
+
+
+class DayLengthEnergy(InterpolatedEnergy):
+    """Daily energy following the clear-sky day length at the site's latitude.
+
+    Each point is divided by the mean day length of its month, the ratios are
+    interpolated linearly and every day gets its ratio times its own day
+    length. The curve follows the seasons between the points instead of a
+    straight line, most noticeably around the solstices.
+    """
+
+    def __init__(self, points: Points, latitude: float) -> None:
+        """Precompute the energy for a site at latitude degrees north."""
+        self._day_lengths = day_lengths(latitude)
+        super().__init__(points)
+
+    def _curve(self, ordinals: list[int], values: list[float]) -> list[float]:
+        """Return the energy of every day from the first to the last point."""
+        ratios = []
+        for ordinal, value in zip(ordinals, values):
+            day = date.fromordinal(ordinal)
+            offset = _day_of_year(day.replace(day=1)) - 1
+            days = monthrange(day.year, day.month)[1]
+            month_length = sum(self._day_lengths[offset : offset + days]) / days
+            ratios.append(value / month_length if month_length else 0.0)
+
+        lengths: list[float] = []
+        ordinal = ordinals[0]
+        while ordinal <= ordinals[-1]:
+            day = date.fromordinal(ordinal)
+            offset = _day_of_year(day) - 1
+            count = min(
+                date(day.year + 1, 1, 1).toordinal() - ordinal,
+                ordinals[-1] - ordinal + 1,
+            )
+            lengths.extend(self._day_lengths[offset : offset + count])
+            ordinal += count
+
+        return [
+            ratio * length
+            for ratio, length in zip(_linear_curve(ordinals, ratios), lengths)
+        ]
+
+
+class EnergyCalendar:
+    """Expected daily energy by day of the year, from calendar month means.
+
+    A leap and a common year each get a table with the energy of every day
+    and the energy before it, built on first use from the points of the year
+    and of the months around it, so the curve runs on through New Year. Daily
+    values and range sums of any date are then plain indexing.
+    """
+
+    def __init__(
+        self, averages: dict[int, float], energy_factory: EnergyFactory
+    ) -> None:
+        """Initialize the calendar with the mean daily energy of each month."""
+        self._averages = averages
+        self._energy_factory = energy_factory
+        self._tables: dict[bool, tuple[array, array]] = {}
+
+    def daily(self, day: date) -> float:
+        """Return the expected energy of a single day."""
+        daily, _ = self._table(day.year)
+        return daily[_day_of_year(day) - 1]
+
+    def total(self, start_date: date, end_date: date) -> float:
+        """Return the expected energy summed over an inclusive date range."""
+        if start_date > end_date:
+            return 0
+        total = 0.0
+        for year in range(start_date.year, end_date.year + 1):
+            daily, cumulative = self._table(year)
+            first = _day_of_year(start_date) - 1 if year == start_date.year else 0
+            last = _day_of_year(end_date) if year == end_date.year else len(daily)
+            total += cumulative[last] - cumulative[first]
+        return total
+
+    def _table(self, year: int) -> tuple[array, array]:
+        """Return the daily and cumulative energy of a year like year."""
+        leap = isleap(year)
+        table = self._tables.get(leap)
+        if table is None:
+            table = self._tables[leap] = self._build(
+                LEAP_YEAR if leap else COMMON_YEAR
+            )
+        return table
+
+    def _build(self, year: int) -> tuple[array, array]:
+        """Interpolate the energy of every day of year."""
+        points = []
+        # From November of the year before until February of the year after.
+        for index in range(year * 12 - 2, year * 12 + 14):
+            point_year, month = divmod(index, 12)
+            value = self._averages.get(month + 1)
+            if value is not None:
+                points.append((date(point_year, month + 1, 15), value))
+
+        days = 366 if isleap(year) else 365
+        daily = array("d", self._energy_factory(points).days(date(year, 1, 1), days))
+        return daily, array("d", accumulate(daily, initial=0.0))
+
+
+INTERPOLATIONS: dict[str, type[InterpolatedEnergy]] = {
+    INTERPOLATION_LINEAR: LinearEnergy,
+    INTERPOLATION_PCHIP: PchipEnergy,
+    INTERPOLATION_DAY_LENGTH: DayLengthEnergy,
+}
+
+
+def interpolation_factory(
+    method: str, latitude: float | None = None
+) -> EnergyFactory:
+    """Return what builds the daily energy of a strategy from monthly points."""
+    energy_class = INTERPOLATIONS.get(method)
+    if energy_class is None:
+        raise ValueError(f"Unknown interpolation: {method}")
+    if energy_class is DayLengthEnergy:
+        if latitude is None:
+            raise ValueError("The day length interpolation needs the site latitude")
+        return partial(DayLengthEnergy, latitude=latitude)
+    return energy_class
+
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def energy_calendar(
+    averages: tuple[tuple[int, float], ...], method: str, latitude: float | None
+) -> EnergyCalendar:
+    """Return the calendar of monthly means given as (month, kWh) pairs.
+
+    Calendars are shared, so the days are only interpolated again when the
+    means, the strategy or the latitude change.
+    """
+    return EnergyCalendar(dict(averages), interpolation_factory(method, latitude))
+
+
+@lru_cache(maxsize=8)
+def day_lengths(latitude: float) -> tuple[float, ...]:
+    """Return the hours from sunrise to sunset of every day of the year.
+
+    Indexed by the day of the year minus one, at latitude degrees north. Uses
+    the solar declination approximation of FAO-56, without refraction, and
+    gives 0 or 24 during the polar night and day.
+    """
+    phi = math.radians(latitude)
+    lengths = []
+    for day_of_year in range(1, 367):
+        declination = 0.409 * math.sin(2 * math.pi * day_of_year / 365 - 1.39)
+        cos_hour_angle = -math.tan(phi) * math.tan(declination)
+        lengths.append(24 / math.pi * math.acos(min(max(cos_hour_angle, -1.0), 1.0)))
+    return tuple(lengths)
+
+
+def _day_of_year(day: date) -> int:
+    """Return the number of the day in its year, starting at 1."""
+    return day.toordinal() - date(day.year, 1, 1).toordinal() + 1
+
+
+def _linear_curve(ordinals: list[int], values: list[float]) -> list[float]:
+    """Return the straight lines between points for every day between them."""
+    daily: list[float] = []
+    for index in range(len(ordinals) - 1):
+        span = ordinals[index + 1] - ordinals[index]
+        start = values[index]
+        delta = values[index + 1] - start
+        daily.extend(start + delta * elapsed / span for elapsed in range(span))
+    daily.append(values[-1])
+    return daily
+
+
+def _pchip_slopes(spans: list[int], secants: list[float]) -> list[float]:
+    """Return the slope at every point that keeps the curve monotone.
+
+    Fritsch-Carlson: a weighted harmonic mean of the neighbouring secants,
+    zero at local extremes, and a one-sided estimate at both ends.
+    """
+    slopes = [0.0] * (len(spans) + 1)
+    for index in range(1, len(spans)):
+        before, after = secants[index - 1], secants[index]
+        if before * after <= 0:
+            continue
+        weight_before = 2 * spans[index] + spans[index - 1]
+        weight_after = spans[index] + 2 * spans[index - 1]
+        slopes[index] = (weight_before + weight_after) / (
+            weight_before / before + weight_after / after
+        )
+    slopes[0] = _pchip_end_slope(spans[0], spans[1], secants[0], secants[1])
+    slopes[-1] = _pchip_end_slope(spans[-1], spans[-2], secants[-1], secants[-2])
+    return slopes
+
+
+def _pchip_end_slope(
+    span: int, next_span: int, secant: float, next_secant: float
+) -> float:
+    """Return the slope at an end point from the two nearest segments."""
+    slope = ((2 * span + next_span) * secant - span * next_secant) / (span + next_span)
+    if slope * secant <= 0:
+        return 0.0
+    if secant * next_secant <= 0 and abs(slope) > abs(3 * secant):
+        return 3 * secant
+    return slope
@@ -0,0 +1,248 @@
+"""Quarter-hour production history and time-of-day profiles."""
+
+from __future__ import annotations
+
+from array import array
+import base64
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+import math
+from typing import Any
+
+from .streaming import EnergySeries
+
+SLOTS_PER_DAY = 96
+SLOT_MINUTES = 15
+
+
+@dataclass
+class DeferredRange:
+    """Days whose quarter-hour values are not requested again before a date."""
+
+    start: date
+    end: date
+    retry_on: date
+    attempts: int = 1
+
+
+class IntradayHistory:
+    """Quarter-hour production of one site in a flat day-major array.
+
+    Every day takes ``SLOTS_PER_DAY`` consecutive float32 values in Wh, so a
+    year of data is about 140 kB and a day is a plain slice. Slots that have
+    not been fetched yet are NaN, fetched slots without a value are 0.
+    Ranges that SolarEdge failed to return are deferred, so they are not
+    requested again until their retry date.
+    """
+
+    def __init__(
+        self,
+        first_day: date | None = None,
+        values: array | None = None,
+        deferred: list[DeferredRange] | None = None,
+    ) -> None:
+        """Initialize the history."""
+        self.first_day = first_day
+        self.values = values if values is not None else array("f")
+        self.deferred = deferred if deferred is not None else []
+        self.modified = False
+
+    @property
+    def days(self) -> int:
+        """Return the number of days in the history."""
+        return len(self.values) // SLOTS_PER_DAY
+
+    @property
+    def last_day(self) -> date | None:
+        """Return the last day in the history."""
+        if self.first_day is None or not self.days:
+            return None
+        return self.first_day + timedelta(days=self.days - 1)
+
+    def add_series(self, series: EnergySeries) -> None:
+        """Store the quarter-hour values of a SolarEdge energy series."""
+        if not len(series):
+            return
+        self._ensure_day(date.fromordinal(min(series.days)))
+        self._ensure_day(date.fromordinal(max(series.days)))
+        first = self.first_day.toordinal()
+        for day, minute, value in zip(series.days, series.minutes, series.values):
+            slot = (day - first) * SLOTS_PER_DAY + minute // SLOT_MINUTES
+            self.values[slot] = 0 if math.isnan(value) else value
+        self.modified = True
+
+    def cover(self, start_date: date, end_date: date) -> None:
+        """Mark a fetched range as known, even where SolarEdge had no values.
+
+        Call it after adding the values of the range.
+        """
+        self._ensure_day(start_date)
+        self._ensure_day(end_date)
+        first = (start_date - self.first_day).days * SLOTS_PER_DAY
+        last = ((end_date - self.first_day).days + 1) * SLOTS_PER_DAY
+        for slot in range(first, last):
+            if math.isnan(self.values[slot]):
+                self.values[slot] = 0
+                self.modified = True
+        self._clear_deferred(start_date, end_date)
+
+    def failed_attempts(self, start_date: date, end_date: date) -> int:
+        """Return how often requests of days in a range have failed in a row."""
+        return max(
+            (
+                deferred.attempts
+                for deferred in self.deferred
+                if deferred.start <= end_date and start_date <= deferred.end
+            ),
+            default=0,
+        )
+
+    def defer(
+        self, start_date: date, end_date: date, retry_on: date, attempts: int
+    ) -> None:
+        """Skip the days of a failed request until retry_on."""
+        self._clear_deferred(start_date, end_date)
+        self.deferred.append(DeferredRange(start_date, end_date, retry_on, attempts))
+        self.modified = True
+
+    def is_deferred(self, day: date, today: date) -> bool:
+        """Return whether a day is not to be requested today."""
+        return any(
+            deferred.start <= day <= deferred.end and today < deferred.retry_on
+            for deferred in self.deferred
+        )
+
+    def missing_days(self, start_date: date, end_date: date) -> list[date]:
+        """Return the days from start_date to end_date that were not fetched."""
+        missing = []
+        day = start_date
+        while day <= end_date:
+            row = self.day(day)
+            if row is None or math.isnan(sum(row)):
+                missing.append(day)
+            day += timedelta(days=1)
+        return missing
+
+    def trim(self, keep_from: date) -> None:
+        """Drop the days before keep_from."""
+        if self.first_day is None or keep_from <= self.first_day:
+            return
+        drop_days = min(self.days, (keep_from - self.first_day).days)
+        del self.values[: drop_days * SLOTS_PER_DAY]
+        self.first_day = keep_from
+        self.deferred = [
+            deferred for deferred in self.deferred if deferred.end >= keep_from
+        ]
+        self.modified = True
+
+    def day(self, day: date) -> array | None:
+        """Return the quarter-hour values of one day."""
+        if self.first_day is None:
+            return None
+        offset = (day - self.first_day).days
+        if not 0 <= offset < self.days:
+            return None
+        return self.values[offset * SLOTS_PER_DAY : (offset + 1) * SLOTS_PER_DAY]
+
+    def month_profile(self, month: int) -> list[float] | None:
+        """Return the average share of daily production at every slot end.
+
+        Only complete days with production in the calendar month are used.
+        """
+        if self.first_day is None:
+            return None
+
+        totals = [0.0] * SLOTS_PER_DAY
+        day_count = 0
+        current = self.first_day
+        for offset in range(self.days):
+            if current.month == month:
+                row = self.values[
+                    offset * SLOTS_PER_DAY : (offset + 1) * SLOTS_PER_DAY
+                ]
+                day_total = sum(row)
+                if day_total > 0 and not math.isnan(day_total):
+                    cumulative = 0.0
+                    for slot, value in enumerate(row):
+                        cumulative += value
+                        totals[slot] += cumulative / day_total
+                    day_count += 1
+            current += timedelta(days=1)
+
+        if not day_count:
+            return None
+        return [total / day_count for total in totals]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the history in a form that can be stored as JSON."""
+        return {
+            "first_day": self.first_day.isoformat() if self.first_day else None,
+            "values": base64.b64encode(self.values.tobytes()).decode("ascii"),
+            "deferred": [
+                [
+                    deferred.start.isoformat(),
+                    deferred.end.isoformat(),
+                    deferred.retry_on.isoformat(),
+                    deferred.attempts,
+                ]
+                for deferred in self.deferred
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> IntradayHistory:
+        """Restore a history stored with as_dict."""
+        if not data:
+            return cls()
+        deferred = [
+            DeferredRange(
+                date.fromisoformat(start),
+                date.fromisoformat(end),
+                date.fromisoformat(retry_on),
+                attempts,
+            )
+            for start, end, retry_on, attempts in data.get("deferred", [])
+        ]
+        if not data.get("first_day"):
+            return cls(deferred=deferred)
+        values = array("f")
+        values.frombytes(base64.b64decode(data["values"]))
+        return cls(date.fromisoformat(data["first_day"]), values, deferred)
+
+    def _clear_deferred(self, start_date: date, end_date: date) -> None:
+        """Forget the failures of days in a range."""
+        deferred = [
+            deferred
+            for deferred in self.deferred
+            if deferred.end < start_date or end_date < deferred.start
+        ]
+        if len(deferred) != len(self.deferred):
+            self.deferred = deferred
+            self.modified = True
+
+    def _ensure_day(self, day: date) -> None:
+        """Grow the array so that it covers day."""
+        if self.first_day is None:
+            self.first_day = day
+        if day < self.first_day:
+            padding = array("f", [math.nan]) * (
+                (self.first_day - day).days * SLOTS_PER_DAY
+            )
+            self.values = padding + self.values
+            self.first_day = day
+            self.modified = True
+        missing = (day - self.first_day).days + 1 - self.days
+        if missing > 0:
+            self.values.extend(array("f", [math.nan]) * (missing * SLOTS_PER_DAY))
+            self.modified = True
+
+
+def produced_share(profile: list[float], moment: time) -> float:
+    """Return the share of a day's production expected before a time of day."""
+    minutes = moment.hour * 60 + moment.minute + moment.second / 60
+    slot, remainder = divmod(minutes, SLOT_MINUTES)
+    slot = int(slot)
+    if slot >= SLOTS_PER_DAY:
+        return 1.0
+    previous = profile[slot - 1] if slot else 0.0
+    return previous + (profile[slot] - previous) * remainder / SLOT_MINUTES
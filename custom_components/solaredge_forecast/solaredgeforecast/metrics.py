@@ -0,0 +1,74 @@
+"""Counters and timings for SolarEdge requests and forecast stages."""
+
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+import time
+from typing import Any
+
+_DISABLED_SPAN = nullcontext()
+
+
+@dataclass
+class StageTiming:
+    """Timing statistics of one instrumented stage."""
+
+    count: int = 0
+    total: float = 0
+    last: float = 0
+    max: float = 0
+
+    def add(self, duration: float) -> None:
+        """Record one run of the stage."""
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        self.max = max(self.max, duration)
+
+
+class ForecastMetrics:
+    """Collect API counters and stage timings.
+
+    Counters are plain integer increments. Timing spans only read the clock
+    while the metrics are enabled, otherwise a shared no-op context is used.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """Initialize the metrics."""
+        self.enabled = enabled
+        self.counters: Counter[str] = Counter()
+        self.timings: dict[str, StageTiming] = {}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increase a counter."""
+        self.counters[name] += amount
+
+    def span(self, name: str):
+        """Return a context manager that times the stage with this name."""
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        """Time the wrapped block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = StageTiming()
+            timing.add(time.perf_counter() - started)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics in a JSON serializable form."""
+        return {
+            "enabled": self.enabled,
+            "counters": dict(sorted(self.counters.items())),
+            "timings": {
+                name: asdict(timing) for name, timing in sorted(self.timings.items())
+            },
+        }
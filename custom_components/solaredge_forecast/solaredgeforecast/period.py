@@ -0,0 +1,38 @@
+"""Forecast periods that repeat every year, like January 1 - December 31."""
+
+from __future__ import annotations
+
+from calendar import monthrange
+from datetime import date
+
+
+def clamped_date(year: int, month: int, day: int) -> date:
+    """Return a date, moving days past the end of the month to its last day."""
+    return date(year, month, min(day, monthrange(year, month)[1]))
+
+
+def parse_month_day(value: str) -> tuple[int, int]:
+    """Return the month and day of a MM-DD string."""
+    month, day = (int(part) for part in value.split("-"))
+    clamped_date(2000, month, day)
+    return month, day
+
+
+def active_forecast_period(
+    start_month: int, start_day: int, end_month: int, end_day: int, today: date
+) -> tuple[date, date]:
+    """Return the forecast period that contains today or starts next.
+
+    The period ends on the first end date on or after today and starts on
+    the last start date before that. Between the end of one period and the
+    start of the next this is the upcoming period.
+    """
+    enddate = clamped_date(today.year, end_month, end_day)
+    if enddate < today:
+        enddate = clamped_date(today.year + 1, end_month, end_day)
+
+    start_year = enddate.year
+    if (start_month, start_day) > (end_month, end_day):
+        start_year -= 1
+
+    return clamped_date(start_year, start_month, start_day), enddate
@@ -0,0 +1,105 @@
+"""Vectorized daily energy profiles for bulk forecasts.
+
+The forecast itself only needs a few range sums, see ``InterpolatedEnergy``.
+This module builds the complete daily curve for many sites or windows at
+once, for example for backtests and fleet reports, and needs NumPy.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date, timedelta
+
+import numpy as np
+
+
+class DailyEnergyProfile:
+    """Expected daily kWh for a span of days, one row per site."""
+
+    def __init__(self, start_date: date, energy: np.ndarray) -> None:
+        """Initialize the profile from a sites by days array."""
+        self.start_date = start_date
+        self.energy = np.atleast_2d(energy)
+        self._cumulative = np.zeros(
+            (self.energy.shape[0], self.energy.shape[1] + 1), dtype=float
+        )
+        np.cumsum(self.energy, axis=1, out=self._cumulative[:, 1:])
+
+    @classmethod
+    def from_points(
+        cls,
+        points: list[tuple[date, float]],
+        start_date: date,
+        end_date: date,
+    ) -> DailyEnergyProfile:
+        """Build the profile of one site from its interpolation points."""
+        point_dates = [point_date for point_date, _ in points]
+        values = np.array([[value for _, value in points]], dtype=float)
+        return cls.from_values(point_dates, values, start_date, end_date)
+
+    @classmethod
+    def from_values(
+        cls,
+        point_dates: Sequence[date],
+        values: np.ndarray,
+        start_date: date,
+        end_date: date,
+    ) -> DailyEnergyProfile:
+        """Build profiles for many sites that share the same point dates.
+
+        ``values`` holds one row of daily kWh per site and one column per
+        point date. The interpolation weights are computed once and applied
+        to all rows together.
+        """
+        if not point_dates:
+            raise ValueError("No monthly production data available for interpolation")
+        if end_date < start_date:
+            raise ValueError("The end date must not be before the start date")
+
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        point_ordinals = np.array([day.toordinal() for day in point_dates])
+        days = np.arange(start_date.toordinal(), end_date.toordinal() + 1)
+
+        if len(point_ordinals) == 1:
+            return cls(start_date, np.repeat(values, len(days), axis=1))
+
+        clipped = np.clip(days, point_ordinals[0], point_ordinals[-1])
+        index = np.searchsorted(point_ordinals, clipped, side="right") - 1
+        index = np.minimum(index, len(point_ordinals) - 2)
+        span = point_ordinals[index + 1] - point_ordinals[index]
+        fraction = (clipped - point_ordinals[index]) / span
+
+        energy = (
+            values[:, index] * (1 - fraction) + values[:, index + 1] * fraction
+        )
+        return cls(start_date, energy)
+
+    @property
+    def end_date(self) -> date:
+        """Return the last day of the profile."""
+        return self.start_date + timedelta(days=self.energy.shape[1] - 1)
+
+    def totals(
+        self,
+        start_dates: Sequence[date] | date,
+        end_dates: Sequence[date] | date,
+    ) -> np.ndarray:
+        """Return energy totals over inclusive ranges for every site.
+
+        The result has one row per site and one column per range. Ranges that
+        are empty sum to zero; ranges must lie within the profile.
+        """
+        starts = self._offsets(start_dates)
+        ends = self._offsets(end_dates) + 1
+        if (starts < 0).any() or (ends > self.energy.shape[1]).any():
+            raise ValueError("Date range is outside of the energy profile")
+
+        ends = np.maximum(ends, starts)
+        return self._cumulative[:, ends] - self._cumulative[:, starts]
+
+    def _offsets(self, dates: Sequence[date] | date) -> np.ndarray:
+        """Return day offsets from the start of the profile."""
+        if isinstance(dates, date):
+            dates = [dates]
+        start = self.start_date.toordinal()
+        return np.array([day.toordinal() - start for day in dates], dtype=int)
@@ -0,0 +1,310 @@
+"""Local stand-in for the SolarEdge monitoring API.
+
+The server replays recorded payloads so refreshes can be measured without
+credentials. A recording maps site IDs to the responses of the endpoints the
+forecast uses::
+
+    {
+        "sites": {
+            "1234": {
+                "dataPeriod": {"startDate": "2019-05-10", "endDate": null},
+                "energy": {
+                    "MONTH": [{"date": "2019-05-01 00:00:00", "value": 412000.0}],
+                    "QUARTER_OF_AN_HOUR": [
+                        {"date": "2024-06-01 12:00:00", "value": 410.5}
+                    ]
+                },
+                "timeFrameEnergy": {"DAY": 10400.0, "YEAR": 3120000.0}
+            }
+        }
+    }
+
+``energy`` holds the values of every recorded time unit, a plain list is
+taken as monthly values. Values are sliced to the requested date range, and
+a time unit that was not recorded is rejected with 400 Bad Request, as
+SolarEdge does for invalid parameters, instead of being answered with the
+values of another unit. Latency and throttling or server errors can be
+injected to exercise the retry paths.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from calendar import monthrange
+from collections import Counter
+from datetime import date, timedelta
+import json
+import math
+import random
+from typing import Any
+
+from aiohttp import web
+
+from .batching import MAX_BULK_SITES
+
+UNIT_MONTH = "MONTH"
+UNIT_QUARTER_HOUR = "QUARTER_OF_AN_HOUR"
+
+
+class FakeSolaredgeServer:
+    """Serve recorded SolarEdge payloads over HTTP on localhost."""
+
+    def __init__(
+        self,
+        recording: dict[str, Any],
+        latency: float = 0,
+        throttle_rate: float = 0,
+        error_rate: float = 0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the server."""
+        self.sites: dict[int, dict[str, Any]] = {
+            int(site_id): site for site_id, site in recording["sites"].items()
+        }
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.calls: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> FakeSolaredgeServer:
+        """Create a server from a JSON recording on disk."""
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file), **kwargs)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application()
+        app.router.add_get("/sites/list", self._handle_site_list)
+        app.router.add_get("/site/{site_ids}/{endpoint}", self._handle)
+        app.router.add_get("/sites/{site_ids}/{endpoint}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_counters(self) -> None:
+        """Forget the calls counted so far."""
+        self.calls.clear()
+        self.bytes_sent = 0
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer one API request."""
+        endpoint = request.match_info["endpoint"]
+        site_ids = [int(site) for site in request.match_info["site_ids"].split(",")]
+        bulk = request.path.startswith("/sites/")
+        self.calls[f"{'sites' if bulk else 'site'}/{endpoint}"] += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._random.random() < self.throttle_rate:
+            return web.Response(status=429, reason="Too Many Requests")
+        if self._random.random() < self.error_rate:
+            return web.Response(status=503, reason="Service Unavailable")
+        if len(site_ids) > MAX_BULK_SITES or not request.query.get("api_key"):
+            return web.Response(status=403, reason="Forbidden")
+        if any(site_id not in self.sites for site_id in site_ids):
+            return web.Response(status=403, reason="Forbidden")
+
+        handler = {
+            "dataPeriod": self._data_period,
+            "energy": self._energy,
+            "timeFrameEnergy": self._time_frame_energy,
+        }.get(endpoint)
+        if handler is None:
+            return web.Response(status=404, reason="Not Found")
+
+        payloads = {site_id: handler(site_id, request.query) for site_id in site_ids}
+        if any(payload is None for payload in payloads.values()):
+            return web.Response(status=400, reason="Bad Request")
+        if bulk:
+            payload = _bulk_payload(endpoint, payloads)
+        else:
+            payload = payloads[site_ids[0]]
+
+        body = json.dumps(payload)
+        self.bytes_sent += len(body)
+        return web.Response(text=body, content_type="application/json")
+
+    async def _handle_site_list(self, request: web.Request) -> web.Response:
+        """Answer one page of the site list."""
+        self.calls["sites/list"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not request.query.get("api_key"):
+            return web.Response(status=403, reason="Forbidden")
+
+        start = int(request.query.get("startIndex", 0))
+        size = int(request.query.get("size", MAX_BULK_SITES))
+        site_ids = sorted(self.sites)[start : start + size]
+        body = json.dumps(
+            {
+                "sites": {
+                    "count": len(self.sites),
+                    "site": [
+                        {"id": site_id, "name": f"Site {site_id}"}
+                        for site_id in site_ids
+                    ],
+                }
+            }
+        )
+        self.bytes_sent += len(body)
+        return web.Response(text=body, content_type="application/json")
+
+    def _data_period(self, site_id: int, query) -> dict[str, Any]:
+        """Return the recorded data period."""
+        return {"dataPeriod": self.sites[site_id]["dataPeriod"]}
+
+    def _energy(self, site_id: int, query) -> dict[str, Any] | None:
+        """Return the recorded energy of a time unit within the requested range.
+
+        Returns None when the time unit was not recorded for the site.
+        """
+        time_unit = query.get("timeUnit", "DAY")
+        recorded = self.sites[site_id]["energy"]
+        if isinstance(recorded, list):
+            recorded = {UNIT_MONTH: recorded}
+        if time_unit not in recorded:
+            return None
+
+        # Months are compared by year and month, other units by the day.
+        length = 7 if time_unit == UNIT_MONTH else 10
+        start = query["startDate"][:length]
+        end = query["endDate"][:length]
+        values = [
+            item
+            for item in recorded[time_unit]
+            if start <= item["date"][:length] <= end
+        ]
+        return {"energy": {"timeUnit": time_unit, "unit": "Wh", "values": values}}
+
+    def _time_frame_energy(self, site_id: int, query) -> dict[str, Any]:
+        """Return the recorded production for the requested time unit."""
+        time_unit = query.get("timeUnit", "DAY")
+        energy = self.sites[site_id]["timeFrameEnergy"].get(time_unit, 0)
+        return {"timeFrameEnergy": {"energy": energy, "unit": "Wh"}}
+
+
+def _bulk_payload(endpoint: str, payloads: dict[int, dict[str, Any]]) -> dict:
+    """Wrap per-site payloads in the shape of the bulk endpoints."""
+    if endpoint == "dataPeriod":
+        return {
+            "datePeriodList": {
+                "count": len(payloads),
+                "siteEnergyList": [
+                    {"siteId": site_id, "dataPeriod": payload["dataPeriod"]}
+                    for site_id, payload in payloads.items()
+                ],
+            }
+        }
+    if endpoint == "energy":
+        return {
+            "sitesEnergy": {
+                "count": len(payloads),
+                "siteEnergyList": [
+                    {"siteId": site_id, "energyValues": payload["energy"]}
+                    for site_id, payload in payloads.items()
+                ],
+            }
+        }
+    return {
+        "timeFrameEnergyList": {
+            "count": len(payloads),
+            "timeFrameEnergyList": [
+                {"siteId": site_id, "timeFrameEnergy": payload["timeFrameEnergy"]}
+                for site_id, payload in payloads.items()
+            ],
+        }
+    }
+
+
+def synthetic_recording(
+    site_ids: list[int],
+    start_date: date,
+    end_date: date,
+    seed: int | None = None,
+    intraday_days: int = 0,
+) -> dict[str, Any]:
+    """Return a recording with plausible monthly production for many sites.
+
+    With ``intraday_days`` the quarter-hour production of that many days
+    before ``end_date`` is recorded too, spread over the day around noon.
+    """
+    generator = random.Random(seed)
+    sites: dict[str, Any] = {}
+    for site_id in site_ids:
+        peak = generator.uniform(10, 40)
+        months = []
+        daily_wh: dict[tuple[int, int], float] = {}
+        current = start_date.replace(day=1)
+        while current <= end_date:
+            season = 0.55 + 0.45 * math.cos((current.month - 6.5) * math.pi / 6)
+            daily_kwh = peak * season * generator.uniform(0.8, 1.2)
+            days = monthrange(current.year, current.month)[1]
+            months.append(
+                {
+                    "date": f"{current.isoformat()} 00:00:00",
+                    "value": round(daily_kwh * days * 1000, 1),
+                }
+            )
+            daily_wh[current.year, current.month] = daily_kwh * 1000
+            current += timedelta(days=days)
+
+        energy: dict[str, list[dict[str, Any]]] = {UNIT_MONTH: months}
+        if intraday_days:
+            energy[UNIT_QUARTER_HOUR] = _quarter_hours(
+                end_date - timedelta(days=intraday_days), end_date, daily_wh
+            )
+
+        sites[str(site_id)] = {
+            "dataPeriod": {"startDate": start_date.isoformat(), "endDate": None},
+            "energy": energy,
+            "timeFrameEnergy": {
+                "DAY": round(peak * 400, 1),
+                "YEAR": round(peak * 150000, 1),
+            },
+        }
+    return {"sites": sites}
+
+
+def _quarter_hours(
+    start_date: date, end_date: date, daily_wh: dict[tuple[int, int], float]
+) -> list[dict[str, Any]]:
+    """Return quarter-hour values from start_date until before end_date.
+
+    Every day gets the production of its month on a sine from 06:00 to 18:00.
+    Slots outside it are null, as SolarEdge reports them at night.
+    """
+    shape = [
+        math.sin(math.pi * (slot - 24 + 0.5) / 48) if 24 <= slot < 72 else None
+        for slot in range(96)
+    ]
+    total = sum(value for value in shape if value is not None)
+    values = []
+    day = start_date
+    while day < end_date:
+        energy = daily_wh.get((day.year, day.month), 0.0)
+        for slot, weight in enumerate(shape):
+            hour, minute = divmod(slot * 15, 60)
+            value = None if weight is None else round(energy * weight / total, 1)
+            values.append(
+                {
+                    "date": f"{day.isoformat()} {hour:02d}:{minute:02d}:00",
+                    "value": value,
+                }
+            )
+        day += timedelta(days=1)
+    return values
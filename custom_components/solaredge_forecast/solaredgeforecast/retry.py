@@ -0,0 +1,127 @@
+"""Retry policy and circuit breaker for SolarEdge requests."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+import time
+
+TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLING_STATUS = 429
+
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+MAX_RETRY_AFTER = 120.0
+
+FAILURE_THRESHOLD = 5
+OPEN_DURATION = 300.0
+PROBE_TIMEOUT = 60.0
+
+
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter."""
+
+    def __init__(
+        self,
+        max_attempts: int = MAX_ATTEMPTS,
+        base: float = BACKOFF_BASE,
+        maximum: float = BACKOFF_MAX,
+        max_retry_after: float = MAX_RETRY_AFTER,
+    ) -> None:
+        """Initialize the policy."""
+        self.max_attempts = max_attempts
+        self.base = base
+        self.maximum = maximum
+        self.max_retry_after = max_retry_after
+        self._random = random.Random()
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Return the delay before the next attempt, or None to give up.
+
+        A ``Retry-After`` delay from SolarEdge is honored as is, unless it
+        asks to wait longer than a refresh should block.
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return self._random.uniform(0, min(self.maximum, self.base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Stop calling SolarEdge while it keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests are rejected without a call. Once ``open_duration`` has passed a
+    single probe request is let through; its outcome closes the circuit or
+    opens it again. A probe that never reports back, for example because it
+    was cancelled, is replaced after ``PROBE_TIMEOUT``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        open_duration: float = OPEN_DURATION,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.open_duration = open_duration
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probe_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half-open."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.open_duration:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+
+        now = time.monotonic()
+        probe_started = self._probe_started
+        if probe_started is not None and now - probe_started < PROBE_TIMEOUT:
+            return False
+        self._probe_started = now
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self.failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the circuit when needed."""
+        self.failures += 1
+        if self._probe_started is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probe_started = None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds to wait from a Retry-After header."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,642 @@
+"""Serve the forecasts of many sites and accounts over a local HTTP API.
+
+Run with an account key and the sites to forecast, or without sites for
+every site of the account::
+
+    python -m custom_components.solaredge_forecast.solaredgeforecast.service \
+        --account-key KEY --site 1234 --site 5678 --data-dir forecasts
+
+or with a JSON file that lists several accounts, each with its own sites and
+forecast settings. Settings an account leaves out come from the command
+line::
+
+    {
+        "accounts": [
+            {"name": "north", "account_key": "KEY", "sites": [1234, 5678]},
+            {"name": "south", "account_key": "KEY", "start": "04-01",
+             "end": "09-30", "interpolation": "day_length", "latitude": 38.7}
+        ]
+    }
+
+Every account has its own client and request budget. All sites of an
+account are refreshed together on one timer, so their requests end up in the
+same bulk calls, like a fleet entry in Home Assistant. The HTTP API only
+serves the result of the last refreshes, encoded once when a refresh ends,
+so polling it never causes a SolarEdge request. Every response has an ETag,
+a request with a matching ``If-None-Match`` gets an empty
+``304 Not Modified``::
+
+    GET /sites            forecasts of every site
+    GET /sites/{site_id}  forecast of one site
+    GET /status           refresh state and request budget of every account
+
+With ``--data-dir`` the history, the quarter-hour production and the last
+forecasts of every account are kept on disk, so a restart serves the
+previous forecasts right away and refreshes without fetching the history
+again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from ..scheduler import DAILY_REQUEST_BUDGET, SolaredgeRequestScheduler
+from ..util import redact_sensitive_values
+from . import DATE_FORMAT, SolaredgeForecast
+from .api import API_URL, SolaredgeApiClient
+from .batching import MAX_BULK_SITES
+from .columnar import RESOLUTION_MONTH, ColumnarEnergyStore
+from .errors import is_throttling_error, is_transient_error
+from .interpolation import (
+    INTERPOLATION_LINEAR,
+    INTERPOLATIONS,
+    interpolation_factory,
+)
+from .intraday import IntradayHistory
+from .metrics import ForecastMetrics
+from .period import active_forecast_period, parse_month_day
+
+_LOGGER = logging.getLogger(__name__)
+
+ACCOUNT_KEY_ENV = "SOLAREDGE_ACCOUNT_KEY"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_START = "01-01"
+DEFAULT_END = "12-31"
+SNAPSHOT_FILE = "snapshot.json"
+INTRADAY_SUFFIX = ".intraday.json"
+RETRY_DELAY = timedelta(minutes=5)
+
+CachedDocument = tuple[bytes, str]
+
+
+class AccountForecasts:
+    """Refresh the forecasts of the sites of one account key.
+
+    ``start`` and ``end`` are the forecast period as MM-DD. The period that
+    contains today, or starts next, is forecast, like in Home Assistant.
+    ``on_change`` is called whenever there is something new to serve.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: SolaredgeApiClient,
+        site_ids: list[int],
+        start: str = DEFAULT_START,
+        end: str = DEFAULT_END,
+        weight_half_life: float = 0,
+        interpolation: str = INTERPOLATION_LINEAR,
+        latitude: float | None = None,
+        data_dir: str | None = None,
+    ) -> None:
+        """Initialize the account without contacting SolarEdge."""
+        self.name = name
+        self.client = client
+        self.scheduler: SolaredgeRequestScheduler = client.scheduler
+        self.site_ids = list(dict.fromkeys(site_ids))
+        self.start = parse_month_day(start)
+        self.end = parse_month_day(end)
+        self.weight_half_life = weight_half_life
+        self.interpolation = interpolation
+        self.latitude = latitude
+        self.data_dir = data_dir
+        self.excluded_site_ids: set[int] = set()
+        self.on_change: Callable[[], None] = lambda: None
+        self.forecasts: dict[int, SolaredgeForecast] = {}
+        self.intraday: dict[int, IntradayHistory] = {}
+        self.last_refresh_success: datetime | None = None
+        self.last_refresh_duration: float | None = None
+        self.last_error: str | None = None
+        self.next_refresh: datetime | None = None
+        self.startdate, self.enddate = active_forecast_period(
+            *self.start, *self.end, date.today()
+        )
+        self._columns = ColumnarEnergyStore(data_dir) if data_dir else None
+        self._discover = not self.site_ids
+
+    @property
+    def period(self) -> tuple[str, str]:
+        """Return the forecast period in the date format of the engine."""
+        return (
+            self.startdate.strftime(DATE_FORMAT),
+            self.enddate.strftime(DATE_FORMAT),
+        )
+
+    def status(self) -> dict[str, Any]:
+        """Return the refresh state and request budget of the account."""
+        return {
+            "sites": len(self.site_ids),
+            "forecasts": len(self.forecasts),
+            "period": self.period,
+            "last_refresh_success": _isoformat(self.last_refresh_success),
+            "last_refresh_duration": self.last_refresh_duration,
+            "last_error": self.last_error,
+            "next_refresh": _isoformat(self.next_refresh),
+            "api_calls_today": self.scheduler.used,
+            "daily_budget": self.scheduler.daily_budget,
+            "counters": dict(sorted(self.client.metrics.counters.items())),
+        }
+
+    async def async_restore(self) -> bool:
+        """Serve the forecasts saved by the last run, if they still fit."""
+        if self.data_dir is None:
+            return False
+        snapshot = await asyncio.get_running_loop().run_in_executor(
+            None, _read_json, os.path.join(self.data_dir, SNAPSHOT_FILE)
+        )
+        if not snapshot or snapshot.get("period") != list(self.period):
+            return False
+        site_ids = [int(site_id) for site_id in snapshot.get("site_ids", [])]
+        if self.site_ids and site_ids != self.site_ids:
+            return False
+        try:
+            forecasts = {
+                int(site_id): SolaredgeForecast.from_snapshot(forecast)
+                for site_id, forecast in snapshot["forecasts"].items()
+            }
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.debug("Ignoring invalid snapshot of %s: %s", self.name, err)
+            return False
+
+        self.site_ids = site_ids
+        self._discover = False
+        self.forecasts = forecasts
+        self._register()
+        self.on_change()
+        return True
+
+    async def async_refresh(self) -> None:
+        """Refresh every site and publish the new forecasts.
+
+        Sites that fail with a transient error keep their previous forecast.
+        """
+        started = time.perf_counter()
+        startdate, enddate = active_forecast_period(
+            *self.start, *self.end, date.today()
+        )
+        if (startdate, enddate) != (self.startdate, self.enddate):
+            _LOGGER.info(
+                "Moving forecasts of %s to the period %s - %s",
+                self.name,
+                startdate.isoformat(),
+                enddate.isoformat(),
+            )
+            self.startdate, self.enddate = startdate, enddate
+
+        try:
+            if self._discover:
+                await self._async_discover_sites()
+            results = await asyncio.gather(
+                *(self._async_update_site(site_id) for site_id in self.site_ids),
+                return_exceptions=True,
+            )
+        except Exception as err:
+            self._refresh_failed([err], started)
+            return
+
+        errors: list[Exception] = []
+        for site_id, result in zip(self.site_ids, results):
+            if not isinstance(result, BaseException):
+                self.forecasts[site_id] = result
+                continue
+            if not isinstance(result, Exception):
+                raise result
+            errors.append(result)
+            if not is_transient_error(result):
+                self.forecasts.pop(site_id, None)
+
+        if errors and len(errors) == len(self.site_ids):
+            self._refresh_failed(errors, started)
+            return
+        if errors:
+            self.client.metrics.increment("refresh_failures.sites", len(errors))
+            self._record_errors(errors)
+            _LOGGER.warning(
+                "Forecast update of %s failed for %d of %d sites: %s",
+                self.name,
+                len(errors),
+                len(self.site_ids),
+                self.last_error,
+            )
+        else:
+            self.last_error = None
+
+        self.scheduler.record_success()
+        self.last_refresh_success = datetime.now()
+        self.last_refresh_duration = time.perf_counter() - started
+        self.on_change()
+        await self._async_save_snapshot()
+        _LOGGER.debug(
+            "Forecast update of %d sites of %s took %.3f s",
+            len(self.site_ids),
+            self.name,
+            self.last_refresh_duration,
+        )
+
+    def next_refresh_delay(self) -> timedelta:
+        """Return the delay until the next refresh slot of the account.
+
+        Without the sun times of Home Assistant refreshes run around the
+        clock, spread evenly over the budget of the day.
+        """
+        if self._discover or (self.site_ids and not self.forecasts):
+            delay = RETRY_DELAY
+        else:
+            self.scheduler.daylight = timedelta(days=1)
+            delay = self.scheduler.next_refresh_delay(self.name)
+        self.next_refresh = datetime.now() + delay
+        self.on_change()
+        return delay
+
+    async def async_run(self) -> None:
+        """Refresh on the schedule of the account until cancelled."""
+        if await self.async_restore():
+            delay = self.scheduler.startup_delay(self.name)
+            self.next_refresh = datetime.now() + delay
+            self.on_change()
+            await asyncio.sleep(delay.total_seconds())
+        while True:
+            await self.async_refresh()
+            await asyncio.sleep(self.next_refresh_delay().total_seconds())
+
+    async def _async_discover_sites(self) -> None:
+        """Forecast every site of the account that no other account lists."""
+        sites = await self.client.get_site_list()
+        self.site_ids = [
+            int(site["id"])
+            for site in sites
+            if int(site["id"]) not in self.excluded_site_ids
+        ]
+        if not self.site_ids:
+            raise ValueError("No sites found for this SolarEdge account key")
+        self._discover = False
+        self._register()
+
+    async def _async_update_site(self, site_id: int) -> SolaredgeForecast:
+        """Update the forecast of one site and store what it fetched."""
+        loop = asyncio.get_running_loop()
+        previous = self.forecasts.get(site_id)
+        history = previous.history if previous is not None else None
+        if history is None and self._columns is not None:
+            history = await loop.run_in_executor(
+                None, self._columns.read, site_id, RESOLUTION_MONTH
+            )
+        intraday = self.intraday.get(site_id)
+        if intraday is None:
+            intraday = self.intraday[site_id] = await loop.run_in_executor(
+                None, self._load_intraday, site_id
+            )
+
+        forecast = SolaredgeForecast(
+            *self.period,
+            "",
+            site_id,
+            history,
+            previous.baseline if previous is not None else None,
+            intraday,
+            self.weight_half_life,
+            interpolation=self.interpolation,
+            latitude=self.latitude,
+        )
+        await forecast.async_update(self.client)
+        if self._columns is not None:
+            if forecast.history is not None and forecast.history is not history:
+                await loop.run_in_executor(
+                    None, self._columns.write, site_id, forecast.history
+                )
+            if intraday.modified:
+                await loop.run_in_executor(None, self._save_intraday, site_id)
+        return forecast
+
+    def _register(self) -> None:
+        """Plan the requests of one refresh of every site."""
+        self.scheduler.register(
+            self.name, max(1, -(-len(self.site_ids) // MAX_BULK_SITES))
+        )
+
+    def _refresh_failed(self, errors: list[Exception], started: float) -> None:
+        """Record a refresh that did not update any site."""
+        self.last_refresh_duration = time.perf_counter() - started
+        self.client.metrics.increment("refresh_failures")
+        self._record_errors(errors)
+        _LOGGER.warning("Forecast update of %s failed: %s", self.name, self.last_error)
+        self.on_change()
+
+    def _record_errors(self, errors: list[Exception]) -> None:
+        """Keep the first error and slow down after throttling."""
+        self.last_error = redact_sensitive_values(str(errors[0]))
+        if any(is_throttling_error(err) for err in errors):
+            self.scheduler.record_throttled()
+
+    async def _async_save_snapshot(self) -> None:
+        """Keep the forecasts for the next start."""
+        if self.data_dir is None:
+            return
+        snapshot = {
+            "period": list(self.period),
+            "site_ids": self.site_ids,
+            "forecasts": {
+                site_id: forecast.as_snapshot()
+                for site_id, forecast in self.forecasts.items()
+            },
+        }
+        await asyncio.get_running_loop().run_in_executor(
+            None, _write_json, os.path.join(self.data_dir, SNAPSHOT_FILE), snapshot
+        )
+
+    def _load_intraday(self, site_id: int) -> IntradayHistory:
+        """Return the stored quarter-hour production of a site."""
+        if self.data_dir is None:
+            return IntradayHistory()
+        return IntradayHistory.from_dict(
+            _read_json(os.path.join(self.data_dir, f"{site_id}{INTRADAY_SUFFIX}"))
+        )
+
+    def _save_intraday(self, site_id: int) -> None:
+        """Store the quarter-hour production of a site."""
+        intraday = self.intraday[site_id]
+        _write_json(
+            os.path.join(self.data_dir, f"{site_id}{INTRADAY_SUFFIX}"),
+            intraday.as_dict(),
+        )
+        intraday.modified = False
+
+
+class ForecastService:
+    """Serve the forecasts of several accounts from encoded responses.
+
+    The responses are encoded whenever an account has something new, every
+    request is then a dictionary lookup. A site listed by one account is
+    not discovered by another, a site two accounts discover is served from
+    the first one.
+    """
+
+    def __init__(self, accounts: list[AccountForecasts]) -> None:
+        """Initialize the service."""
+        names = [account.name for account in accounts]
+        if len(set(names)) != len(names):
+            raise ValueError("Account names must be unique")
+        listed: dict[int, str] = {}
+        for account in accounts:
+            for site_id in account.site_ids:
+                if listed.setdefault(site_id, account.name) != account.name:
+                    raise ValueError(f"Site {site_id} is listed by two accounts")
+
+        self.accounts = accounts
+        self.metrics = ForecastMetrics()
+        self._documents: dict[str, CachedDocument] = {}
+        for account in accounts:
+            account.excluded_site_ids = set(listed) - set(account.site_ids)
+            account.on_change = self.publish
+        self.publish()
+
+    def document(self, path: str) -> CachedDocument | None:
+        """Return the encoded body and ETag of an API path, if it exists."""
+        return self._documents.get(path)
+
+    def publish(self) -> None:
+        """Encode the responses of every path once for all pollers."""
+        sites: dict[str, dict[str, Any]] = {}
+        for account in self.accounts:
+            for site_id, forecast in sorted(account.forecasts.items()):
+                sites.setdefault(str(site_id), _site_document(account, forecast))
+
+        documents = {"/sites": _encode({"sites": sites})}
+        for site_id, site in sites.items():
+            documents[f"/sites/{site_id}"] = _encode(site)
+        documents["/status"] = _encode(
+            {
+                "sites": len(sites),
+                "accounts": {
+                    account.name: account.status() for account in self.accounts
+                },
+            }
+        )
+        self._documents = documents
+
+    async def async_run(self) -> None:
+        """Refresh every account on its own schedule until cancelled."""
+        await asyncio.gather(*(account.async_run() for account in self.accounts))
+
+
+def create_app(service: ForecastService) -> web.Application:
+    """Return the HTTP API of a service."""
+
+    async def handle(request: web.Request) -> web.Response:
+        """Answer from the responses encoded at the last refresh."""
+        document = service.document(request.path.rstrip("/") or "/")
+        if document is None:
+            raise web.HTTPNotFound()
+        body, etag = document
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            service.metrics.increment("service.not_modified")
+            return web.Response(status=304, headers=headers)
+        service.metrics.increment("service.responses")
+        return web.Response(
+            body=body, content_type="application/json", headers=headers
+        )
+
+    app = web.Application()
+    app.router.add_get("/sites", handle)
+    app.router.add_get("/sites/{site_id}", handle)
+    app.router.add_get("/status", handle)
+    return app
+
+
+def account_name(account_key: str) -> str:
+    """Return a name for an account that does not reveal its key."""
+    return f"account_{hashlib.sha256(account_key.strip().encode()).hexdigest()[:12]}"
+
+
+def _site_document(
+    account: AccountForecasts, forecast: SolaredgeForecast
+) -> dict[str, Any]:
+    """Return the public part of a forecast."""
+    return {
+        "site_id": forecast.site_id,
+        "account": account.name,
+        "period": account.period,
+        "estimated": forecast.solaredge_estimated,
+        "produced": forecast.solaredge_produced,
+        "forecast": forecast.solaredge_forecast,
+        "progress": forecast.solaredge_progress,
+        "forecast_bands": forecast.solaredge_forecast_bands,
+        "backfill_progress": forecast.backfill_progress,
+    }
+
+
+def _encode(data: dict[str, Any]) -> CachedDocument:
+    """Return a JSON body with a strong ETag of its content."""
+    body = json.dumps(data, separators=(",", ":")).encode()
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    """Return whether an If-None-Match header names the ETag.
+
+    Weak comparison, as RFC 9110 asks for If-None-Match.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in header.split(",")
+    )
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    """Return a timestamp for the status response."""
+    return value.isoformat(timespec="seconds") if value else None
+
+
+def _read_json(path: str) -> Any:
+    """Return the content of a JSON file, or None when it is missing or broken."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Replace a JSON file in one step."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def _account_settings(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Return the settings of every account, defaults from the command line."""
+    defaults = {
+        "start": args.start,
+        "end": args.end,
+        "weight_half_life": args.weight_half_life,
+        "interpolation": args.interpolation,
+        "latitude": args.latitude,
+        "daily_budget": args.daily_budget,
+    }
+    if args.config is None:
+        accounts = [{"account_key": args.account_key, "sites": args.site or []}]
+    else:
+        with open(args.config, encoding="utf-8") as file:
+            accounts = json.load(file)["accounts"]
+
+    settings = []
+    for account in accounts:
+        account = {**defaults, **account}
+        if not str(account.get("account_key") or "").strip():
+            raise ValueError("Every account needs an account_key")
+        interpolation_factory(account["interpolation"], account["latitude"])
+        account.setdefault("name", account_name(account["account_key"]))
+        settings.append(account)
+    return settings
+
+
+async def async_serve(args: argparse.Namespace) -> None:
+    """Run the service and its HTTP API until cancelled."""
+    async with aiohttp.ClientSession() as session:
+        accounts = [
+            AccountForecasts(
+                settings["name"],
+                SolaredgeApiClient(
+                    session,
+                    str(settings["account_key"]).strip(),
+                    SolaredgeRequestScheduler(daily_budget=settings["daily_budget"]),
+                    args.api_url,
+                ),
+                [int(site_id) for site_id in settings.get("sites", [])],
+                settings["start"],
+                settings["end"],
+                settings["weight_half_life"],
+                settings["interpolation"],
+                settings["latitude"],
+                os.path.join(args.data_dir, settings["name"])
+                if args.data_dir
+                else None,
+            )
+            for settings in _account_settings(args)
+        ]
+        service = ForecastService(accounts)
+        runner = web.AppRunner(create_app(service), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, args.host, args.port).start()
+        _LOGGER.info(
+            "Serving forecasts of %d accounts on http://%s:%d",
+            len(accounts),
+            args.host,
+            args.port,
+        )
+        try:
+            await service.async_run()
+        finally:
+            await runner.cleanup()
+
+
+def main() -> None:
+    """Run the service from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--config", help="JSON file with the accounts, instead of --account-key"
+    )
+    parser.add_argument(
+        "--account-key",
+        default=os.environ.get(ACCOUNT_KEY_ENV),
+        help=f"SolarEdge account key, defaults to ${ACCOUNT_KEY_ENV}",
+    )
+    parser.add_argument(
+        "--site", type=int, action="append", help="Site ID, all sites if omitted"
+    )
+    parser.add_argument("--start", default=DEFAULT_START, help="Period start, MM-DD")
+    parser.add_argument("--end", default=DEFAULT_END, help="Period end, MM-DD")
+    parser.add_argument("--weight-half-life", type=float, default=0)
+    parser.add_argument(
+        "--interpolation", choices=sorted(INTERPOLATIONS), default=INTERPOLATION_LINEAR
+    )
+    parser.add_argument(
+        "--latitude", type=float, help="Site latitude, for day_length interpolation"
+    )
+    parser.add_argument("--data-dir", help="Keep history and forecasts here")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--daily-budget",
+        type=int,
+        default=DAILY_REQUEST_BUDGET,
+        help="SolarEdge requests per day and account",
+    )
+    parser.add_argument("--api-url", default=API_URL, help=argparse.SUPPRESS)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.config is None and not args.account_key:
+        parser.error(f"--config, --account-key or ${ACCOUNT_KEY_ENV} is required")
+    try:
+        _account_settings(args)
+    except (OSError, KeyError, TypeError, ValueError) as err:
+        parser.error(f"Invalid accounts: {err}")
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        asyncio.run(async_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Forecast confidence bands from the production of every past year.
+
+The forecast itself interpolates the mean of each calendar month. Here every
+year with history becomes a scenario: its own monthly values, with the
+weighted mean filling the months it has no data for. All scenarios are
+interpolated and summed together with ``DailyEnergyProfile``, or one by one
+in the cached calendars of the forecast's strategy when it is not linear, and
+the spread of their totals gives the bands. Needs NumPy.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date
+
+import numpy as np
+
+from .columnar import EnergyColumn
+from .interpolation import INTERPOLATION_LINEAR, energy_calendar
+from .profile import DailyEnergyProfile
+
+WH_PER_KWH = 1000
+
+# Exceedance probabilities as used for solar yield: P90 is the total that is
+# reached in 90% of the years, so it is the 10th percentile.
+EXCEEDANCE_LEVELS = {"p10": 0.9, "p50": 0.5, "p90": 0.1}
+
+
+def monthly_matrix(history: EnergyColumn) -> tuple[np.ndarray, np.ndarray]:
+    """Return the years and a years by months array of daily kWh.
+
+    Months without production are NaN.
+    """
+    months = history.first + np.arange(len(history), dtype=np.int64)
+    first_year = int(months[0] // 12)
+    years = np.arange(first_year, int(months[-1] // 12) + 1)
+
+    month_starts = (months - 1970 * 12).astype("datetime64[M]")
+    days = (
+        (month_starts + 1).astype("datetime64[D]")
+        - month_starts.astype("datetime64[D]")
+    ).astype(float)
+    energy = np.asarray(history.values, dtype=float)
+    daily = np.where(energy > 0, energy / days / WH_PER_KWH, np.nan)
+
+    matrix = np.full((len(years), 12), np.nan)
+    matrix[months // 12 - first_year, months % 12] = daily
+    return years, matrix
+
+
+def year_weights(years: np.ndarray, half_life: float) -> np.ndarray:
+    """Return weights that halve every half_life years back, or equal weights."""
+    if half_life <= 0:
+        return np.ones(len(years))
+    return 0.5 ** ((years[-1] - years) / half_life)
+
+
+def weighted_quantiles(
+    values: np.ndarray, weights: np.ndarray, quantiles: Sequence[float]
+) -> np.ndarray:
+    """Return quantiles of weighted samples, interpolating between samples."""
+    order = np.argsort(values)
+    values = values[order]
+    weights = weights[order]
+    positions = (np.cumsum(weights) - weights / 2) / weights.sum()
+    return np.interp(quantiles, positions, values)
+
+
+def forecast_bands(
+    history: EnergyColumn,
+    point_dates: Sequence[date],
+    start_date: date,
+    end_date: date,
+    half_life: float = 0,
+    interpolation: str = INTERPOLATION_LINEAR,
+    latitude: float | None = None,
+) -> dict[str, float] | None:
+    """Return the P10, P50 and P90 energy in kWh from start_date to end_date.
+
+    ``point_dates`` are the interpolation points of the forecast and
+    ``interpolation`` and ``latitude`` select its strategy. Returns None when
+    fewer than two years have production data.
+    """
+    years, matrix = monthly_matrix(history)
+    has_data = ~np.isnan(matrix).all(axis=1)
+    years, matrix = years[has_data], matrix[has_data]
+    if len(years) < 2:
+        return None
+    if end_date < start_date:
+        return dict.fromkeys(EXCEEDANCE_LEVELS, 0.0)
+
+    weights = year_weights(years, half_life)
+    known = ~np.isnan(matrix)
+    weighted_sum = np.where(known, matrix, 0).T @ weights
+    weight_total = known.T.astype(float) @ weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = weighted_sum / weight_total
+    scenarios = np.where(known, matrix, mean)
+
+    columns = [point_date.month - 1 for point_date in point_dates]
+    if interpolation == INTERPOLATION_LINEAR:
+        totals = DailyEnergyProfile.from_values(
+            point_dates, scenarios[:, columns], start_date, end_date
+        ).totals(start_date, end_date)[:, 0]
+    else:
+        totals = np.array(
+            [
+                energy_calendar(
+                    tuple(enumerate(row, start=1)), interpolation, latitude
+                ).total(start_date, end_date)
+                for row in scenarios.tolist()
+            ]
+        )
+    if np.isnan(totals).any():
+        return None
+
+    quantiles = weighted_quantiles(totals, weights, list(EXCEEDANCE_LEVELS.values()))
+    return {name: float(value) for name, value in zip(EXCEEDANCE_LEVELS, quantiles)}
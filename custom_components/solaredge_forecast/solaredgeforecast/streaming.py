@@ -0,0 +1,123 @@
+"""Incremental parsing of SolarEdge energy responses.
+
+A month of quarter-hour values for a hundred sites is a response of several
+megabytes, and ``json.loads`` turns it into hundreds of thousands of small
+dicts before anything is stored. ``EnergyStreamParser`` is fed the body while
+it arrives instead. It only keeps the unparsed end of the last chunk and
+folds every value straight into the compact ``EnergySeries`` of its site, so
+memory grows with the values kept and not with the size of the JSON.
+
+The parser relies on the shape of the energy endpoints: every value is a
+``{"date": ..., "value": ...}`` object with the dates in order, and in bulk
+responses the ``siteId`` of a site comes before its values. A response of
+another shape raises ValueError, so values are never lost or stored under
+the wrong site.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date
+import math
+import re
+
+_TOKEN = re.compile(
+    rb'"siteId"\s*:\s*(?P<site>\d+)'
+    rb'|\{\s*"date"\s*:\s*"(?P<day>[0-9]{4}-[0-9]{2}-[0-9]{2})'
+    rb'(?: (?P<hour>[0-9]{2}):(?P<minute>[0-9]{2})[^"]*)?"\s*,'
+    rb'\s*"value"\s*:\s*(?P<value>null|[-+.eE0-9]+)\s*\}'
+)
+_VALUE_KEY = b'"value"'
+
+
+class EnergySeries:
+    """Energy values of one site in parallel arrays.
+
+    ``days`` are date ordinals, ``minutes`` the minute of the day and
+    ``values`` are in Wh, NaN where SolarEdge returned null.
+    """
+
+    __slots__ = ("days", "minutes", "values")
+
+    def __init__(self) -> None:
+        """Initialize an empty series."""
+        self.days = array("l")
+        self.minutes = array("H")
+        self.values = array("d")
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return len(self.values)
+
+    def append(self, moment: str, value: float | None) -> None:
+        """Add a value at a SolarEdge timestamp like 2024-05-01 00:15:00."""
+        self.days.append(date.fromisoformat(moment[:10]).toordinal())
+        self.minutes.append(
+            int(moment[11:13]) * 60 + int(moment[14:16]) if len(moment) >= 16 else 0
+        )
+        self.values.append(math.nan if value is None else value)
+
+
+class EnergyStreamParser:
+    """Parse the body of an energy response chunk by chunk."""
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self.series: dict[int | None, EnergySeries] = {}
+        self._site: int | None = None
+        self._buffer = b""
+        self._last_days: dict[int | None, int] = {}
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the values that are complete after adding a chunk."""
+        data = self._buffer + chunk
+        # Every value ends with a brace, what follows the last one may be cut.
+        end = data.rfind(b"}") + 1
+        self._parse(data, end)
+        self._buffer = data[end:]
+
+    def close(self) -> dict[int | None, EnergySeries]:
+        """Return the series by site ID, None for single-site responses."""
+        self._parse(self._buffer, len(self._buffer))
+        self._buffer = b""
+        if None in self.series and len(self.series) > 1:
+            raise _layout_error("values before the first siteId")
+        if not self.series:
+            self.series[self._site] = EnergySeries()
+        return self.series
+
+    def _parse(self, data: bytes, end: int) -> None:
+        """Fold every token in the first end bytes of data into its series."""
+        series = self.series.get(self._site)
+        last_day = self._last_days.get(self._site, 0)
+        last_date = b""
+        ordinal = 0
+        values = 0
+        for site, day, hour, minute, value in _TOKEN.findall(data, 0, end):
+            if site:
+                self._last_days[self._site] = last_day
+                self._site = int(site)
+                series = self.series.setdefault(self._site, EnergySeries())
+                last_day = self._last_days.get(self._site, 0)
+                continue
+            if series is None:
+                series = self.series[self._site] = EnergySeries()
+            if day != last_date:
+                ordinal = date.fromisoformat(day.decode("ascii")).toordinal()
+                last_date = day
+                # A site's dates go back when values ended up under another site.
+                if ordinal < last_day:
+                    raise _layout_error("dates out of order")
+                last_day = ordinal
+            series.days.append(ordinal)
+            series.minutes.append(int(hour) * 60 + int(minute) if hour else 0)
+            series.values.append(math.nan if value == b"null" else float(value))
+            values += 1
+        self._last_days[self._site] = last_day
+        if values != data.count(_VALUE_KEY, 0, end):
+            raise _layout_error("values that are not date and value objects")
+
+
+def _layout_error(reason: str) -> ValueError:
+    """Return the error for a response the parser cannot read safely."""
+    return ValueError(f"Unexpected SolarEdge energy response layout: {reason}")
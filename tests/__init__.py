@@ -0,0 +1 @@
+"""Tests for the SolarEdge Forecast integration."""
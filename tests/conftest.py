@@ -0,0 +1,65 @@
+"""Shared fixtures for the SolarEdge Forecast tests."""
+
+from __future__ import annotations
+
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Any
+
+import pytest
+
+from custom_components.solaredge_forecast.solaredgeforecast.metrics import (
+    ForecastMetrics,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.streaming import (
+    EnergySeries,
+)
+
+PRODUCTION_START = "2019-05-10"
+PRODUCED_TODAY_WH = 5000.0
+PRODUCED_PERIOD_WH = 900000.0
+
+
+def monthly_energy(day: date) -> float:
+    """Return the recorded production of the month of day in Wh."""
+    return 1000.0 * (day.month * 10 + day.year % 7) * monthrange(day.year, day.month)[1]
+
+
+class FakeSolaredgeClient:
+    """Answer the forecast's SolarEdge calls from deterministic data."""
+
+    def __init__(self) -> None:
+        """Initialize the client."""
+        self.metrics = ForecastMetrics()
+        self.calls: list[tuple[Any, ...]] = []
+
+    async def get_data_period(self, site_id: int) -> dict[str, Any]:
+        """Return the data period of a site."""
+        self.calls.append(("dataPeriod", site_id))
+        return {"dataPeriod": {"startDate": PRODUCTION_START, "endDate": None}}
+
+    async def get_energy_series(
+        self, site_id: int, start_date: date, end_date: date, time_unit: str
+    ) -> EnergySeries:
+        """Return monthly totals, the only unit the tests request."""
+        self.calls.append(("energy", site_id, start_date, end_date, time_unit))
+        series = EnergySeries()
+        day = start_date.replace(day=1)
+        while day <= end_date:
+            series.append(f"{day.isoformat()} 00:00:00", monthly_energy(day))
+            day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return series
+
+    async def get_time_frame_energy(
+        self, site_id: int, start_date: date, end_date: date, time_unit: str
+    ) -> dict[str, Any]:
+        """Return the production of today or of the period."""
+        self.calls.append(("timeFrameEnergy", site_id, time_unit))
+        energy = PRODUCED_TODAY_WH if time_unit == "DAY" else PRODUCED_PERIOD_WH
+        return {"timeFrameEnergy": {"energy": energy}}
+
+
+@pytest.fixture
+def client() -> FakeSolaredgeClient:
+    """Return a fake SolarEdge client."""
+    return FakeSolaredgeClient()
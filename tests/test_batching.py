@@ -0,0 +1,47 @@
+"""Tests for the bulk request batcher."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+from typing import Any
+
+import pytest
+
+from custom_components.solaredge_forecast.solaredgeforecast.batching import (
+    SiteRequestBatcher,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.errors import (
+    SolarEdgeApiError,
+)
+
+
+def test_failed_bulk_call_of_cancelled_caller_is_not_reported() -> None:
+    """Errors nobody waits for any more are not logged as never retrieved."""
+
+    async def run() -> list[dict[str, Any]]:
+        reported: list[dict[str, Any]] = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: reported.append(context)
+        )
+
+        async def fetch_bulk(site_ids: list[int], params: dict[str, Any]) -> dict:
+            await asyncio.sleep(0.01)
+            raise SolarEdgeApiError("503, message='Service Unavailable'", 503)
+
+        batcher = SiteRequestBatcher(fetch_bulk, window=0)
+        cancelled = asyncio.ensure_future(batcher.request(1, {"timeUnit": "DAY"}))
+        waiting = asyncio.ensure_future(batcher.request(2, {"timeUnit": "DAY"}))
+        await asyncio.sleep(0.001)
+        cancelled.cancel()
+
+        with pytest.raises(SolarEdgeApiError):
+            await waiting
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        del cancelled, waiting
+        await asyncio.sleep(0)
+        gc.collect()
+        return reported
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,75 @@
+"""Tests for the columnar energy store."""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date
+
+from custom_components.solaredge_forecast.solaredgeforecast.backtest import (
+    _history_before,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.columnar import (
+    RESOLUTION_DAY,
+    RESOLUTION_MONTH,
+    ColumnarEnergyStore,
+    EnergyColumn,
+    month_index,
+)
+
+SITE_ID = 1234
+PRODUCTION_START = date(2020, 3, 10)
+
+
+def _monthly() -> EnergyColumn:
+    """Return 24 months of history from March 2020."""
+    return EnergyColumn(
+        RESOLUTION_MONTH,
+        month_index(date(2020, 3, 1)),
+        array("d", (1000.0 * month for month in range(1, 25))),
+        PRODUCTION_START,
+    )
+
+
+def test_store_round_trip_and_append(tmp_path) -> None:
+    """A stored column reads back as it was written, also after appending."""
+    store = ColumnarEnergyStore(str(tmp_path))
+    column = _monthly()
+    store.write(SITE_ID, column)
+    store.write(SITE_ID, column.extended([25000.0, 26000.0]))
+
+    stored = store.read(SITE_ID, RESOLUTION_MONTH)
+
+    assert stored is not None
+    assert isinstance(stored.values, memoryview)
+    assert list(stored.values) == list(column.values) + [25000.0, 26000.0]
+    assert stored.production_start == PRODUCTION_START
+    assert store.read(SITE_ID, RESOLUTION_DAY) is None
+
+
+def test_slice_of_stored_column_is_a_view(tmp_path) -> None:
+    """Slices of a mapped column share its memory and clamp to its periods."""
+    store = ColumnarEnergyStore(str(tmp_path))
+    store.write(SITE_ID, _monthly())
+    stored = store.read(SITE_ID, RESOLUTION_MONTH)
+    assert stored is not None
+
+    values = stored.slice(date(2020, 5, 20), date(2020, 7, 1))
+
+    assert isinstance(values, memoryview)
+    assert values.obj is stored.values.obj
+    assert list(values) == [3000.0, 4000.0, 5000.0]
+    assert list(stored.slice(date(2019, 1, 1), date(2020, 4, 30))) == [1000.0, 2000.0]
+    assert len(stored.slice(date(2020, 7, 1), date(2020, 5, 1))) == 0
+    assert len(stored.slice(date(2030, 1, 1), date(2030, 12, 1))) == 0
+
+
+def test_history_before_keeps_complete_months() -> None:
+    """The backtest only sees the months that had ended on a day."""
+    monthly = _monthly()
+
+    history = _history_before(monthly, date(2020, 6, 15))
+
+    assert history is not None
+    assert list(history.values) == [1000.0, 2000.0, 3000.0]
+    assert history.production_start == PRODUCTION_START
+    assert _history_before(monthly, date(2020, 3, 31)) is None
@@ -0,0 +1,97 @@
+"""Tests for the SolarEdge Forecast config flow."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+from custom_components.solaredge_forecast.config_flow import (
+    _configured_site_ids,
+    _forecast_schema,
+    _site_id_exists,
+    _validate_fleet_input,
+)
+from custom_components.solaredge_forecast.const import (
+    CONF_ACCOUNT_KEY,
+    CONF_ENDDAY,
+    CONF_ENDMONTH,
+    CONF_SITE_ID,
+    CONF_SITE_IDS,
+    CONF_STARTDAY,
+    CONF_STARTMONTH,
+    DOMAIN,
+)
+
+
+def test_forecast_schema_fields_have_no_custom_message() -> None:
+    """Validation errors of the forecast fields name the field itself."""
+    for key in _forecast_schema({}):
+        assert key.msg is None, key.schema
+
+
+class FakeEntries:
+    """Config entries of the integration."""
+
+    def __init__(self, entries: list[SimpleNamespace]) -> None:
+        """Initialize with the entries."""
+        self._entries = entries
+
+    def async_entries(self, domain: str) -> list[SimpleNamespace]:
+        """Return every entry."""
+        return self._entries
+
+
+def _hass(*entries: SimpleNamespace, coordinators=None) -> SimpleNamespace:
+    """Return a stand-in for Home Assistant with config entries."""
+    return SimpleNamespace(
+        config_entries=FakeEntries(list(entries)),
+        data={DOMAIN: coordinators or {}},
+    )
+
+
+def _entry(entry_id: str, **data: Any) -> SimpleNamespace:
+    """Return a config entry with data and no options."""
+    return SimpleNamespace(entry_id=entry_id, data=data, options={})
+
+
+def _fleet_input(site_ids: str) -> dict[str, Any]:
+    """Return fleet form input with a period of the whole year."""
+    return {
+        CONF_ACCOUNT_KEY: "key",
+        CONF_SITE_IDS: site_ids,
+        CONF_STARTDAY: 1,
+        CONF_STARTMONTH: "January",
+        CONF_ENDDAY: 31,
+        CONF_ENDMONTH: "December",
+    }
+
+
+def test_site_of_a_fleet_is_configured() -> None:
+    """A single site entry cannot add a site of a fleet."""
+    hass = _hass(
+        _entry("single", **{CONF_SITE_ID: 1}),
+        _entry("fleet", **{CONF_SITE_IDS: [2, 3]}),
+        _entry("discovered", **{CONF_SITE_IDS: []}),
+        coordinators={"discovered": SimpleNamespace(site_ids=[4])},
+    )
+
+    assert _configured_site_ids(hass) == {1, 2, 3, 4}
+    assert _site_id_exists(hass, "3")
+    assert _site_id_exists(hass, 4)
+    assert not _site_id_exists(hass, 3, ignore_entry_id="fleet")
+    assert not _site_id_exists(hass, 5)
+
+
+def test_fleet_rejects_sites_of_other_entries() -> None:
+    """A fleet cannot list a site that has an entry of its own."""
+    hass = _hass(
+        _entry("single", **{CONF_SITE_ID: 1}),
+        _entry("fleet", **{CONF_SITE_IDS: [2, 3]}),
+    )
+
+    errors = _validate_fleet_input(_fleet_input("5, 1"), _configured_site_ids(hass))
+    assert errors == {CONF_SITE_IDS: "site_ids_configured"}
+    assert _validate_fleet_input(
+        _fleet_input("2, 3, 4"), _configured_site_ids(hass, "fleet")
+    ) == {}
+    assert _validate_fleet_input(_fleet_input(""), _configured_site_ids(hass)) == {}
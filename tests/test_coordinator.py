@@ -0,0 +1,116 @@
+"""Tests for the SolarEdge Forecast coordinators."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.solaredge_forecast.const import DOMAIN
+from custom_components.solaredge_forecast.coordinator import (
+    SolaredgeCoordinator,
+    SolaredgeFleetData,
+    SolaredgeForecastData,
+)
+from custom_components.solaredge_forecast.solaredgeforecast import SolaredgeForecast
+from custom_components.solaredge_forecast.solaredgeforecast.metrics import (
+    ForecastMetrics,
+)
+
+
+def test_coordinators_implement_the_snapshot_hooks() -> None:
+    """A coordinator without its snapshot hooks cannot be created."""
+    assert SolaredgeCoordinator.__abstractmethods__ == {
+        "_restore_data",
+        "_snapshot_data",
+        "_forecast_list",
+    }
+    assert not SolaredgeForecastData.__abstractmethods__
+    assert not SolaredgeFleetData.__abstractmethods__
+
+
+def _coordinator(
+    hass: SimpleNamespace, client: SimpleNamespace
+) -> SolaredgeForecastData:
+    """Return a coordinator of an account client without setting it up."""
+    coordinator = object.__new__(SolaredgeForecastData)
+    coordinator.hass = hass
+    coordinator.client = client
+    coordinator._diagnostic_sensors = set()
+    return coordinator
+
+
+def test_metrics_follow_the_diagnostic_sensors_of_the_account() -> None:
+    """Stages are timed while any entry of the account has a diagnostic sensor."""
+    client = SimpleNamespace(metrics=ForecastMetrics())
+    other_client = SimpleNamespace(metrics=ForecastMetrics(enabled=False))
+    hass = SimpleNamespace(data={DOMAIN: {}})
+    first = hass.data[DOMAIN]["first"] = _coordinator(hass, client)
+    second = hass.data[DOMAIN]["second"] = _coordinator(hass, client)
+    hass.data[DOMAIN]["other"] = _coordinator(hass, other_client)
+
+    first._update_metrics_enabled()
+    assert not client.metrics.enabled
+
+    first.set_diagnostic_sensor("sensor.first_duration", True)
+    second.set_diagnostic_sensor("sensor.second_duration", True)
+    first.set_diagnostic_sensor("sensor.first_duration", False)
+    assert client.metrics.enabled
+    assert not other_client.metrics.enabled
+
+    second.set_diagnostic_sensor("sensor.second_duration", False)
+    assert not client.metrics.enabled
+
+
+class FakeStore:
+    """History store without anything cached."""
+
+    async def async_load(self) -> None:
+        """Return no cached data."""
+
+    async def async_save(self, data) -> None:
+        """Forget the data."""
+
+    def async_checkpoint(self) -> None:
+        """Do nothing."""
+
+
+def test_refresh_uses_the_home_assistant_time_zone(monkeypatch) -> None:
+    """The forecast is split at the local time of Home Assistant, not the host."""
+    moments: list[datetime] = []
+
+    async def async_update(forecast, client, now=None) -> None:
+        moments.append(now)
+
+    monkeypatch.setattr(SolaredgeForecast, "async_update", async_update)
+    time_zone = ZoneInfo("Pacific/Kiritimati")
+    original_time_zone = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(time_zone)
+    try:
+        coordinator = _coordinator(SimpleNamespace(data={}), SimpleNamespace())
+        coordinator.data = None
+        coordinator.site_id = 1
+        coordinator.start_date_production = ""
+        coordinator.start_day, coordinator.start_month = 1, "January"
+        coordinator.end_day, coordinator.end_month = 31, "December"
+        coordinator.weight_half_life = 0
+        coordinator.interpolation = "linear"
+        coordinator.latitude = 52.0
+        coordinator._period_day = None
+        coordinator._history = coordinator._intraday = FakeStore()
+        coordinator._refresh_succeeded = lambda started, data: None
+        coordinator.logger = logging.getLogger(__name__)
+        coordinator.last_refresh_duration = None
+
+        asyncio.run(coordinator._async_update_data())
+    finally:
+        dt_util.set_default_time_zone(original_time_zone)
+
+    local = datetime.now(time_zone).replace(tzinfo=None)
+    assert moments[0].tzinfo is None
+    assert abs(moments[0] - local) < timedelta(minutes=1)
+    assert coordinator.startdate == f"{local.year}0101"
@@ -0,0 +1,166 @@
+"""Compare the precomputed daily energy with the original day-by-day sums."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from custom_components.solaredge_forecast.solaredgeforecast import (
+    SolaredgeForecast,
+    _add_months,
+    _interpolation_points,
+    _monthly_daily_averages,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.interpolation import (
+    INTERPOLATION_LINEAR,
+    LinearEnergy,
+    energy_calendar,
+)
+
+AVERAGES = {
+    1: 3.1,
+    2: 6.4,
+    3: 11.8,
+    4: 17.2,
+    5: 20.5,
+    6: 22.9,
+    7: 21.7,
+    8: 18.3,
+    9: 13.6,
+    10: 8.2,
+    11: 4.0,
+    12: 2.4,
+}
+PERIODS = [
+    (date(2026, 1, 1), date(2026, 12, 31)),
+    (date(2026, 10, 1), date(2027, 3, 31)),
+    (date(2027, 11, 20), date(2028, 3, 5)),
+    (date(2028, 2, 29), date(2028, 3, 1)),
+]
+
+
+def _reference_daily(day: date, points: list[tuple[date, float]]) -> float:
+    """Return the daily energy the way the forecast computed it originally."""
+    if day <= points[0][0]:
+        return points[0][1]
+    if day >= points[-1][0]:
+        return points[-1][1]
+
+    previous_point = points[0]
+    for next_point in points[1:]:
+        previous_date, previous_value = previous_point
+        next_date, next_value = next_point
+        if previous_date <= day <= next_date:
+            fraction = (day - previous_date).days / (next_date - previous_date).days
+            return previous_value + (next_value - previous_value) * fraction
+        previous_point = next_point
+    return points[-1][1]
+
+
+def _reference_sum(
+    start_date: date, end_date: date, points: list[tuple[date, float]]
+) -> float:
+    """Sum the daily energy one day at a time, like the original forecast."""
+    total = 0.0
+    day = start_date
+    while day <= end_date:
+        total += _reference_daily(day, points)
+        day += timedelta(days=1)
+    return total
+
+
+def _period_points(startdate: date, enddate: date) -> list[tuple[date, float]]:
+    """Return the interpolation points the forecast uses for a period."""
+    return _interpolation_points(
+        AVERAGES, _add_months(startdate, -1), _add_months(enddate, 1)
+    )
+
+
+@pytest.mark.parametrize(("startdate", "enddate"), PERIODS)
+def test_linear_energy_matches_daily_loop(startdate: date, enddate: date) -> None:
+    """Daily values and range sums equal the day-by-day interpolation."""
+    points = _period_points(startdate, enddate)
+    energy = LinearEnergy(points)
+
+    day = startdate - timedelta(days=40)
+    while day <= enddate + timedelta(days=40):
+        assert energy.daily(day) == pytest.approx(_reference_daily(day, points))
+        day += timedelta(days=7)
+
+    middle = startdate + (enddate - startdate) / 2
+    for start, end in [(startdate, enddate), (startdate, middle), (middle, enddate)]:
+        assert energy.total(start, end) == pytest.approx(
+            _reference_sum(start, end, points)
+        )
+    assert energy.total(enddate, startdate) == 0
+
+
+@pytest.mark.parametrize(("startdate", "enddate"), PERIODS)
+def test_calendar_matches_daily_loop(startdate: date, enddate: date) -> None:
+    """The day-of-year calendar sums what the period's points give."""
+    points = _period_points(startdate, enddate)
+    calendar = energy_calendar(
+        tuple(sorted(AVERAGES.items())), INTERPOLATION_LINEAR, None
+    )
+
+    day = startdate
+    while day <= enddate:
+        assert calendar.daily(day) == pytest.approx(_reference_daily(day, points))
+        assert calendar.total(startdate, day) == pytest.approx(
+            _reference_sum(startdate, day, points)
+        )
+        day += timedelta(days=11)
+    assert calendar.total(enddate, startdate) == 0
+
+
+def test_profile_matches_daily_loop() -> None:
+    """The vectorized profile sums the same energy as the daily loop."""
+    profile_module = pytest.importorskip(
+        "custom_components.solaredge_forecast.solaredgeforecast.profile"
+    )
+    startdate, enddate = PERIODS[1]
+    points = _period_points(startdate, enddate)
+    profile = profile_module.DailyEnergyProfile.from_points(
+        points, startdate, enddate
+    )
+
+    middle = date(2026, 12, 31)
+    totals = profile.totals([startdate, middle], [middle, enddate])
+    assert totals[0] == pytest.approx(
+        [
+            _reference_sum(startdate, middle, points),
+            _reference_sum(middle, enddate, points),
+        ]
+    )
+
+
+@pytest.mark.parametrize("today", [date(2026, 7, 1), date(2026, 11, 9)])
+def test_forecast_baseline_matches_daily_loop(client, today: date) -> None:
+    """The baseline of a refresh equals the day-by-day sums of its history."""
+    startdate, enddate = PERIODS[1]
+    forecast = SolaredgeForecast(
+        startdate.strftime("%Y%m%d"), enddate.strftime("%Y%m%d"), "", 1
+    )
+    asyncio.run(
+        forecast.async_get_solar_forecast(client, datetime.combine(today, time()))
+    )
+
+    points = _interpolation_points(
+        _monthly_daily_averages(forecast.history),
+        _add_months(startdate, -1),
+        _add_months(enddate, 1),
+    )
+    yesterday = today - timedelta(days=1)
+    tomorrow = today + timedelta(days=1)
+    baseline = forecast.baseline
+    assert baseline.estimated_until_yesterday == pytest.approx(
+        _reference_sum(startdate, yesterday, points)
+    )
+    assert baseline.estimated_today == pytest.approx(
+        _reference_daily(today, points) if startdate <= today else 0
+    )
+    assert baseline.estimated_from_tomorrow == pytest.approx(
+        _reference_sum(max(tomorrow, startdate), enddate, points)
+    )
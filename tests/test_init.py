@@ -0,0 +1,35 @@
+"""Tests for setting up the SolarEdge Forecast integration."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from types import SimpleNamespace
+
+from custom_components.solaredge_forecast import _async_import_statistics
+
+STATISTICS = "custom_components.solaredge_forecast.solaredgeforecast.statistics"
+
+
+class ExecutorHass(SimpleNamespace):
+    """Stand-in for Home Assistant that records executor jobs."""
+
+    def __init__(self) -> None:
+        """Initialize without jobs."""
+        super().__init__(jobs=[])
+
+    async def async_add_executor_job(self, target, *args):
+        """Run a job right away and record what it was."""
+        self.jobs.append(args)
+        return target(*args)
+
+
+def test_statistics_are_imported_in_the_executor(monkeypatch) -> None:
+    """NumPy is loaded off the event loop before the first refresh."""
+    monkeypatch.delitem(sys.modules, STATISTICS, raising=False)
+    hass = ExecutorHass()
+
+    asyncio.run(_async_import_statistics(hass))
+
+    assert hass.jobs == [(STATISTICS,)]
+    assert STATISTICS in sys.modules
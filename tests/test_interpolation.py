@@ -0,0 +1,62 @@
+"""Tests for the interpolated daily energy."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+from custom_components.solaredge_forecast.solaredgeforecast import SolaredgeForecast
+from custom_components.solaredge_forecast.solaredgeforecast.interpolation import (
+    INTERPOLATIONS,
+    InterpolatedEnergy,
+    energy_calendar,
+)
+
+AVERAGES = tuple(
+    (month, 10.0 + 5 * month - 0.4 * month * month) for month in range(1, 13)
+)
+
+
+@pytest.mark.parametrize("method", sorted(INTERPOLATIONS))
+def test_calendar_total_of_reversed_range_is_zero(method: str) -> None:
+    """An empty range within one year has no energy."""
+    calendar = energy_calendar(AVERAGES, method, 52.0)
+
+    assert calendar.total(date(2026, 10, 1), date(2026, 6, 30)) == 0
+    assert calendar.total(date(2026, 10, 1), date(2026, 9, 30)) == 0
+
+
+@pytest.mark.parametrize("method", sorted(INTERPOLATIONS))
+def test_calendar_total_spans_new_year(method: str) -> None:
+    """Range sums across New Year add the days of both years."""
+    calendar = energy_calendar(AVERAGES, method, 52.0)
+
+    assert calendar.total(date(2025, 12, 31), date(2026, 1, 1)) == pytest.approx(
+        calendar.daily(date(2025, 12, 31)) + calendar.daily(date(2026, 1, 1))
+    )
+
+
+def test_upcoming_period_has_no_progress(client) -> None:
+    """Before the period starts nothing is estimated or produced yet."""
+    forecast = SolaredgeForecast("20261001", "20270331", "", 1)
+
+    values = asyncio.run(
+        forecast.async_get_solar_forecast(client, datetime(2026, 7, 1, 12))
+    )
+
+    assert forecast.baseline.estimated_until_yesterday == 0
+    assert values["Solar energy produced"] == 0
+    assert values["Solar energy progress"] == 0
+    assert values["Solar energy forecast"] == values["Solar energy estimated"] > 0
+
+
+def test_strategy_without_curve_cannot_be_created() -> None:
+    """A strategy has to implement its curve."""
+
+    class Incomplete(InterpolatedEnergy):
+        """Strategy that forgot its curve."""
+
+    with pytest.raises(TypeError):
+        Incomplete([(date(2026, 1, 15), 1.0)])
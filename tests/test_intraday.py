@@ -0,0 +1,136 @@
+"""Tests for the quarter-hour backfill of the intraday history."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from custom_components.solaredge_forecast.solaredgeforecast import SolaredgeForecast
+from custom_components.solaredge_forecast.solaredgeforecast.errors import (
+    SolarEdgeApiError,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.intraday import (
+    IntradayHistory,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.streaming import (
+    EnergySeries,
+)
+
+from .conftest import FakeSolaredgeClient
+
+TODAY = date(2026, 6, 10)
+# A year of quarter-hours before TODAY takes 13 monthly chunks.
+CHUNKS = 13
+
+
+class FailingIntradayClient(FakeSolaredgeClient):
+    """Fail every quarter-hour request with one error."""
+
+    def __init__(self, error: Exception) -> None:
+        """Initialize the client."""
+        super().__init__()
+        self.error = error
+
+    async def get_energy_series(
+        self, site_id: int, start_date: date, end_date: date, time_unit: str
+    ) -> EnergySeries:
+        """Fail quarter-hour requests and answer the others."""
+        if time_unit == "QUARTER_OF_AN_HOUR":
+            self.calls.append(("energy", site_id, start_date, end_date, time_unit))
+            raise self.error
+        return await super().get_energy_series(
+            site_id, start_date, end_date, time_unit
+        )
+
+    def intraday_chunks(self) -> list[tuple[date, date]]:
+        """Return the requested quarter-hour chunks and forget them."""
+        chunks = [
+            (call[2], call[3])
+            for call in self.calls
+            if call[0] == "energy" and call[4] == "QUARTER_OF_AN_HOUR"
+        ]
+        self.calls.clear()
+        return chunks
+
+
+def _refresh(
+    forecast: SolaredgeForecast, client: FakeSolaredgeClient, day: date
+) -> None:
+    """Rebuild the forecast's baseline at noon of day."""
+    forecast.baseline = None
+    asyncio.run(
+        forecast.async_get_solar_forecast(client, datetime.combine(day, time(12)))
+    )
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        SolarEdgeApiError("400, message='Bad Request'", 400),
+        SolarEdgeApiError("403, message='Forbidden'", 403),
+        LookupError("Site 1 is missing from the bulk response"),
+    ],
+)
+def test_rejected_chunks_are_not_requested_again(error: Exception) -> None:
+    """Chunks SolarEdge rejects are deferred and kept with the history."""
+    client = FailingIntradayClient(error)
+    checkpoints = []
+    forecast = SolaredgeForecast(
+        "20260101",
+        "20261231",
+        "",
+        1,
+        intraday=IntradayHistory(),
+        checkpoint=lambda: checkpoints.append(True),
+    )
+
+    requested = []
+    for _ in range(4):
+        _refresh(forecast, client, TODAY)
+        requested.extend(client.intraday_chunks())
+    assert checkpoints
+    assert len(requested) == len(set(requested)) == CHUNKS
+
+    forecast.intraday = IntradayHistory.from_dict(forecast.intraday.as_dict())
+    _refresh(forecast, client, TODAY + timedelta(days=1))
+    assert client.intraday_chunks() == [(TODAY, TODAY)]
+    _refresh(forecast, client, TODAY + timedelta(days=1))
+    assert client.intraday_chunks() == []
+    assert client.metrics.counters["intraday_failures"] == CHUNKS + 1
+
+
+def test_transient_chunk_failures_back_off_by_day() -> None:
+    """Chunks that failed temporarily are requested again the next day."""
+    client = FailingIntradayClient(
+        SolarEdgeApiError("503, message='Service Unavailable'", 503)
+    )
+    forecast = SolaredgeForecast("20260101", "20261231", "", 1)
+    forecast.intraday = IntradayHistory()
+
+    _refresh(forecast, client, TODAY)
+    first = client.intraday_chunks()
+    _refresh(forecast, client, TODAY)
+    assert not set(first) & set(client.intraday_chunks())
+
+    _refresh(forecast, client, TODAY + timedelta(days=1))
+    assert client.intraday_chunks() == [(first[0][0], TODAY), *first[1:]]
+    _refresh(forecast, client, TODAY + timedelta(days=2))
+    assert not set(first) & set(client.intraday_chunks())
+
+
+def test_intra_day_refresh_only_requests_todays_production(client) -> None:
+    """An incomplete intraday history is only backfilled with the baseline."""
+    forecast = SolaredgeForecast(
+        "20260101", "20261231", "", 1, intraday=IntradayHistory()
+    )
+    _refresh(forecast, client, TODAY)
+    client.calls.clear()
+
+    asyncio.run(
+        forecast.async_get_solar_forecast(client, datetime.combine(TODAY, time(15)))
+    )
+
+    assert forecast.intraday.missing_days(TODAY - timedelta(days=365), TODAY)
+    assert client.calls == [("timeFrameEnergy", 1, "DAY")]
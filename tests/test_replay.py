@@ -0,0 +1,108 @@
+"""Tests for the replayed SolarEdge API."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, timedelta
+import math
+
+import aiohttp
+import pytest
+
+from custom_components.solaredge_forecast.scheduler import SolaredgeRequestScheduler
+from custom_components.solaredge_forecast.solaredgeforecast import SolaredgeForecast
+from custom_components.solaredge_forecast.solaredgeforecast.api import (
+    SolaredgeApiClient,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.intraday import (
+    SLOTS_PER_DAY,
+    IntradayHistory,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.replay import (
+    FakeSolaredgeServer,
+    synthetic_recording,
+)
+
+SITE_IDS = [1, 2]
+TODAY = date.today()
+
+
+async def _with_client(recording: dict, test) -> None:
+    """Run a test with a client of a replay server of a recording."""
+    server = FakeSolaredgeServer(recording)
+    await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            scheduler = SolaredgeRequestScheduler(daily_budget=10_000)
+            client = SolaredgeApiClient(session, "key", scheduler, server.url)
+            await test(client)
+    finally:
+        await server.stop()
+
+
+def test_energy_is_served_per_time_unit() -> None:
+    """Monthly and quarter-hour requests get the values of their own unit."""
+    recording = synthetic_recording(
+        SITE_IDS, date(2020, 1, 1), TODAY, seed=1, intraday_days=3
+    )
+
+    async def test(client: SolaredgeApiClient) -> None:
+        monthly, quarter_hours = await asyncio.gather(
+            client.get_energy_series(
+                1, date(2021, 1, 1), date(2021, 12, 31), time_unit="MONTH"
+            ),
+            client.get_energy_series(
+                2,
+                TODAY - timedelta(days=2),
+                TODAY - timedelta(days=1),
+                time_unit="QUARTER_OF_AN_HOUR",
+            ),
+        )
+        assert len(monthly) == 12
+        assert set(monthly.minutes) == {0}
+        assert len(quarter_hours) == 2 * SLOTS_PER_DAY
+        assert set(quarter_hours.minutes) == set(range(0, 24 * 60, 15))
+        assert math.isnan(quarter_hours.values[0])
+        assert quarter_hours.values[SLOTS_PER_DAY // 2] > 0
+
+    asyncio.run(_with_client(recording, test))
+
+
+def test_unrecorded_time_unit_is_rejected() -> None:
+    """A time unit without a recording is a bad request, not monthly values."""
+    recording = synthetic_recording(SITE_IDS, date(2020, 1, 1), TODAY, seed=1)
+
+    async def test(client: SolaredgeApiClient) -> None:
+        with pytest.raises(aiohttp.ClientResponseError) as err:
+            await client.get_energy_series(
+                1, TODAY - timedelta(days=1), TODAY, time_unit="QUARTER_OF_AN_HOUR"
+            )
+        assert err.value.status == 400
+
+    asyncio.run(_with_client(recording, test))
+
+
+@pytest.mark.parametrize("intraday_days", [0, 3])
+def test_refresh_stores_only_recorded_quarter_hours(intraday_days: int) -> None:
+    """The intraday history never holds monthly values."""
+    recording = synthetic_recording(
+        SITE_IDS, date(2020, 1, 1), TODAY, seed=1, intraday_days=intraday_days
+    )
+    period = (f"{TODAY.year}0101", f"{TODAY.year}1231")
+
+    async def test(client: SolaredgeApiClient) -> None:
+        intraday = IntradayHistory()
+        forecast = SolaredgeForecast(*period, "", 1, intraday=intraday)
+        await forecast.async_update(client)
+
+        assert forecast.baseline is not None
+        produced = [
+            sum(row)
+            for offset in range(1, 365)
+            if (row := intraday.day(TODAY - timedelta(days=offset))) is not None
+            and not math.isnan(sum(row))
+        ]
+        assert sum(value > 0 for value in produced) == intraday_days
+        assert max(produced, default=0) < 100_000
+
+    asyncio.run(_with_client(recording, test))
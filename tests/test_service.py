@@ -0,0 +1,101 @@
+"""Tests for the forecast service against the replayed SolarEdge API."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+
+import aiohttp
+from aiohttp import web
+import pytest
+
+from custom_components.solaredge_forecast.scheduler import SolaredgeRequestScheduler
+from custom_components.solaredge_forecast.solaredgeforecast.api import (
+    SolaredgeApiClient,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.replay import (
+    FakeSolaredgeServer,
+    synthetic_recording,
+)
+from custom_components.solaredge_forecast.solaredgeforecast.service import (
+    AccountForecasts,
+    ForecastService,
+    create_app,
+)
+
+SITE_IDS = [1, 2, 3, 4, 5]
+
+
+def _account(
+    name: str, session: aiohttp.ClientSession, url: str, site_ids: list[int]
+) -> AccountForecasts:
+    """Return an account that refreshes against the replay server."""
+    client = SolaredgeApiClient(
+        session, f"key-{name}", SolaredgeRequestScheduler(daily_budget=10_000), url
+    )
+    return AccountForecasts(name, client, site_ids)
+
+
+def test_service_serves_accounts_without_calling_solaredge() -> None:
+    """Polls are answered from the last refresh, with ETags."""
+
+    async def run() -> None:
+        server = FakeSolaredgeServer(
+            synthetic_recording(SITE_IDS, date(2018, 1, 1), date.today(), seed=1)
+        )
+        await server.start()
+        async with aiohttp.ClientSession() as session:
+            listed = _account("listed", session, server.url, [1, 2])
+            discovered = _account("discovered", session, server.url, [])
+            service = ForecastService([listed, discovered])
+            runner = web.AppRunner(create_app(service))
+            await runner.setup()
+            await web.TCPSite(runner, "127.0.0.1", 0).start()
+            url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+            try:
+                async with session.get(f"{url}/sites") as response:
+                    assert (await response.json()) == {"sites": {}}
+
+                await listed.async_refresh()
+                await discovered.async_refresh()
+                assert discovered.site_ids == [3, 4, 5]
+                server.reset_counters()
+
+                async with session.get(f"{url}/sites") as response:
+                    sites = (await response.json())["sites"]
+                assert sorted(sites) == [str(site_id) for site_id in SITE_IDS]
+                assert sites["1"]["account"] == "listed"
+                assert sites["4"]["account"] == "discovered"
+
+                async with session.get(f"{url}/sites/3") as response:
+                    etag = response.headers["ETag"]
+                    assert (await response.json())["forecast"] > 0
+                async with session.get(
+                    f"{url}/sites/3", headers={"If-None-Match": f"W/{etag}"}
+                ) as response:
+                    assert response.status == 304
+                    assert await response.read() == b""
+                async with session.get(f"{url}/sites/9") as response:
+                    assert response.status == 404
+                async with session.get(f"{url}/status") as response:
+                    status = await response.json()
+                assert set(status["accounts"]) == {"listed", "discovered"}
+                assert not server.calls
+            finally:
+                await runner.cleanup()
+                await server.stop()
+
+    asyncio.run(run())
+
+
+def test_service_rejects_sites_of_two_accounts() -> None:
+    """A site can only be forecast for one account."""
+
+    async def run() -> None:
+        async with aiohttp.ClientSession() as session:
+            first = _account("first", session, "http://localhost", [1, 2])
+            second = _account("second", session, "http://localhost", [2, 3])
+            with pytest.raises(ValueError, match="Site 2"):
+                ForecastService([first, second])
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+"""Tests for the streamed parsing of energy responses."""
+
+from __future__ import annotations
+
+import json
+import math
+
+import pytest
+
+from custom_components.solaredge_forecast.solaredgeforecast.streaming import (
+    EnergyStreamParser,
+)
+
+VALUES = [
+    {"date": "2026-05-01 00:00:00", "value": None},
+    {"date": "2026-05-01 12:15:00", "value": 412.5},
+    {"date": "2026-05-02 12:30:00", "value": 1e3},
+]
+
+
+def _parse(body: bytes, chunk_size: int) -> dict:
+    """Feed a body to a parser in chunks and return its series."""
+    parser = EnergyStreamParser()
+    for start in range(0, len(body), chunk_size):
+        parser.feed(body[start : start + chunk_size])
+    return parser.close()
+
+
+def _bulk(sites: dict[int, list[dict]]) -> bytes:
+    """Return a bulk energy response."""
+    return json.dumps(
+        {
+            "sitesEnergy": {
+                "count": len(sites),
+                "siteEnergyList": [
+                    {"siteId": site_id, "energyValues": {"values": values}}
+                    for site_id, values in sites.items()
+                ],
+            }
+        }
+    ).encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 4096])
+def test_single_site_response(chunk_size: int) -> None:
+    """Values are parsed wherever the chunks are cut."""
+    body = json.dumps({"energy": {"timeUnit": "DAY", "values": VALUES}}).encode()
+
+    series = _parse(body, chunk_size)[None]
+
+    assert list(series.minutes) == [0, 735, 750]
+    assert math.isnan(series.values[0])
+    assert list(series.values[1:]) == [412.5, 1000.0]
+
+
+@pytest.mark.parametrize("chunk_size", [3, 4096])
+def test_bulk_response(chunk_size: int) -> None:
+    """Every site gets its own values."""
+    body = _bulk({1: VALUES, 2: VALUES[1:]})
+
+    series = _parse(body, chunk_size)
+
+    assert sorted(series) == [1, 2]
+    assert len(series[1]) == 3
+    assert len(series[2]) == 2
+
+
+def test_other_key_order_raises() -> None:
+    """Values the parser does not recognize are not dropped silently."""
+    values = [{"value": item["value"], "date": item["date"]} for item in VALUES]
+    body = json.dumps({"energy": {"values": values}}).encode()
+
+    with pytest.raises(ValueError, match="layout"):
+        _parse(body, 4096)
+
+
+def test_values_before_site_id_raise() -> None:
+    """Values are never assigned to the site before them."""
+    body = json.dumps(
+        {
+            "sitesEnergy": {
+                "siteEnergyList": [
+                    {"energyValues": {"values": VALUES}, "siteId": 1},
+                    {"energyValues": {"values": VALUES}, "siteId": 2},
+                ]
+            }
+        }
+    ).encode()
+
+    with pytest.raises(ValueError, match="layout"):
+        _parse(body, 4096)